@@ -1,5 +1,8 @@
+import argparse
+import asyncio
 import logging
 import os
+from contextlib import closing
 from sqlalchemy import text
 from sqlalchemy.engine import reflection
 from utils.db_setup import (
@@ -10,25 +13,35 @@ from utils.db_setup import (
     set_database_password
 )
 from utils.db_utils import (
-    get_table_detail, 
-    truncate_table, 
     select_paginated_data, 
-    check_yaml_exists
+    iter_table_pages,
+    print_page,
+    DEFAULT_PAGE_SIZE,
+    check_yaml_exists,
+    get_missing_row_count
 )
-from utils.data_generator import create_dummy_data_list
-from utils.insert_data import insert_dummy_data
+from utils.data_generator import load_existing_unique_values, iter_missing_rows
+from utils.schema_cache import load_schema
+from utils.distributions import apply_distribution_profiles
+from utils.value_pools import apply_value_pools, release_value_pools
+from utils.engine_pool import get_pool_options
+from utils.insert_data import DEFAULT_BATCH_SIZE
+from utils.pipeline import stream_dummy_data, replay_dummy_data, DEFAULT_CHUNK_SIZE
+from utils.snapshot import get_snapshot_path
+from utils.scheduler import run_concurrently, truncate_in_dependency_order, run_in_dependency_order
+from utils.async_insert import async_stream_dummy_data, seed_in_dependency_order_async
+from utils.checkpoint import open_journal, get_table_checkpoint, remove_journal, checkpointed_stream_dummy_data
+from utils.bulk_session import run_bulk_session
+from utils.log_setup import setup_logging
+from utils.metrics import timed, add_metrics_arguments, collect_metrics
 
 DEFAULT_DUMMY_NUM = 1000
+# 더미 데이터를 넣는 명령. truncate는 비우고 넣기, insert는 추가, fill은 dummy_nums 행 수까지 모자란 만큼만 추가,
+# replay는 비우고 config/서버이름/snapshots의 스냅샷을 다시 생성하지 않고 넣기
+SEED_COMMANDS = {'truncate', 'insert', 'fill', 'replay'}
 
-# 로깅 기본 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('application.log'),
-        logging.StreamHandler()
-    ]
-)
+# 로깅 기본 설정 (파일/콘솔 쓰기는 큐를 거쳐 별도 스레드에서 처리)
+setup_logging('application.log')
 
 def select_server_instance(connection_config):
     servers = connection_config.get('servers', {})
@@ -64,28 +77,220 @@ def get_database_names_from_config(server_config, server_name):
 
     return predefined_db_names
 
-def process_table(engine, metadata, table_name, table_detail, command):
-    if command == 'truncate':
-        truncate_table(table_name, engine)
-        datas = create_dummy_data_list(table_name, DEFAULT_DUMMY_NUM, table_detail, engine)
-        insert_dummy_data(table_name, metadata, engine, datas)
-        select_paginated_data(table_name, engine)
-    elif command == 'insert':
-        datas = create_dummy_data_list(table_name, DEFAULT_DUMMY_NUM, table_detail, engine)
-        insert_dummy_data(table_name, metadata, engine, datas)
-        select_paginated_data(table_name, engine)
+#fill은 현재 행 수를 읽어서 dummy_num까지 모자란 행만 넣음
+def get_fill_num(engine, table_name, command, dummy_num, fill_estimate=False):
+    if command != 'fill':
+        return dummy_num
+    missing = get_missing_row_count(engine, table_name, dummy_num, fill_estimate)
+    if missing == 0:
+        print(f"{table_name}에는 이미 {dummy_num}개 이상의 데이터가 있습니다.")
+    return missing
+
+#truncate는 FK 순서를 지키기 위해 process_database에서 자식 테이블부터 미리 비우고, 여기서는 insert와 같이 데이터만 넣음
+#journal이 있으면 청크마다 커밋하고 진행 상태를 기록하며, 저널에 이 테이블의 진행 상태가 있으면 거기서부터 이어서 넣음
+def process_table(engine, metadata, table_name, column_plans, command, batch_size=DEFAULT_BATCH_SIZE, dummy_num=DEFAULT_DUMMY_NUM,
+                  workers=1, seed=None, key_pools=None, loader='insert', fill_estimate=False, journal=None, bulk_config=None,
+                  snapshot_dir=None):
+    if command in SEED_COMMANDS:
+        target = dummy_num
+        # 이어서 만드는 테이블은 저널에 기록된 행 수를 그대로 씀
+        if journal is None or not get_table_checkpoint(journal, table_name):
+            dummy_num = get_fill_num(engine, table_name, command, dummy_num, fill_estimate)
+            if dummy_num == 0:
+                return
+        # insert/fill은 기존 행이 남아 있으므로 unique 컬럼의 기존 값을 피해서 생성
+        existing_values = None
+        if command in {'insert', 'fill'}:
+            existing_values = load_existing_unique_values(table_name, column_plans[table_name], engine)
+        # snapshot_dir이 있으면 같은 스키마/시드/행 수/부모 키로 만든 스냅샷을 replay로 재사용하고, 없으면 생성하면서 저장
+        snapshot_path = None
+        if snapshot_dir and journal is None and not existing_values and seed is not None:
+            snapshot_path = get_snapshot_path(snapshot_dir, table_name, column_plans[table_name], seed, dummy_num,
+                                              DEFAULT_CHUNK_SIZE, workers, key_pools)
+        snapshot_exists = snapshot_path is not None and os.path.exists(snapshot_path)
+
+        def seed_table(session_options, commit_rows):
+            if journal is not None:
+                checkpointed_stream_dummy_data(table_name, dummy_num, metadata, engine, column_plans[table_name], journal,
+                                               batch_size, workers=workers, key_pools=key_pools,
+                                               existing_values=existing_values, session_options=session_options)
+            elif command == 'replay' and snapshot_exists:
+                replay_dummy_data(table_name, metadata, engine, snapshot_path, batch_size, loader, session_options,
+                                  commit_rows)
+            else:
+                if command == 'replay':
+                    logging.warning(f"No snapshot for {table_name} with the current schema and seed; generating a new one.")
+                stream_dummy_data(table_name, dummy_num, metadata, engine, column_plans[table_name], batch_size,
+                                  seed=seed, workers=workers, key_pools=key_pools, existing_values=existing_values,
+                                  loader=loader, session_options=session_options, commit_rows=commit_rows,
+                                  snapshot_path=snapshot_path if not snapshot_exists else None)
+
+        # bulk_session이 켜져 있으면 검사를 끈 세션에서 청크마다 커밋하며 넣고, 끝나면 세션을 되돌리고 제약조건을 확인
+        run_bulk_session(engine, table_name, column_plans[table_name], dummy_num, bulk_config, seed_table)
+        if command == 'fill':
+            # 중복 키 등으로 건너뛴 행이 있으면 기존 값을 다시 읽어서 모자란 만큼 더 넣음 (시드를 바꿔서 다른 행을 만듦)
+            for missing, existing_values, attempt in iter_missing_rows(table_name, column_plans[table_name], engine, target):
+                stream_dummy_data(table_name, missing, metadata, engine, column_plans[table_name], batch_size,
+                                  seed=seed + attempt if seed is not None else None, workers=workers, key_pools=key_pools,
+                                  existing_values=existing_values, loader=loader)
+        with timed('verify', table_name):
+            select_paginated_data(table_name, engine)
     elif command == 'view':
-        page = 1
+        # PK 기준 keyset 페이지네이션이라 뒤쪽 페이지도 앞 페이지들을 다시 읽지 않음
+        with closing(iter_table_pages(table_name, engine)) as pages:
+            for page, rows in enumerate(pages, 1):
+                print_page(table_name, rows, page)
+                if len(rows) < DEFAULT_PAGE_SIZE:
+                    break  # 더 이상 데이터가 없으면 종료
+                next_page = input("다음 페이지를 보시겠습니까? (yes/no): ").strip().lower()
+                if next_page != 'yes':
+                    break
+    else:
+        logging.error(f"Unknown command '{command}' in YAML configuration.")
+
+#process_table의 truncate/insert/fill을 async 엔진으로 처리
+async def process_table_async(engine, async_engine, metadata, table_name, column_plans, command, batch_size=DEFAULT_BATCH_SIZE,
+                              dummy_num=DEFAULT_DUMMY_NUM, workers=1, seed=None, key_pools=None, fill_estimate=False):
+    target = dummy_num
+    dummy_num = await asyncio.to_thread(get_fill_num, engine, table_name, command, dummy_num, fill_estimate)
+    if dummy_num == 0:
+        return
+    existing_values = None
+    if command in {'insert', 'fill'}:
+        existing_values = await asyncio.to_thread(load_existing_unique_values, table_name, column_plans[table_name], engine)
+    await async_stream_dummy_data(table_name, dummy_num, metadata, async_engine, column_plans[table_name], batch_size,
+                                  seed=seed, workers=workers, key_pools=key_pools, existing_values=existing_values)
+    if command == 'fill':
+        # 행 수를 세고 기존 값을 읽는 동기 작업은 스레드에서 돌려서 다른 테이블의 적재를 막지 않음
+        top_ups = iter_missing_rows(table_name, column_plans[table_name], engine, target)
         while True:
-            row_count = select_paginated_data(table_name, engine, page=page)
-            if row_count < 1000:
-                break  # 더 이상 데이터가 없으면 종료
-            next_page = input("다음 페이지를 보시겠습니까? (yes/no): ").strip().lower()
-            if next_page != 'yes':
+            top_up = await asyncio.to_thread(next, top_ups, None)
+            if top_up is None:
                 break
-            page += 1
+            missing, existing_values, attempt = top_up
+            await async_stream_dummy_data(table_name, missing, metadata, async_engine, column_plans[table_name], batch_size,
+                                          seed=seed + attempt if seed is not None else None, workers=workers,
+                                          key_pools=key_pools, existing_values=existing_values)
+    with timed('verify', table_name):
+        await asyncio.to_thread(select_paginated_data, table_name, engine)
+
+def prepare_database(connection_config_no_db, server_name, db_name):
+    """
+    DB 엔진, yaml 설정, 컬럼 플랜을 준비합니다. 준비에 실패하면 None을 반환합니다.
+    """
+    logging.info(f"Preparing database: {db_name}")
+    connection_config = {'database': dict(connection_config_no_db['database'], database_name=db_name)}
+
+    try:
+        engine, metadata, _, tables = setup_database(connection_config, db_name)
+    except Exception as e:
+        logging.error(f"Skipping database {db_name} due to setup error: {e}", exc_info=True)
+        return None
+
+    yaml_data = create_or_load_yaml(db_name, tables, server_name)
+    if yaml_data is None:
+        logging.error(f"Failed to create or load YAML configuration for database {db_name}.")
+        return None
+
+    table_names = yaml_data.get('table_names', [])
+    command = yaml_data.get('command')
+    if not table_names:
+        logging.error(f'No tables provided in the configuration file for database {db_name}.')
+        return None
+
+    # 컬럼 플랜과 메타데이터는 config/서버이름/db이름_plan.yaml, db이름_plan_metadata.pickle에 캐시해서
+    # 다음 실행부터 스키마가 바뀌지 않은 테이블은 리플렉션을 건너뜀
+    plan_cache_path = f'config/{server_name}/{db_name}_plan.yaml'
+    column_plans = {}
+    if command in SEED_COMMANDS or command == 'resume':
+        metadata, column_plans = load_schema(engine, [name for name in table_names if name in tables], plan_cache_path)
+        # yaml의 value_pools가 켜져 있으면 TEXT 컬럼은 공유 메모리에 미리 만든 풀에서 뽑음 (DB들이 같은 풀을 공유)
+        column_plans = apply_value_pools(column_plans, yaml_data.get('value_pools'), yaml_data.get('seed'))
+        # yaml의 distributions에 지정한 컬럼은 균등 분포 대신 지정한 분포로 생성
+        column_plans = apply_distribution_profiles(column_plans, yaml_data.get('distributions'))
+
+    return {
+        'engine': engine,
+        'metadata': metadata,
+        'tables': tables,
+        'yaml_data': yaml_data,
+        'command': command,
+        'column_plans': column_plans,
+        'journal_path': f'config/{server_name}/{db_name}_journal.json',
+        'snapshot_dir': f'config/{server_name}/snapshots',
+    }
+
+def process_database(db_name, engine, metadata, tables, yaml_data, command, column_plans, journal_path=None,
+                     snapshot_dir=None):
+    logging.info(f"Processing database: {db_name}")
+    table_names = yaml_data.get('table_names', [])
+    dummy_nums = yaml_data.get('dummy_nums', {})
+    batch_size = yaml_data.get('batch_size', DEFAULT_BATCH_SIZE)
+    workers = yaml_data.get('workers', 1)
+    seed = yaml_data.get('seed')
+    loader = yaml_data.get('loader', 'insert')
+    fill_estimate = yaml_data.get('fill_estimate', False)
+    bulk_config = yaml_data.get('bulk_session') or {}
+    # snapshot이 켜져 있으면 생성한 데이터를 스냅샷으로 남기고, replay는 그 스냅샷을 그대로 넣음 (seed 필요)
+    if command == 'replay' and seed is None:
+        logging.error(f"The replay command needs a seed in the YAML configuration of {db_name}.")
+        return
+    if not (yaml_data.get('snapshot', False) or command == 'replay'):
+        snapshot_dir = None
+    # checkpoint가 켜져 있으면 진행 상태를 config/서버이름/db이름_journal.json에 기록하고,
+    # resume은 그 저널의 명령과 시드로 마지막으로 커밋된 청크부터 이어서 진행
+    resuming = command == 'resume'
+    journal = None
+    if resuming or yaml_data.get('checkpoint', False):
+        journal = open_journal(journal_path, command, seed, resume=resuming)
+        command, seed = journal['data']['command'], journal['data']['seed']
+    # view는 입력을 받으므로 테이블도 하나씩 처리
+    table_workers = yaml_data.get('table_workers', 1) if command != 'view' else 1
+
+    valid_table_names = []
+    for table_name in table_names:
+        if table_name not in tables:
+            logging.error(f'{table_name} table does not exist in the database.')
+            continue
+        valid_table_names.append(table_name)
+
+    def run_table(table_name, key_pools=None):
+        dummy_num = max(dummy_nums.get(table_name, DEFAULT_DUMMY_NUM), DEFAULT_DUMMY_NUM)
+        logging.info(f"Processing table {table_name} with {dummy_num} dummy records.")
+        process_table(engine, metadata, table_name, column_plans, command, batch_size, dummy_num, workers, seed,
+                      key_pools, loader, fill_estimate, journal, bulk_config, snapshot_dir)
+
+    async def run_table_async(table_name, key_pools, async_engine):
+        dummy_num = max(dummy_nums.get(table_name, DEFAULT_DUMMY_NUM), DEFAULT_DUMMY_NUM)
+        logging.info(f"Processing table {table_name} with {dummy_num} dummy records (async).")
+        await process_table_async(engine, async_engine, metadata, table_name, column_plans, command, batch_size, dummy_num,
+                                  workers, seed, key_pools, fill_estimate)
+
+    if command in SEED_COMMANDS:
+        # 자식 테이블부터 비우고, 부모 테이블부터 FK 의존 단계별로 채움. 비우지 못한 테이블과 그 자식 테이블은 채우지 않음
+        if command in {'truncate', 'replay'} and not resuming:
+            valid_table_names = truncate_in_dependency_order(engine, valid_table_names, column_plans, table_workers)
+        # async_mode면 같은 단계의 테이블들을 이벤트 루프 하나에서 동시에 넣음 (체크포인트, bulk_session, replay는 동기 모드에서만 지원)
+        use_async = (yaml_data.get('async_mode', False) and journal is None and not bulk_config.get('enabled')
+                     and command != 'replay')
+        if yaml_data.get('async_mode', False) and journal is not None:
+            logging.warning("async_mode does not support checkpointing; seeding synchronously with checkpoints.")
+        elif yaml_data.get('async_mode', False) and not use_async:
+            logging.warning("async_mode does not support bulk_session or replay; seeding synchronously.")
+        if use_async:
+            asyncio.run(seed_in_dependency_order_async(engine, valid_table_names, column_plans, run_table_async,
+                                                       table_workers))
+        else:
+            run_in_dependency_order(engine, valid_table_names, column_plans, run_table, table_workers)
+        if journal is not None:
+            checkpoints = [get_table_checkpoint(journal, table_name) for table_name in valid_table_names]
+            if all(checkpoint is None or checkpoint['done'] for checkpoint in checkpoints):
+                remove_journal(journal)
+            else:
+                logging.warning(f"Some tables in {db_name} did not finish; use the resume command to continue from {journal_path}.")
     else:
-        logging.error(f"Unknown command '{command}' in YAML configuration.")
+        run_concurrently(valid_table_names, run_table, table_workers)
+    logging.info(f"Database {db_name} processing completed.")
 
 def get_schemas(engine):
     inspector = reflection.Inspector.from_engine(engine)
@@ -140,7 +345,19 @@ def main_menu():
     print("9. Exit")
     return input("Enter your choice: ")
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='MySQL 서버의 스키마를 조회하고 더미 데이터를 넣습니다.')
+    return add_metrics_arguments(parser).parse_args(argv)
+
+def main(args=None):
+    args = args or parse_args([])
+    try:
+        with collect_metrics(args.metrics_file, args.metrics_format, args.profile, args.profile_file):
+            run()
+    finally:
+        release_value_pools()
+
+def run():
     try:
         # YAML 파일의 절대 경로 설정
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -158,7 +375,8 @@ def main():
                 'user': server_config.get('user'),
                 'port': server_config.get('port'),
                 'type': server_config.get('type'),
-                'driver': server_config.get('driver')
+                'driver': server_config.get('driver'),
+                **get_pool_options(server_config),
             }
         }
         
@@ -238,45 +456,23 @@ def main():
                     if not database_names:
                         continue
 
+                # DB별 설정은 사용자 입력을 받을 수 있으므로 먼저 순서대로 준비
+                database_jobs = {}
                 for db_name in database_names:
-                    logging.info(f"Processing database: {db_name}")
-                    connection_config_no_db['database']['database_name'] = db_name
-
-                    try:
-                        engine, metadata, _, tables = setup_database(connection_config_no_db, db_name)
-                    except Exception as e:
-                        logging.error(f"Skipping database {db_name} due to setup error: {e}", exc_info=True)
-                        continue
-
-                    yaml_data = create_or_load_yaml(db_name, tables, server_name)
-                    if yaml_data is None:
-                        logging.error(f"Failed to create or load YAML configuration for database {db_name}.")
-                        continue
-
-                    table_detail = get_table_detail(engine, tables)
-                    table_names = yaml_data.get('table_names', [])
-                    dummy_nums = yaml_data.get('dummy_nums', {})
-                    command = yaml_data.get('command')
-
-                    if not table_names:
-                        logging.error(f'No tables provided in the configuration file for database {db_name}.')
-                        continue
-
-                    for table_name in table_names:
-                        if table_name not in tables:
-                            logging.error(f'{table_name} table does not exist in the database.')
-                            continue
-
-                        dummy_num = max(dummy_nums.get(table_name, DEFAULT_DUMMY_NUM), DEFAULT_DUMMY_NUM)
-                        logging.info(f"Processing table {table_name} with {dummy_num} dummy records.")
-
-                        try:
-                            process_table(engine, metadata, table_name, table_detail, command)
-                            logging.info(f"Successfully processed table {table_name}.")
-                        except Exception as e:
-                            logging.error(f"An error occurred while processing table {table_name}: {e}", exc_info=True)
+                    job = prepare_database(connection_config_no_db, server_name, db_name)
+                    if job:
+                        database_jobs[db_name] = job
 
-                    logging.info(f"Database {db_name} processing completed.")
+                # view는 페이지마다 입력을 받으므로 순서대로, 나머지 DB들은 서버별 동시 처리 한도 안에서 동시에 진행
+                seeding_dbs = [db_name for db_name, job in database_jobs.items() if job['command'] != 'view']
+                view_dbs = [db_name for db_name, job in database_jobs.items() if job['command'] == 'view']
+                run_concurrently(
+                    seeding_dbs,
+                    lambda db_name: process_database(db_name, **database_jobs[db_name]),
+                    server_config.get('max_concurrent_databases', 1),
+                    'database')
+                for db_name in view_dbs:
+                    process_database(db_name, **database_jobs[db_name])
             elif choice == '9':
                 print("Exiting...")
                 break
@@ -288,4 +484,4 @@ def main():
         logging.error(f"An unexpected error occurred: {e}", exc_info=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(parse_args())
\ No newline at end of file
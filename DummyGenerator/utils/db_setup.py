@@ -4,6 +4,7 @@ import sqlalchemy as db
 from sqlalchemy import inspect
 import logging
 import getpass
+from utils.engine_pool import get_engine, get_pool_options
 
 #yaml파일 로드 펑션
 def load_yaml(file_path, log_message):
@@ -39,11 +40,11 @@ def create_or_load_yaml(db_name, tables, server_name):
     # 새로운 설정파일 생성시
     if create_new == 'yes':
         command = ''
-        # truncate, insert, view 중 하나의 command를 입력받음
-        while command not in {'truncate', 'insert', 'view'}:
-            command = input("Enter command (truncate, insert, view): ").strip().lower()
-            if command not in {'truncate', 'insert', 'view'}:
-                print("Invalid command. Please enter 'truncate', 'insert', or 'view'.")
+        # truncate, insert, fill, replay, resume, view 중 하나의 command를 입력받음
+        while command not in {'truncate', 'insert', 'fill', 'replay', 'resume', 'view'}:
+            command = input("Enter command (truncate, insert, fill, replay, resume, view): ").strip().lower()
+            if command not in {'truncate', 'insert', 'fill', 'replay', 'resume', 'view'}:
+                print("Invalid command. Please enter 'truncate', 'insert', 'fill', 'replay', 'resume', or 'view'.")
         # 해당 DB의 테이블 이름들을 가져옴
         print(f"{db_name}의 테이블 목록: {', '.join(tables)}")
 
@@ -94,6 +95,15 @@ def create_yaml_data(tables, table_entries, command):
         'command': command,
         'table_names': table_names_list,
         'dummy_nums': dummy_nums,
+        'workers': 1,
+        'table_workers': 1,
+        'async_mode': False,
+        'fill_estimate': False,
+        'checkpoint': False,
+        'distributions': {},
+        'bulk_session': {'enabled': False, 'commit_rows': 50000, 'disable_binlog': False, 'drop_indexes': False},
+        'snapshot': False,
+        'value_pools': {'enabled': False, 'size': 10000},
     }
 
 #DB패스워드를 입력받고 환경변수에 저장
@@ -127,21 +137,21 @@ def create_engine_connection(connection_config, database_name=None):
             connection_string = f"mysql+pymysql://{user}:{password}@{host}:{port}/{database_name}"
         else:
             connection_string = f"mysql+pymysql://{user}:{password}@{host}:{port}/"
-        engine = db.create_engine(connection_string)
-        logging.info(f"Created database engine with connection string: {connection_string}")
+        # 서버와 DB별로 엔진을 한 번만 만들고, 이후 메뉴 동작과 여러 DB 처리에서는 같은 커넥션 풀을 재사용
+        engine = get_engine(connection_string, **get_pool_options(db_config))
         return engine
     except Exception as e:
         logging.error(f"An error occurred while creating the database engine: {e}", exc_info=True)
         raise
 
 #설정과 데이터베이스 이름으로 데이터베이스 엔진과 메타데이터를 설정, 테이블 정보를 가져옴.
+#메타데이터는 비어 있는 채로 반환하고, 처리할 테이블이 정해진 뒤 schema_cache.load_schema로 필요한 테이블만 가져옴.
 def setup_database(connection_config, database_name=None):
     try:
         engine = create_engine_connection(connection_config, database_name)
         metadata = db.MetaData()
-        # 데이터베이스 이름이 제공된 경우에만 메타데이터 반영.
+        # 데이터베이스 이름이 제공된 경우에만 테이블 목록을 가져옴.
         if database_name:
-            metadata.reflect(bind=engine)
             inspector = inspect(engine)
             tables = inspector.get_table_names()
         else:
@@ -0,0 +1,187 @@
+"""
+생성, insert, 리플렉션 핫패스 벤치마크.
+
+저장소 루트에서 실행합니다.
+    python -m benchmarks.run_benchmarks run --rows 1000 100000 1000000 --output results.json
+    python -m benchmarks.run_benchmarks compare baseline.json results.json --threshold 0.1
+
+기본값은 임시 디렉터리의 SQLite 파일을 사용하므로 DB 서버 없이 돌아갑니다.
+--url로 비어 있는 MySQL 스키마를 주면 같은 테이블을 MySQL에 만들고 get_table_detail도 측정합니다.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+import sqlalchemy as db
+from sqlalchemy import inspect, text
+
+from utils.data_generator import build_column_plans, create_dummy_data_list
+from utils.db_utils import get_table_detail
+from utils.insert_data import insert_dummy_data, DEFAULT_BATCH_SIZE
+from utils.metrics import get_peak_rss_mb
+from utils.pipeline import stream_dummy_data
+from utils.scheduler import run_in_dependency_order
+from benchmarks.schemas import SCHEMAS, build_table_detail, create_tables
+
+DEFAULT_ROWS = [1000, 100000, 1000000]
+# compare에서 이 비율 이상 느려지면 회귀로 표시
+DEFAULT_THRESHOLD = 0.10
+
+
+def measure(results, schema, rows, phase, func):
+    """
+    func를 실행하고 걸린 시간, 초당 행 수, 그 시점까지의 최대 RSS를 results에 기록합니다.
+    """
+    start = time.perf_counter()
+    value = func()
+    seconds = time.perf_counter() - start
+    result = {
+        'schema': schema,
+        'rows': rows,
+        'phase': phase,
+        'seconds': round(seconds, 4),
+        'rows_per_sec': round(rows / seconds, 1) if rows and seconds > 0 else None,
+        'peak_rss_mb': round(get_peak_rss_mb(), 1),
+    }
+    results.append(result)
+    logging.info(f"{schema} {phase} rows={rows}: {seconds:.3f}s")
+    return value
+
+def reflect_tables(engine, table_names):
+    """
+    setup_database와 get_table_detail이 하는 리플렉션. MySQL이 아니면 INFORMATION_SCHEMA 쿼리 대신 인스펙터 호출만 측정합니다.
+    """
+    metadata = db.MetaData()
+    metadata.reflect(bind=engine, only=table_names)
+    if engine.dialect.name == 'mysql':
+        return get_table_detail(engine, table_names)
+    inspector = inspect(engine)
+    for table_name in table_names:
+        inspector.get_columns(table_name)
+        inspector.get_pk_constraint(table_name)
+        inspector.get_unique_constraints(table_name)
+        inspector.get_foreign_keys(table_name)
+    return None
+
+def truncate_all(engine, table_names):
+    with engine.begin() as conn:
+        for table_name in reversed(table_names):
+            conn.execute(text(f"DELETE FROM {table_name}"))
+
+def run(args):
+    url = args.url
+    temp_dir = None
+    if not url:
+        temp_dir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(temp_dir.name, 'bench.db')}"
+    engine = db.create_engine(url)
+    metadata = create_tables(engine)
+    table_names = list(SCHEMAS)
+    table_detail = build_table_detail()
+    results = []
+
+    try:
+        measure(results, 'all', 0, 'reflect', lambda: reflect_tables(engine, table_names))
+        plans = measure(results, 'all', 0, 'plan', lambda: build_column_plans(table_detail))
+
+        for rows in args.rows:
+            for table_name in table_names:
+                if table_name == 'bench_child':
+                    continue
+                datas = measure(results, table_name, rows, 'generate',
+                                lambda: create_dummy_data_list(table_name, rows, None, engine, seed=args.seed,
+                                                               plan=plans[table_name]))
+                if 'insert' in args.phases:
+                    truncate_all(engine, table_names)
+                    measure(results, table_name, rows, 'insert',
+                            lambda: insert_dummy_data(table_name, metadata, engine, datas, args.batch_size))
+                del datas
+
+            if 'stream' in args.phases:
+                truncate_all(engine, table_names)
+                measure(results, 'bench_unique+bench_child', rows * 2, 'stream',
+                        lambda: run_in_dependency_order(
+                            engine, ['bench_unique', 'bench_child'], plans,
+                            lambda table_name, key_pools: stream_dummy_data(
+                                table_name, rows, metadata, engine, plans[table_name], args.batch_size,
+                                seed=args.seed, workers=args.workers, key_pools=key_pools)))
+    finally:
+        engine.dispose()
+        if temp_dir:
+            temp_dir.cleanup()
+
+    output = {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'dialect': engine.dialect.name,
+            'rows': args.rows,
+            'batch_size': args.batch_size,
+            'workers': args.workers,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(output, file, indent=2)
+    print(f"벤치마크 결과를 {args.output}에 저장했습니다.")
+    return 0
+
+def compare(args):
+    """
+    두 결과 파일에서 같은 (schema, rows, phase)끼리 비교해서 threshold 이상 느려진 항목을 회귀로 표시합니다.
+    회귀가 하나라도 있으면 종료 코드 1을 반환합니다.
+    """
+    with open(args.baseline) as file:
+        baseline = {(r['schema'], r['rows'], r['phase']): r for r in json.load(file)['results']}
+    with open(args.current) as file:
+        current = json.load(file)['results']
+
+    regressions = 0
+    print(f"{'schema':<28}{'rows':>10}  {'phase':<10}{'baseline s':>12}{'current s':>12}{'change':>10}")
+    for result in current:
+        key = (result['schema'], result['rows'], result['phase'])
+        if key not in baseline:
+            continue
+        before = baseline[key]['seconds']
+        after = result['seconds']
+        change = (after - before) / before if before > 0 else 0.0
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{key[0]:<28}{key[1]:>10}  {key[2]:<10}{before:>12.3f}{after:>12.3f}{change:>+9.1%}{flag}")
+    print(f"{regressions}개의 회귀가 발견되었습니다." if regressions else "회귀가 없습니다.")
+    return 1 if regressions else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dummy data generator benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="run the benchmarks and write a JSON result file")
+    run_parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    run_parser.add_argument('--phases', nargs='+', default=['generate', 'insert', 'stream'],
+                            choices=['generate', 'insert', 'stream'])
+    run_parser.add_argument('--url', help="SQLAlchemy URL of an empty scratch database (default: temporary SQLite file)")
+    run_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    run_parser.add_argument('--workers', type=int, default=1)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', default='bench_results.json')
+
+    compare_parser = subparsers.add_parser('compare', help="compare two result files and flag regressions")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    return run(args) if args.command == 'run' else compare(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
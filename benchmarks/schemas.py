@@ -0,0 +1,111 @@
+# schemas.py
+import sqlalchemy as db
+from sqlalchemy.dialects import mysql
+
+# 벤치마크용 합성 스키마: 테이블 이름 -> [(컬럼 이름, MySQL 타입, 플래그)]
+# COLUMN_GENERATORS의 모든 타입 분기와 unique, FK 경로를 한 번씩 지나가도록 구성
+SCHEMAS = {
+    'bench_all_types': [
+        ('id', mysql.INTEGER(), {'primary_key': True, 'autoincrement': True}),
+        ('col_varchar', mysql.VARCHAR(50), {}),
+        ('col_char', mysql.CHAR(10), {}),
+        ('col_text', mysql.TEXT(), {}),
+        ('col_integer', mysql.INTEGER(), {}),
+        ('col_mediumint', mysql.MEDIUMINT(), {}),
+        ('col_smallint', mysql.SMALLINT(), {}),
+        ('col_float', mysql.FLOAT(), {}),
+        ('col_double', mysql.DOUBLE(), {}),
+        ('col_decimal', mysql.DECIMAL(10, 2), {}),
+        ('col_date', mysql.DATE(), {}),
+        ('col_time', mysql.TIME(), {}),
+        ('col_datetime', mysql.DATETIME(), {}),
+        ('col_timestamp', mysql.TIMESTAMP(), {}),
+        ('col_year', mysql.YEAR(), {}),
+        ('col_boolean', mysql.BOOLEAN(), {}),
+        ('col_enum', mysql.ENUM('small', 'medium', 'large'), {}),
+        ('col_blob', mysql.BLOB(), {}),
+        ('col_binary', mysql.BINARY(10), {}),
+    ],
+    'bench_unique': [
+        ('id', mysql.INTEGER(), {'primary_key': True, 'autoincrement': True}),
+        ('code', mysql.CHAR(4), {'unique': True}),
+        ('name', mysql.VARCHAR(40), {'unique': True}),
+        ('number', mysql.INTEGER(), {'unique': True}),
+        ('amount', mysql.DECIMAL(12, 2), {'unique': True}),
+        ('created_at', mysql.DATETIME(), {'unique': True}),
+    ],
+    'bench_child': [
+        ('id', mysql.INTEGER(), {'primary_key': True, 'autoincrement': True}),
+        ('parent_id', mysql.INTEGER(), {'foreign_key': ('bench_unique', 'id')}),
+        ('note', mysql.VARCHAR(30), {}),
+        ('quantity', mysql.SMALLINT(), {}),
+    ],
+}
+
+
+def get_sqlite_type(mysql_type):
+    """
+    SQLite에 테이블을 만들 때 쓸 타입. 생성기는 DATE/TIME/YEAR를 문자열로 만들므로 SQLite에서는 문자열 컬럼으로 둡니다.
+    """
+    data_type = mysql_type.__class__.__name__
+    if data_type in ['VARCHAR', 'CHAR']:
+        return db.String(mysql_type.length)
+    elif data_type in ['TEXT', 'DATE', 'TIME', 'YEAR', 'ENUM']:
+        return db.Text()
+    elif data_type in ['INTEGER', 'MEDIUMINT', 'SMALLINT']:
+        return db.Integer()
+    elif data_type in ['FLOAT', 'DOUBLE']:
+        return db.Float()
+    elif data_type == 'DECIMAL':
+        return db.Numeric(mysql_type.precision, mysql_type.scale)
+    elif data_type in ['DATETIME', 'TIMESTAMP']:
+        return db.DateTime()
+    elif data_type == 'BOOLEAN':
+        return db.Boolean()
+    elif data_type in ['BLOB', 'BINARY']:
+        return db.LargeBinary()
+    return db.Text()
+
+def build_table_detail(table_names=None):
+    """
+    get_table_detail과 같은 형식의 table_detail을 합성 스키마로 만듭니다.
+    """
+    table_detail = {}
+    for table_name, columns in SCHEMAS.items():
+        if table_names and table_name not in table_names:
+            continue
+        details = []
+        for name, mysql_type, flags in columns:
+            details.append({
+                'name': name,
+                'type': mysql_type,
+                'nullable': not flags.get('primary_key'),
+                'default': None,
+                'primary_key': flags.get('primary_key', False),
+                'unique': flags.get('unique', False),
+                'autoincrement': flags.get('autoincrement', False),
+                'foreign_key': flags.get('foreign_key'),
+            })
+        table_detail[table_name] = {'details': details}
+    return table_detail
+
+def create_tables(engine):
+    """
+    합성 스키마 테이블들을 새로 만들고 MetaData를 반환합니다. MySQL이면 MySQL 타입을 그대로 씁니다.
+    """
+    metadata = db.MetaData()
+    use_mysql_types = engine.dialect.name == 'mysql'
+    for table_name, columns in SCHEMAS.items():
+        table_columns = []
+        for name, mysql_type, flags in columns:
+            column_type = mysql_type if use_mysql_types else get_sqlite_type(mysql_type)
+            args = [db.ForeignKey(f"{flags['foreign_key'][0]}.{flags['foreign_key'][1]}")] if flags.get('foreign_key') else []
+            table_columns.append(db.Column(
+                name, column_type, *args,
+                primary_key=flags.get('primary_key', False),
+                unique=flags.get('unique', False),
+                autoincrement=flags.get('autoincrement', False)))
+        db.Table(table_name, metadata, *table_columns)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    return metadata
@@ -1,54 +1,243 @@
+import argparse
+import asyncio
 import logging
+import os
 from utils.db_setup import load_settings, load_connection_config, setup_database
-from utils.db_utils import get_table_detail, truncate_table, select_all_data
-from utils.data_generator import create_dummy_data_list
-from utils.insert_data import insert_dummy_data
-
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('application.log'),
-        logging.StreamHandler()
-    ]
-)
-
-def main():
-    try:
-        # 설정 파일 로드
-        settings = load_settings('config/settings.yaml')
-        connection_config = load_connection_config('config/connection.yaml')
-
-        # 데이터베이스 설정
-        engine, metadata, inspector, tables = setup_database(connection_config)
-
-        table_detail = get_table_detail(engine, tables)
-        
-        table_names = settings.get('table_names', [])
-        dummy_nums = settings.get('dummy_nums', {})
-
-        for table_name in table_names:
-            if table_name not in tables:
-                logging.error(f'{table_name} 테이블은 데이터베이스에 존재하지 않는 테이블 이름입니다.')
-                continue
-
-            dummy_num = dummy_nums.get(table_name, 1000)  # 기본값 1000
-            logging.info(f"Processing table {table_name} with {dummy_num} dummy records.")
-            
-            try:
-                truncate_table(table_name, engine)
-                datas = create_dummy_data_list(table_name, dummy_num, table_detail, engine)
-                insert_dummy_data(table_name, metadata, engine, datas)
-                select_all_data(table_name, engine)
-                logging.info(f"Successfully processed table {table_name}.")
-            except Exception as e:
-                logging.error(f"An error occurred while processing table {table_name}: {e}", exc_info=True)
+from utils.db_utils import select_all_data, get_missing_row_count
+from utils.data_generator import load_existing_unique_values, iter_missing_rows
+from utils.schema_cache import load_schema, load_offline_column_plans
+from utils.distributions import apply_distribution_profiles
+from utils.value_pools import apply_value_pools, release_value_pools
+from utils.mongo_migrate import migrate_tables, DEFAULT_MIGRATE_BATCH_SIZE, DEFAULT_MIGRATE_WRITERS
+from utils.insert_data import DEFAULT_BATCH_SIZE
+from utils.pipeline import stream_dummy_data, replay_dummy_data, DEFAULT_CHUNK_SIZE, DEFAULT_QUEUE_SIZE
+from utils.snapshot import get_snapshot_path
+from utils.export import export_tables, DEFAULT_EXPORT_DIR, DEFAULT_SQL_BATCH_SIZE
+from utils.scheduler import truncate_in_dependency_order, run_in_dependency_order
+from utils.async_insert import async_stream_dummy_data, seed_in_dependency_order_async
+from utils.checkpoint import open_journal, get_table_checkpoint, remove_journal, checkpointed_stream_dummy_data
+from utils.bulk_session import run_bulk_session
+from utils.log_setup import setup_logging
+from utils.metrics import timed, add_metrics_arguments, collect_metrics
 
-        logging.info("Script execution completed.")
+# 로깅 설정 (파일/콘솔 쓰기는 큐를 거쳐 별도 스레드에서 처리)
+setup_logging('application.log')
+
+def prepare_fill(table_name, engine, plan, dummy_num, fill_estimate=False):
+    """
+    fill 명령: 현재 행 수를 읽어서 dummy_num까지 모자란 행 수와, 새 행이 피해야 할 unique 컬럼의 기존 값을 반환합니다.
+    """
+    missing = get_missing_row_count(engine, table_name, dummy_num, fill_estimate)
+    if missing == 0:
+        print(f"{table_name}에는 이미 {dummy_num}개 이상의 데이터가 있습니다.")
+        return 0, None
+    return missing, load_existing_unique_values(table_name, plan, engine)
+
+def process_table(table_name, engine, metadata, plan, dummy_num, batch_size, chunk_size, queue_size, seed, workers,
+                  key_pools=None, loader='insert', command='truncate', fill_estimate=False, journal=None, bulk_config=None,
+                  snapshot_dir=None):
+    target = dummy_num
+    existing_values = None
+    if command == 'fill':
+        if journal is not None and get_table_checkpoint(journal, table_name):
+            # 이어서 만드는 테이블은 저널에 기록된 행 수를 그대로 쓰고, 기존 값만 다시 읽음
+            existing_values = load_existing_unique_values(table_name, plan, engine)
+        else:
+            dummy_num, existing_values = prepare_fill(table_name, engine, plan, dummy_num, fill_estimate)
+            if dummy_num == 0:
+                return
+    elif command == 'insert':
+        # insert는 기존 행을 남겨두고 추가하므로 unique 컬럼의 기존 값을 피해서 생성
+        existing_values = load_existing_unique_values(table_name, plan, engine)
+    logging.info(f"Processing table {table_name} with {dummy_num} dummy records.")
+    # snapshot_dir이 있으면 같은 스키마/시드/행 수/부모 키로 만든 스냅샷을 replay로 재사용하고, 없으면 생성하면서 저장
+    snapshot_path = None
+    if snapshot_dir and journal is None and not existing_values and seed is not None:
+        snapshot_path = get_snapshot_path(snapshot_dir, table_name, plan, seed, dummy_num, chunk_size, workers, key_pools)
+    snapshot_exists = snapshot_path is not None and os.path.exists(snapshot_path)
+
+    def seed_table(session_options, commit_rows):
+        if journal is not None:
+            checkpointed_stream_dummy_data(table_name, dummy_num, metadata, engine, plan, journal, batch_size, chunk_size,
+                                           queue_size, workers, key_pools, existing_values, session_options)
+        elif command == 'replay' and snapshot_exists:
+            replay_dummy_data(table_name, metadata, engine, snapshot_path, batch_size, loader, session_options, commit_rows)
+        else:
+            if command == 'replay':
+                logging.warning(f"No snapshot for {table_name} with the current schema and seed; generating a new one.")
+            stream_dummy_data(table_name, dummy_num, metadata, engine, plan, batch_size, chunk_size, queue_size, seed,
+                              workers, key_pools, existing_values, loader, session_options, commit_rows,
+                              snapshot_path if not snapshot_exists else None)
+
+    # bulk_session이 켜져 있으면 검사를 끈 세션에서 청크마다 커밋하며 넣고, 끝나면 세션을 되돌리고 제약조건을 확인
+    run_bulk_session(engine, table_name, plan, dummy_num, bulk_config, seed_table)
+    if command == 'fill':
+        # 중복 키 등으로 건너뛴 행이 있으면 기존 값을 다시 읽어서 모자란 만큼 더 넣음 (시드를 바꿔서 다른 행을 만듦)
+        for missing, existing_values, attempt in iter_missing_rows(table_name, plan, engine, target):
+            stream_dummy_data(table_name, missing, metadata, engine, plan, batch_size, chunk_size, queue_size,
+                              seed + attempt if seed is not None else None, workers, key_pools, existing_values, loader)
+    with timed('verify', table_name):
+        select_all_data(table_name, engine)
 
+async def process_table_async(table_name, async_engine, engine, metadata, plan, dummy_num, batch_size, chunk_size,
+                              queue_size, seed, workers, key_pools=None, command='truncate', fill_estimate=False):
+    target = dummy_num
+    existing_values = None
+    if command == 'fill':
+        dummy_num, existing_values = await asyncio.to_thread(prepare_fill, table_name, engine, plan, dummy_num, fill_estimate)
+        if dummy_num == 0:
+            return
+    elif command == 'insert':
+        existing_values = await asyncio.to_thread(load_existing_unique_values, table_name, plan, engine)
+    logging.info(f"Processing table {table_name} with {dummy_num} dummy records (async).")
+    await async_stream_dummy_data(table_name, dummy_num, metadata, async_engine, plan, batch_size, chunk_size, queue_size,
+                                  seed, workers, key_pools, existing_values)
+    if command == 'fill':
+        # 행 수를 세고 기존 값을 읽는 동기 작업은 스레드에서 돌려서 다른 테이블의 적재를 막지 않음
+        top_ups = iter_missing_rows(table_name, plan, engine, target)
+        while True:
+            top_up = await asyncio.to_thread(next, top_ups, None)
+            if top_up is None:
+                break
+            missing, existing_values, attempt = top_up
+            await async_stream_dummy_data(table_name, missing, metadata, async_engine, plan, batch_size, chunk_size,
+                                          queue_size, seed + attempt if seed is not None else None, workers, key_pools,
+                                          existing_values)
+    with timed('verify', table_name):
+        await asyncio.to_thread(select_all_data, table_name, engine)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='settings.yaml의 테이블들에 더미 데이터를 넣습니다.')
+    parser.add_argument('--settings', default='config/settings.yaml',
+                        help='설정 파일 경로 (config/서버이름/db이름.yaml 같은 DB별 설정 파일도 사용 가능)')
+    return add_metrics_arguments(parser).parse_args(argv)
+
+def main(args=None):
+    args = args or parse_args([])
+    try:
+        with collect_metrics(args.metrics_file, args.metrics_format, args.profile, args.profile_file):
+            run(args.settings)
     except Exception as e:
         logging.error(f"An unexpected error occurred: {e}", exc_info=True)
+    finally:
+        release_value_pools()
+
+def export(settings):
+    """
+    export 명령: DB에 연결하지 않고 schema_file의 CREATE TABLE 문이나 컬럼 플랜 캐시로 스키마를 읽어서
+    table_names의 더미 데이터를 파일로 내보냅니다.
+    """
+    export_config = settings.get('export') or {}
+    column_plans = load_offline_column_plans(settings.get('table_names', []), settings.get('column_plan_cache'),
+                                             export_config.get('schema_file'))
+    column_plans = apply_value_pools(column_plans, settings.get('value_pools'), settings.get('seed'))
+    column_plans = apply_distribution_profiles(column_plans, settings.get('distributions'))
+    export_tables(list(column_plans), column_plans, settings.get('dummy_nums', {}),
+                  export_config.get('output_dir') or DEFAULT_EXPORT_DIR, export_config.get('format', 'csv'),
+                  export_config.get('gzip', False), export_config.get('shards', 1),
+                  settings.get('chunk_size', DEFAULT_CHUNK_SIZE), settings.get('seed'),
+                  export_config.get('sql_batch_size', DEFAULT_SQL_BATCH_SIZE))
+    logging.info("Script execution completed.")
+
+def run(settings_path='config/settings.yaml'):
+    # 설정 파일 로드
+    settings = load_settings(settings_path)
+    # export는 DB 없이 파일만 만드므로 접속 설정을 읽지 않음
+    if settings.get('command') == 'export':
+        export(settings)
+        return
+    connection_config = load_connection_config('config/connection.yaml')
+
+    # 데이터베이스 설정 (동시에 처리하는 테이블 수만큼 커넥션 풀을 잡음)
+    table_workers = settings.get('table_workers', 1)
+    engine, _, inspector, tables = setup_database(connection_config, pool_size=table_workers)
+
+    table_names = settings.get('table_names', [])
+    dummy_nums = settings.get('dummy_nums', {})
+    batch_size = settings.get('batch_size', DEFAULT_BATCH_SIZE)
+    chunk_size = settings.get('chunk_size', DEFAULT_CHUNK_SIZE)
+    queue_size = settings.get('queue_size', DEFAULT_QUEUE_SIZE)
+    workers = settings.get('workers', 1)
+    seed = settings.get('seed')
+    loader = settings.get('loader', 'insert')
+    command = settings.get('command', 'truncate')
+    fill_estimate = settings.get('fill_estimate', False)
+
+    # migrate는 더미 데이터를 만들지 않고 table_names의 테이블을 connection.yaml의 mongodb로 옮김
+    if command == 'migrate':
+        migrate_config = settings.get('migrate') or {}
+        migrate_tables(engine, [name for name in table_names if name in tables], connection_config.get('mongodb') or {},
+                       migrate_config.get('batch_size', DEFAULT_MIGRATE_BATCH_SIZE),
+                       migrate_config.get('writers', DEFAULT_MIGRATE_WRITERS),
+                       migrate_config.get('decimal_mode', 'decimal128'), migrate_config.get('drop_collections', False))
+        logging.info("Script execution completed.")
+        return
+
+    # checkpoint_file이 있으면 청크마다 진행 상태를 저널에 기록하고, resume은 그 저널의 명령과 시드로 이어서 실행
+    resuming = command == 'resume'
+    checkpoint_file = settings.get('checkpoint_file')
+    journal = None
+    if resuming and not checkpoint_file:
+        raise ValueError("The resume command needs checkpoint_file in settings.yaml.")
+    # replay는 snapshot_dir의 스냅샷을 다시 생성하지 않고 그대로 넣음. 스냅샷은 시드로 찾으므로 seed가 필요함
+    snapshot_dir = settings.get('snapshot_dir')
+    if command == 'replay' and (not snapshot_dir or seed is None or checkpoint_file):
+        raise ValueError("The replay command needs snapshot_dir and seed in settings.yaml and does not use checkpoint_file.")
+    if checkpoint_file:
+        journal = open_journal(checkpoint_file, command, seed, resume=resuming)
+        command, seed = journal['data']['command'], journal['data']['seed']
+
+    # 채울 테이블의 메타데이터와 컬럼 플랜은 캐시가 있고 스키마가 그대로면 재사용하고, 바뀐 테이블만 리플렉션함
+    metadata, column_plans = load_schema(
+        engine, [name for name in table_names if name in tables], settings.get('column_plan_cache'))
+    # value_pools가 켜져 있으면 TEXT처럼 값마다 Faker를 부르는 컬럼은 공유 메모리에 미리 만든 풀에서 뽑음
+    column_plans = apply_value_pools(column_plans, settings.get('value_pools'), seed)
+    # distributions에 지정한 컬럼은 균등 분포 대신 zipf/normal/categorical/date_range 분포로 생성
+    column_plans = apply_distribution_profiles(column_plans, settings.get('distributions'))
+
+    valid_table_names = []
+    for table_name in table_names:
+        if table_name not in tables:
+            logging.error(f'{table_name} 테이블은 데이터베이스에 존재하지 않는 테이블 이름입니다.')
+            continue
+        valid_table_names.append(table_name)
+
+    # 자식 테이블부터 비우고, 부모 테이블부터 FK 의존 단계별로 채움. 같은 단계의 테이블들은 table_workers개의 스레드에서 동시에 처리
+    # insert는 비우지 않고 추가하고, fill은 비우지 않고 dummy_nums 행 수까지 모자란 만큼만 넣음. 둘 다 unique 컬럼의 기존 값을 피해서 생성
+    # resume은 이미 들어간 데이터를 그대로 두고 이어서 넣음. 비우지 못한 테이블과 그 테이블을 참조하는 테이블은 채우지 않음
+    if command in {'truncate', 'replay'} and not resuming:
+        valid_table_names = truncate_in_dependency_order(engine, valid_table_names, column_plans, table_workers)
+    bulk_config = settings.get('bulk_session') or {}
+    use_async = (settings.get('async_mode', False) and journal is None and not bulk_config.get('enabled')
+                 and command != 'replay')
+    if settings.get('async_mode', False) and journal is not None:
+        logging.warning("async_mode does not support checkpointing; seeding synchronously with checkpoints.")
+    elif settings.get('async_mode', False) and not use_async:
+        logging.warning("async_mode does not support bulk_session or replay; seeding synchronously.")
+    if use_async:
+        asyncio.run(seed_in_dependency_order_async(
+            engine, valid_table_names, column_plans,
+            lambda table_name, key_pools, async_engine: process_table_async(
+                table_name, async_engine, engine, metadata, column_plans[table_name], dummy_nums.get(table_name, 1000),
+                batch_size, chunk_size, queue_size, seed, workers, key_pools, command, fill_estimate),
+            table_workers))
+    else:
+        run_in_dependency_order(
+            engine, valid_table_names, column_plans,
+            lambda table_name, key_pools: process_table(
+                table_name, engine, metadata, column_plans[table_name], dummy_nums.get(table_name, 1000),  # 기본값 1000
+                batch_size, chunk_size, queue_size, seed, workers, key_pools, loader, command, fill_estimate,
+                journal, bulk_config, snapshot_dir),
+            table_workers)
+
+    if journal is not None:
+        checkpoints = [get_table_checkpoint(journal, table_name) for table_name in valid_table_names]
+        if all(checkpoint is None or checkpoint['done'] for checkpoint in checkpoints):
+            remove_journal(journal)
+        else:
+            logging.warning(f"Some tables did not finish; run again with command: resume to continue from {checkpoint_file}.")
+
+    logging.info("Script execution completed.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(parse_args())
\ No newline at end of file
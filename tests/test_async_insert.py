@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+import sqlalchemy as db
+from utils.async_insert import async_stream_dummy_data, seed_in_dependency_order_async
+from utils.data_generator import build_column_plans
+from utils.db_utils import get_table_detail
+
+pytest.importorskip('aiosqlite')
+pytest.importorskip('greenlet')
+
+ROWS = {'users': 300, 'orders': 500, 'payments': 400, 'reviews': 200}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'async.db'}")
+    metadata = db.MetaData()
+    db.Table('users', metadata, db.Column('id', db.Integer, primary_key=True), db.Column('name', db.String(20)))
+    for name in ['orders', 'payments', 'reviews']:
+        db.Table(name, metadata, db.Column('id', db.Integer, primary_key=True),
+                 db.Column('user_id', db.Integer, db.ForeignKey('users.id')), db.Column('note', db.String(30)))
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+def test_seeds_every_table_with_bounded_concurrency(engine):
+    metadata = db.MetaData()
+    metadata.reflect(engine)
+    column_plans = build_column_plans(get_table_detail(engine, list(ROWS)))
+    active, peak = [0], [0]
+
+    async def seed_table(table_name, key_pools, async_engine):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        try:
+            return await async_stream_dummy_data(table_name, ROWS[table_name], metadata, async_engine,
+                                                 column_plans[table_name], batch_size=100, chunk_size=150, seed=1,
+                                                 key_pools=key_pools)
+        finally:
+            active[0] -= 1
+
+    results = asyncio.run(seed_in_dependency_order_async(engine, list(ROWS), column_plans, seed_table, max_concurrency=2))
+
+    assert results == ROWS
+    # 자식 테이블 세 개가 같은 단계에서 돌지만 동시에 insert 하는 테이블은 max_concurrency개까지
+    assert peak[0] == 2
+    with engine.connect() as conn:
+        for table_name, num in ROWS.items():
+            assert conn.execute(db.text(f"SELECT COUNT(*) FROM {table_name}")).scalar() == num
+        orphans = conn.execute(db.text(
+            "SELECT COUNT(*) FROM orders o LEFT JOIN users u ON o.user_id = u.id WHERE u.id IS NULL")).scalar()
+        assert orphans == 0
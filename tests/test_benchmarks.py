@@ -0,0 +1,14 @@
+from benchmarks.schemas import SCHEMAS, build_table_detail
+from utils.data_generator import COLUMN_GENERATORS, build_column_plans, build_rows, create_generators
+
+
+def test_all_types_schema_covers_every_generator():
+    data_types = {column_type.__class__.__name__ for name, column_type, flags in SCHEMAS['bench_all_types']
+                  if not flags.get('autoincrement')}
+    assert data_types == set(COLUMN_GENERATORS)
+
+def test_every_all_types_column_gets_a_value():
+    plan = build_column_plans(build_table_detail(['bench_all_types']))['bench_all_types']
+    fake, rng = create_generators(0)
+    rows = build_rows(plan, 50, fake, rng)
+    assert all(value is not None for row in rows for value in row.values())
@@ -0,0 +1,57 @@
+import io
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import pytest
+import sqlalchemy as db
+from utils import bulk_load
+from utils.bulk_load import encode_field, load_dummy_data, write_load_file
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'bulk_load.db'}")
+    metadata = db.MetaData()
+    db.Table('items', metadata, db.Column('id', db.Integer, primary_key=True), db.Column('name', db.String(20)))
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+def test_falls_back_to_batched_insert_outside_mysql(engine, monkeypatch):
+    calls = []
+    insert_dummy_data = bulk_load.insert_dummy_data
+
+    def record_insert(selected_table, metadata, engine, data, *args):
+        calls.append(selected_table)
+        return insert_dummy_data(selected_table, metadata, engine, data, *args)
+
+    monkeypatch.setattr(bulk_load, 'insert_dummy_data', record_insert)
+    rows = ({'id': i, 'name': f'item {i}'} for i in range(2500))
+    assert load_dummy_data('items', db.MetaData(), engine, rows, batch_size=1000) == 2500
+    assert calls == ['items']
+    with engine.connect() as conn:
+        assert conn.execute(db.text("SELECT COUNT(*) FROM items")).scalar() == 2500
+
+@pytest.mark.parametrize('value, field', [
+    ('a\tb', b'a\\tb'),
+    ('a\nb', b'a\\nb'),
+    ('a\\b', b'a\\\\b'),
+    ('a\rb\0', b'a\\rb\\0'),
+    (None, b'\\N'),
+    # 문자열 \N은 NULL이 아니라 백슬래시와 N
+    ('\\N', b'\\\\N'),
+    (b'\t\x00\xff', b'\\t\\0\xff'),
+    (True, b'1'),
+    (Decimal('1E+3'), b'1000'),
+    (datetime(2024, 1, 2, 3, 4, 5), b'2024-01-02 03:04:05'),
+    (date(2024, 1, 2), b'2024-01-02'),
+    (timedelta(hours=26, minutes=1, seconds=2), b'26:01:02'),
+    ('한글', '한글'.encode('utf-8')),
+])
+def test_encode_field(value, field):
+    assert encode_field(value) == field
+
+def test_write_load_file_keeps_one_line_per_row():
+    file = io.BytesIO()
+    write_load_file(file, ['a', 'b', 'c'], [{'a': 'x\ty', 'b': None, 'c': 'line\nbreak'}, {'a': 1, 'c': '\\'}])
+    lines = file.getvalue().split(b'\n')
+    assert lines == [b'x\\ty\t\\N\tline\\nbreak', b'1\t\\N\t\\\\', b'']
@@ -0,0 +1,56 @@
+import pytest
+import sqlalchemy as db
+from utils import bulk_session
+from utils.bulk_session import run_bulk_session, verify_constraints
+from utils.data_generator import build_column_plans
+from utils.db_utils import get_table_detail
+
+BULK_CONFIG = {'enabled': True, 'commit_rows': 100}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # SQLite는 기본적으로 FK를 검사하지 않으므로 foreign_key_checks=0으로 넣은 것처럼 고아 행이 들어갈 수 있음
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    metadata = db.MetaData()
+    db.Table('users', metadata, db.Column('id', db.Integer, primary_key=True), db.Column('email', db.String(20)))
+    db.Table('orders', metadata, db.Column('id', db.Integer, primary_key=True),
+             db.Column('user_id', db.Integer, db.ForeignKey('users.id')))
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(db.text("INSERT INTO users (id, email) VALUES (1, 'a'), (2, 'b'), (3, 'b'), (4, NULL), (5, NULL)"))
+    yield engine
+    engine.dispose()
+
+def get_plan(engine, table_name):
+    return build_column_plans(get_table_detail(engine, [table_name]))[table_name]
+
+def insert_orders(engine, user_ids):
+    def seed_table(session_options, commit_rows):
+        assert session_options == {'unique_checks': 0, 'foreign_key_checks': 0} and commit_rows == 100
+        with engine.begin() as conn:
+            conn.execute(db.text("INSERT INTO orders (user_id) VALUES (:user_id)"), [{'user_id': i} for i in user_ids])
+        return len(user_ids)
+    return seed_table
+
+def test_clean_bulk_load_returns_the_seed_result(engine):
+    assert run_bulk_session(engine, 'orders', get_plan(engine, 'orders'), 3, BULK_CONFIG, insert_orders(engine, [1, 2, None])) == 3
+
+def test_orphaned_rows_fail_the_bulk_load(engine):
+    with pytest.raises(RuntimeError, match="orders.*'user_id': 2"):
+        run_bulk_session(engine, 'orders', get_plan(engine, 'orders'), 4, BULK_CONFIG, insert_orders(engine, [1, 9, 9, 2]))
+
+def test_duplicates_are_counted_per_unique_group_ignoring_nulls(engine, monkeypatch):
+    monkeypatch.setattr(bulk_session, 'get_unique_column_groups', lambda engine, table_name: [('id',), ('email',)])
+    assert verify_constraints(engine, 'users', get_plan(engine, 'users')) == {'email': 1}
+
+def test_seeding_errors_are_not_hidden_by_the_verification(engine, monkeypatch):
+    def broken_verify(*args):
+        raise AssertionError('verify_constraints must not run after a failed load')
+
+    def failing_seed(session_options, commit_rows):
+        raise ValueError('load failed')
+
+    monkeypatch.setattr(bulk_session, 'verify_constraints', broken_verify)
+    with pytest.raises(ValueError, match='load failed'):
+        run_bulk_session(engine, 'orders', get_plan(engine, 'orders'), 1, BULK_CONFIG, failing_seed)
@@ -0,0 +1,59 @@
+import pytest
+import sqlalchemy as db
+from utils import checkpoint
+from utils.checkpoint import checkpointed_stream_dummy_data, open_journal
+from utils.data_generator import build_column_plans
+from utils.db_utils import get_row_count, get_table_detail
+
+
+class Crash(BaseException):
+    pass
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'checkpoint.db'}")
+
+    # pysqlite는 BEGIN을 보내지 않아서 insert_batch의 SAVEPOINT를 RELEASE 하면 바로 커밋됨.
+    # MySQL처럼 청크 트랜잭션이 롤백되도록 SQLAlchemy 문서의 방법대로 BEGIN을 직접 보냄
+    @db.event.listens_for(engine, 'connect')
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @db.event.listens_for(engine, 'begin')
+    def begin(conn):
+        conn.exec_driver_sql('BEGIN')
+
+    metadata = db.MetaData()
+    events = db.Table('events', metadata, db.Column('n', db.Integer), db.Column('name', db.String(10)))
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(events.insert(), [{'n': 0, 'name': 'existing'}] * 7)
+    yield engine
+    engine.dispose()
+
+@pytest.mark.parametrize('crash_before_commit', [False, True])
+def test_resume_does_not_reinsert_or_lose_a_chunk(engine, tmp_path, monkeypatch, crash_before_commit):
+    metadata = db.MetaData()
+    metadata.reflect(engine)
+    plan = build_column_plans(get_table_detail(engine, ['events']))['events']
+    journal_path = str(tmp_path / 'journal.json')
+    update_table_checkpoint = checkpoint.update_table_checkpoint
+
+    def crash_at_second_chunk(journal, table_name, **fields):
+        # 두 번째 청크의 커밋 직전(pending 기록) 또는 커밋 직후(진행 상태 기록)에 죽는 상황
+        state = (fields.get('pending') or {}).get('state') if crash_before_commit else fields.get('state')
+        if state and state['chunk'] == 2 and (crash_before_commit or 'inserted' in fields):
+            raise Crash()
+        return update_table_checkpoint(journal, table_name, **fields)
+
+    monkeypatch.setattr(checkpoint, 'update_table_checkpoint', crash_at_second_chunk)
+    with pytest.raises(Crash):
+        checkpointed_stream_dummy_data('events', 1000, metadata, engine, plan, open_journal(journal_path, 'insert', seed=5),
+                                       chunk_size=300)
+    assert get_row_count(engine, 'events') == (307 if crash_before_commit else 607)
+
+    monkeypatch.setattr(checkpoint, 'update_table_checkpoint', update_table_checkpoint)
+    journal = open_journal(journal_path, 'insert', resume=True)
+    assert checkpointed_stream_dummy_data('events', 1000, metadata, engine, plan, journal, chunk_size=300) == 1000
+    assert get_row_count(engine, 'events') == 1007
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+import sqlalchemy as db
+from utils.data_generator import (FILL_RETRIES, build_column_plans, generate_dummy_data_chunks_parallel, iter_missing_rows,
+                                  make_column_plan)
+from utils.db_utils import get_row_count, get_table_detail
+from utils.pipeline import stream_dummy_data
+
+PLAN = (
+    make_column_plan('id', 'INTEGER', {}, True),
+    make_column_plan('code', 'CHAR', {'data_length': 6}, True),
+    make_column_plan('name', 'VARCHAR', {'data_length': 20}, False),
+    make_column_plan('price', 'DECIMAL', {'data_left_digits': 5, 'data_right_digits': 2}, False),
+    make_column_plan('created_at', 'DATETIME', {}, False),
+    make_column_plan('note', 'TEXT', {}, False),
+    make_column_plan('user_id', 'INTEGER', {}, False, ('users', 'id')),
+)
+KEY_POOLS = {('users', 'id'): np.arange(1, 101, dtype=object)}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'fill.db'}")
+    metadata = db.MetaData()
+    db.Table('users', metadata, db.Column('id', db.Integer, primary_key=True), db.Column('email', db.String(8), unique=True))
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+def top_up(engine, plan, max_rows, retries=FILL_RETRIES):
+    attempts = []
+    for missing, existing_values, attempt in iter_missing_rows('users', plan, engine, 400, retries):
+        # 기존 값은 지금 테이블에 있는 모든 행의 unique 값
+        assert len(existing_values['email']) == len(existing_values['id']) == 400 - missing
+        attempts.append((attempt, missing))
+        if max_rows:
+            stream_dummy_data('users', min(missing, max_rows), db.MetaData(), engine, plan, 50, seed=attempt,
+                              existing_values=existing_values)
+    return attempts
+
+def generate(workers, seed=7):
+    return list(generate_dummy_data_chunks_parallel('orders', 1000, None, None, 150, workers, seed=seed, plan=PLAN,
+                                                    key_pools=KEY_POOLS))
+
+def test_parallel_output_does_not_depend_on_worker_count():
+    single = generate(1)
+    assert [len(chunk) for chunk in single] == [150] * 6 + [100]
+    assert generate(4) == single
+    rows = [row for chunk in single for row in chunk]
+    assert len({row['id'] for row in rows}) == len({row['code'] for row in rows}) == 1000
+    assert {row['user_id'] for row in rows} <= set(range(1, 101))
+
+def test_parallel_output_changes_with_the_seed():
+    assert generate(2, seed=8) != generate(2)
+
+def test_fill_top_up_repeats_until_the_target_is_reached(engine):
+    plan = build_column_plans(get_table_detail(engine, ['users']))['users']
+    stream_dummy_data('users', 100, db.MetaData(), engine, plan, 50, seed=1)
+    # 매번 120행만 들어가는 상황(다른 세션과 겹친 중복 키 등)에서도 모자란 만큼 다시 넣음
+    assert top_up(engine, plan, 120) == [(1, 300), (2, 180), (3, 60)]
+    assert get_row_count(engine, 'users') == 400
+    assert top_up(engine, plan, 120) == []
+
+def test_fill_top_up_gives_up_after_the_retries(engine, caplog):
+    plan = build_column_plans(get_table_detail(engine, ['users']))['users']
+    stream_dummy_data('users', 100, db.MetaData(), engine, plan, 50, seed=1)
+    assert top_up(engine, plan, 0) == [(1, 300), (2, 300), (3, 300)]
+    assert 'still 300 rows short of 400 after 3 top-up attempts' in caplog.text
@@ -0,0 +1,57 @@
+import random
+import pytest
+import sqlalchemy as db
+from utils.db_utils import iter_table_pages, iter_table_rows, select_paginated_data
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'pages.db'}")
+    metadata = db.MetaData()
+    order_lines = db.Table('order_lines', metadata, db.Column('order_id', db.Integer, primary_key=True),
+                           db.Column('line', db.Integer, primary_key=True), db.Column('note', db.String(20)))
+    events = db.Table('events', metadata, db.Column('n', db.Integer), db.Column('name', db.String(20)))
+    metadata.create_all(engine)
+    keys = [(order_id, line) for order_id in range(1, 501) for line in range(1, 6)]
+    random.Random(0).shuffle(keys)
+    with engine.begin() as conn:
+        conn.execute(order_lines.insert(), [{'order_id': a, 'line': b, 'note': f'{a}-{b}'} for a, b in keys])
+        conn.execute(events.insert(), [{'n': i, 'name': f'event {i}'} for i in range(2500)])
+    yield engine
+    engine.dispose()
+
+def record_selects(engine, table_name):
+    statements = []
+
+    @db.event.listens_for(engine, 'before_cursor_execute')
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if f'FROM {table_name}' in statement:
+            statements.append(statement)
+
+    return statements
+
+def test_composite_primary_key_pages_follow_the_key_order(engine):
+    pages = list(iter_table_pages('order_lines', engine, page_size=1000))
+    assert [len(rows) for rows in pages] == [1000, 1000, 500]
+    keys = [(row.order_id, row.line) for rows in pages for row in rows]
+    assert keys == sorted(keys) and len(set(keys)) == 2500
+    # 둘째 페이지는 첫 페이지의 마지막 키 (200, 5) 다음부터
+    assert (pages[1][0].order_id, pages[1][0].line) == (201, 1)
+
+def test_select_paginated_data_resumes_from_the_last_key_with_one_query(engine):
+    num, after_key = select_paginated_data('order_lines', engine, 1, 1000)
+    num, after_key = select_paginated_data('order_lines', engine, 2, 1000, after_key)
+    assert (num, after_key) == (1000, [400, 5])
+    statements = record_selects(engine, 'order_lines')
+    num, after_key = select_paginated_data('order_lines', engine, 3, 1000, after_key)
+    assert (num, after_key) == (500, [500, 5])
+    assert len(statements) == 1
+    assert select_paginated_data('order_lines', engine, 4, 1000, after_key) == (0, None)
+
+def test_tables_without_a_primary_key_are_streamed(engine):
+    pages = list(iter_table_pages('events', engine, page_size=1000))
+    assert [len(rows) for rows in pages] == [1000, 1000, 500]
+    assert sorted(row.n for row in iter_table_rows('events', engine, page_size=700)) == list(range(2500))
+    assert select_paginated_data('events', engine, 1, 1000) == (1000, None)
+    with pytest.raises(ValueError):
+        next(iter_table_pages('events', engine, after_key=[1]))
@@ -0,0 +1,67 @@
+from utils.data_generator import build_column_plans
+from utils.ddl_schema import parse_create_tables, split_top_level
+
+DDL = """
+CREATE TABLE `users` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `email` varchar(40) NOT NULL UNIQUE COMMENT 'primary key, unique',
+  `grade` enum('a,b','c') DEFAULT NULL,
+  `balance` decimal(10,2) NOT NULL,
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS `shop`.`enrollments` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `user_id` int NOT NULL,
+  `course` varchar(10) NOT NULL,
+  `seat` int,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uk_user_course` (`user_id`, `course`),
+  CONSTRAINT uk_seat UNIQUE (`seat`),
+  KEY `idx_course` (`course`),
+  CONSTRAINT `fk_user` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`)
+);
+
+CREATE TABLE tags (
+  post_id int NOT NULL,
+  tag_id int NOT NULL,
+  PRIMARY KEY (post_id, tag_id),
+  FOREIGN KEY (post_id) REFERENCES posts (id),
+  FOREIGN KEY (tag_id) REFERENCES tag_names (id)
+);
+"""
+
+
+def get_columns(table_detail, table_name):
+    return {row['name']: row for row in table_detail[table_name]['details']}
+
+def test_split_top_level_keeps_nested_commas():
+    assert split_top_level("a decimal(10,2), b enum('x,y'), c int") == ["a decimal(10,2)", "b enum('x,y')", "c int"]
+
+def test_parse_columns_and_keys():
+    table_detail = parse_create_tables(DDL)
+    assert list(table_detail) == ['users', 'enrollments', 'tags']
+    users = get_columns(table_detail, 'users')
+    assert users['id']['primary_key'] and users['id']['autoincrement'] and not users['id']['nullable']
+    assert users['email']['unique'] and not users['email']['nullable']
+    assert users['grade']['nullable'] and not users['grade']['unique']
+    assert (users['balance']['type'].precision, users['balance']['type'].scale) == (10, 2)
+    assert table_detail['enrollments']['foreign_keys'][0]['referred_table'] == 'users'
+    assert get_columns(table_detail, 'enrollments')['user_id']['foreign_key'] == ('users', 'id')
+
+def test_composite_unique_keys_stay_grouped():
+    table_detail = parse_create_tables(DDL)
+    enrollments = get_columns(table_detail, 'enrollments')
+    assert {'name': 'uk_user_course', 'column_names': ['user_id', 'course']} in table_detail['enrollments']['unique_constraints']
+    assert not enrollments['user_id']['unique'] and not enrollments['course']['unique']
+    assert enrollments['seat']['unique']
+
+def test_composite_keys_generate_one_distinct_column():
+    plans = build_column_plans(parse_create_tables(DDL))
+    assert {column.name: column.unique for column in plans['enrollments']} == {
+        'user_id': False, 'course': True, 'seat': True}
+    # 전부 FK인 PK는 첫 컬럼만 부모 키를 겹치지 않게 씀
+    assert {column.name: column.unique for column in plans['tags']} == {'post_id': True, 'tag_id': False}
+
+def test_parse_only_requested_tables():
+    assert list(parse_create_tables(DDL, tables=['tags'])) == ['tags']
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from utils.distributions import build_alias_table, sample_alias
+
+
+@pytest.mark.parametrize('weights', [[1], [1, 1, 1, 1], [5, 1, 0, 3], 1.0 / np.arange(1, 51) ** 1.2])
+def test_alias_table_preserves_the_weights(weights):
+    weights = np.asarray(weights, dtype=np.float64)
+    prob, alias = build_alias_table(weights)
+    assert ((prob >= 0) & (prob <= 1)).all()
+    # 칸 i를 고를 확률 = (prob[i] + i를 alias로 가진 칸들의 1 - prob) / 칸 수
+    exact = prob.copy()
+    np.add.at(exact, alias, 1 - prob)
+    assert np.allclose(exact / len(weights), weights / weights.sum())
+
+def test_alias_sampling_matches_the_weights():
+    weights = np.array([5, 1, 0, 3, 1], dtype=np.float64)
+    prob, alias = build_alias_table(weights)
+    samples = sample_alias(np.random.default_rng(0), 200000, prob, alias)
+    frequencies = np.bincount(samples, minlength=len(weights)) / len(samples)
+    assert frequencies[2] == 0
+    assert np.allclose(frequencies, weights / weights.sum(), atol=0.01)
+
+@pytest.mark.parametrize('weights', [[], [0, 0], [1, -1]])
+def test_alias_table_rejects_invalid_weights(weights):
+    with pytest.raises(ValueError):
+        build_alias_table(weights)
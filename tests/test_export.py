@@ -0,0 +1,50 @@
+import csv
+import glob
+import os
+import pytest
+from utils.data_generator import make_column_plan
+from utils.export import export_tables, split_rows
+
+
+@pytest.mark.parametrize('dummy_num, shards', [(10, 3), (3, 5), (0, 2), (1000, 1), (1001, 4)])
+def test_split_rows_covers_every_row_once(dummy_num, shards):
+    ranges = split_rows(dummy_num, shards)
+    assert len(ranges) == shards
+    assert [start for start, _ in ranges] == [sum(size for _, size in ranges[:shard]) for shard in range(shards)]
+    assert sum(size for _, size in ranges) == dummy_num
+    assert max(size for _, size in ranges) - min(size for _, size in ranges) <= 1
+
+def test_split_rows_gives_the_remainder_to_the_first_shards():
+    assert split_rows(10, 3) == [(0, 4), (4, 3), (7, 3)]
+
+def read_csv_files(output_dir, table_name):
+    rows = []
+    for path in sorted(glob.glob(os.path.join(output_dir, f'{table_name}.*csv'))):
+        with open(path, newline='') as file:
+            rows += list(csv.DictReader(file))
+    return rows
+
+@pytest.mark.parametrize('shards', [1, 3])
+def test_child_foreign_keys_come_from_the_exported_parent_keys(tmp_path, shards):
+    column_plans = {
+        # users.id는 auto_increment라 파일에 쓰지 않고 1부터 행 수까지가 키가 됨
+        'users': (make_column_plan('name', 'VARCHAR', {'data_length': 10}, False),),
+        'profiles': (make_column_plan('user_id', 'INTEGER', {}, True, ('users', 'id')),),
+        'products': (make_column_plan('sku', 'INTEGER', {}, True),),
+        'orders': (make_column_plan('code', 'VARCHAR', {'data_length': 12}, True),
+                   make_column_plan('user_id', 'INTEGER', {}, False, ('users', 'id'))),
+        'order_items': (make_column_plan('order_code', 'VARCHAR', {}, False, ('orders', 'code')),
+                        make_column_plan('product_sku', 'INTEGER', {}, False, ('products', 'sku'))),
+    }
+    dummy_nums = {'users': 300, 'profiles': 200, 'products': 150, 'orders': 500, 'order_items': 900}
+    export_tables(list(column_plans), column_plans, dummy_nums, str(tmp_path), shards=shards, chunk_size=70, seed=11)
+    rows = {table_name: read_csv_files(str(tmp_path), table_name) for table_name in column_plans}
+    assert {table_name: len(table_rows) for table_name, table_rows in rows.items()} == dummy_nums
+
+    user_ids = {str(i) for i in range(1, 301)}
+    profile_user_ids = [row['user_id'] for row in rows['profiles']]
+    assert set(profile_user_ids) <= user_ids and len(set(profile_user_ids)) == len(profile_user_ids)
+    assert {row['user_id'] for row in rows['orders']} <= user_ids
+    assert {row['order_code'] for row in rows['order_items']} <= {row['code'] for row in rows['orders']}
+    assert {row['product_sku'] for row in rows['order_items']} <= {row['sku'] for row in rows['products']}
+    assert all(row[name] for table_rows in rows.values() for row in table_rows for name in row)
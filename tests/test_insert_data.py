@@ -0,0 +1,54 @@
+import logging
+import re
+import time
+import sqlalchemy as db
+import pytest
+from utils import insert_data
+from utils.insert_data import insert_batch, insert_dummy_data
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'insert.db'}")
+    metadata = db.MetaData()
+    db.Table('items', metadata, db.Column('id', db.Integer, primary_key=True), db.Column('name', db.String(20)))
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+def test_rows_per_sec_counts_only_insert_time(engine, caplog):
+    def slow_rows():
+        for i in range(1000):
+            if i % 250 == 0:
+                time.sleep(0.1)
+            yield {'id': i, 'name': f'item {i}'}
+
+    with caplog.at_level(logging.INFO):
+        assert insert_dummy_data('items', db.MetaData(), engine, slow_rows(), batch_size=100) == 1000
+    message, = [record.getMessage() for record in caplog.records if record.getMessage().startswith('Inserted')]
+    insert_seconds, elapsed = map(float, re.search(r'in ([\d.]+)s of INSERT time .*; ([\d.]+)s end to end', message).groups())
+    # 생성 쪽에서 기다린 0.4초는 전체 시간에만 들어감
+    assert elapsed >= 0.4
+    assert insert_seconds < elapsed - 0.3
+
+def test_failed_batch_is_bisected_down_to_the_bad_row(engine):
+    table = db.Table('items', db.MetaData(), autoload_with=engine)
+    batch = [{'id': i, 'name': f'item {i}'} for i in range(10)] + [{'id': 3, 'name': 'duplicate'}] + \
+            [{'id': i, 'name': f'item {i}'} for i in range(10, 16)]
+    with engine.connect() as conn, conn.begin():
+        assert insert_batch(conn, table, 'items', batch) == 16
+    with engine.connect() as conn:
+        assert conn.execute(db.text("SELECT COUNT(*) FROM items")).scalar() == 16
+        assert conn.execute(db.text("SELECT name FROM items WHERE id = 3")).scalar() == 'item 3'
+    failures = insert_data._failures.pop('items')
+    assert failures['counts'] == {('IntegrityError', 'items.id'): 1}
+    assert failures['samples'][0]['row'] == {'id': 3, 'name': 'duplicate'}
+
+def test_failures_are_logged_once_per_constraint(engine, caplog):
+    rows = [{'id': i % 900, 'name': f'item {i}'} for i in range(1000)]
+    assert insert_dummy_data('items', db.MetaData(), engine, rows, batch_size=200) == 900
+    errors = [record.getMessage() for record in caplog.records if record.levelname == 'ERROR']
+    assert errors[0] == 'Skipped 100 rows in items (error code/constraint: IntegrityError/items.id: 100)'
+    # 예시 행은 MAX_FAILURE_SAMPLES개만 남음
+    assert len(errors) == 1 + insert_data.MAX_FAILURE_SAMPLES
+    assert 'items' not in insert_data._failures
@@ -0,0 +1,51 @@
+import importlib
+import pytest
+import sqlalchemy as db
+from utils.data_generator import build_column_plans
+from utils.db_utils import get_table_detail
+
+
+@pytest.fixture
+def main(tmp_path, monkeypatch):
+    # main은 import할 때 현재 디렉터리에 application.log를 만들므로 임시 디렉터리에서 import
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module('main')
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'main.db'}")
+    metadata = db.MetaData()
+    db.Table('users', metadata, db.Column('id', db.Integer, primary_key=True), db.Column('email', db.String(8), unique=True),
+             db.Column('name', db.String(20)))
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+def seed(main, engine, command, dummy_num, seed=3):
+    plan = build_column_plans(get_table_detail(engine, ['users']))['users']
+    main.process_table('users', engine, db.MetaData(), plan, dummy_num, 100, 250, 2, seed, 1, command=command)
+
+def get_values(engine, column_name):
+    with engine.connect() as conn:
+        return conn.execute(db.text(f"SELECT {column_name} FROM users")).scalars().all()
+
+def test_insert_appends_without_reusing_unique_values(main, engine):
+    seed(main, engine, 'truncate', 300)
+    first = set(get_values(engine, 'email'))
+    # 같은 시드라도 기존 unique 값을 피해서 만들기 때문에 300행이 모두 추가됨
+    seed(main, engine, 'insert', 300)
+    emails = get_values(engine, 'email')
+    assert len(emails) == len(set(emails)) == 600
+    assert first < set(emails)
+
+def test_fill_tops_up_to_the_target_around_existing_unique_values(main, engine):
+    seed(main, engine, 'truncate', 120)
+    first = set(get_values(engine, 'email'))
+    seed(main, engine, 'fill', 500)
+    emails = get_values(engine, 'email')
+    assert len(emails) == len(set(emails)) == 500
+    assert len(set(get_values(engine, 'id'))) == 500
+    assert first < set(emails)
+    # 이미 target만큼 있으면 아무것도 넣지 않음
+    seed(main, engine, 'fill', 400)
+    assert len(get_values(engine, 'email')) == 500
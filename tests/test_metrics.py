@@ -0,0 +1,44 @@
+import pstats
+import threading
+from utils import metrics
+from utils.metrics import format_prometheus, profile_thread, start_profiling, stop_profiling
+
+SNAPSHOT = {
+    'peak_rss_mb': 1.5,
+    'tables': {
+        'users': {
+            'phases': {'generate': {'seconds': 0.25, 'calls': 2}, 'insert': {'seconds': 1.0, 'calls': 4}},
+            'counters': {'rows': 1000, 'batches': 4},
+        },
+    },
+}
+
+
+def test_format_prometheus():
+    lines = format_prometheus(SNAPSHOT).splitlines()
+    assert 'dummy_phase_seconds{table="users",phase="insert"} 1.000000' in lines
+    assert 'dummy_phase_calls{table="users",phase="generate"} 2' in lines
+    assert 'dummy_events_total{table="users",event="rows"} 1000' in lines
+    assert 'dummy_peak_rss_bytes 1572864' in lines
+    assert not any(line.startswith('dummy_tracemalloc') for line in lines)
+    # 메트릭마다 HELP/TYPE가 한 번씩 있어야 함
+    assert sum(line.startswith('# TYPE') for line in lines) == 4
+
+def test_format_prometheus_with_tracemalloc():
+    output = format_prometheus(dict(SNAPSHOT, tracemalloc_peak_mb=2.0))
+    assert 'dummy_tracemalloc_peak_bytes 2097152\n' in output
+
+def busy_worker():
+    return sum(i * i for i in range(10000))
+
+def test_cprofile_merges_worker_threads(tmp_path):
+    output_path = str(tmp_path / 'out.prof')
+    start_profiling('cprofile')
+    try:
+        thread = threading.Thread(target=profile_thread(busy_worker))
+        thread.start()
+        thread.join()
+    finally:
+        stop_profiling('cprofile', output_path)
+    assert metrics._profiler is None
+    assert any(function == 'busy_worker' for _, _, function in pstats.Stats(output_path).stats)
@@ -0,0 +1,128 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import pytest
+import sqlalchemy as db
+from sqlalchemy.dialects.mysql import SET
+from utils.mongo_migrate import build_document_converter, insert_documents, migrate_tables
+
+DETAILS = [
+    {'name': 'id', 'type': db.Integer()},
+    {'name': 'price', 'type': db.Numeric(10, 2)},
+    {'name': 'rate', 'type': db.Float()},
+    {'name': 'born', 'type': db.Date()},
+    {'name': 'created_at', 'type': db.DateTime()},
+    {'name': 'opens', 'type': db.Time()},
+    {'name': 'tags', 'type': SET('b', 'a')},
+    {'name': 'payload', 'type': db.LargeBinary()},
+]
+ROW = (1, Decimal('12.50'), 0.5, date(2024, 1, 2), datetime(2024, 1, 2, 3, 4, 5), timedelta(hours=9, minutes=30),
+       {'b', 'a'}, b'\x00\xff')
+
+
+class FakeCollection:
+    """
+    insert_many만 있는 컬렉션. rejected에 있는 _id는 중복 키처럼 거부하고 나머지는 넣습니다. (ordered=False)
+    """
+    def __init__(self, rejected=(), error=None):
+        self.rejected = set(rejected)
+        self.error = error
+        self.documents = []
+
+    def insert_many(self, documents, ordered=True):
+        from pymongo.errors import BulkWriteError
+        assert not ordered
+        if self.error:
+            raise self.error
+        errors = [{'index': index, 'code': 11000, 'errmsg': f"E11000 duplicate key: {document['_id']}"}
+                  for index, document in enumerate(documents) if document['_id'] in self.rejected]
+        self.documents += [document for document in documents if document['_id'] not in self.rejected]
+        if errors:
+            raise BulkWriteError({'nInserted': len(documents) - len(errors), 'writeErrors': errors,
+                                  'writeConcernErrors': []})
+
+
+def test_converts_decimals_to_double():
+    names, convert = build_document_converter(DETAILS, 'double')
+    document, = convert([ROW])
+    assert names == [detail['name'] for detail in DETAILS]
+    assert document['price'] == 12.5 and isinstance(document['price'], float)
+    assert document['rate'] == 0.5
+    assert document['born'] == datetime(2024, 1, 2)
+    assert document['created_at'] == datetime(2024, 1, 2, 3, 4, 5)
+    assert document['opens'] == '09:30:00'
+    assert document['tags'] == ['a', 'b']
+    assert document['payload'] == b'\x00\xff'
+
+def test_converts_decimals_to_decimal128_and_encodes_as_bson():
+    bson = pytest.importorskip('bson')
+    from bson.decimal128 import Decimal128
+    _, convert = build_document_converter(DETAILS, 'decimal128')
+    document, = convert([ROW])
+    assert document['price'] == Decimal128('12.50')
+    decoded = bson.decode(bson.encode(document))
+    assert decoded['price'].to_decimal() == Decimal('12.50')
+    assert decoded['born'] == datetime(2024, 1, 2)
+    assert decoded['payload'] == b'\x00\xff'
+
+def test_null_values_stay_null():
+    _, convert = build_document_converter(DETAILS, 'double')
+    document, = convert([(1,) + (None,) * (len(DETAILS) - 1)])
+    assert all(document[detail['name']] is None for detail in DETAILS[1:])
+
+def test_rejects_unknown_decimal_mode():
+    with pytest.raises(ValueError):
+        build_document_converter(DETAILS, 'string')
+
+def test_unordered_insert_counts_only_accepted_documents():
+    pytest.importorskip('pymongo')
+    collection = FakeCollection(rejected={2, 4})
+    documents = [{'_id': i} for i in range(6)]
+    assert insert_documents(collection, 'users', documents) == 4
+    assert [document['_id'] for document in collection.documents] == [0, 1, 3, 5]
+
+def test_errors_other_than_rejected_documents_are_raised():
+    errors = pytest.importorskip('pymongo.errors')
+    # details가 있어도 BulkWriteError가 아니면 실패한 행으로 세지 않고 올림
+    for error in [errors.OperationFailure('not authorized', 13, {'errmsg': 'not authorized', 'nInserted': 0}),
+                  errors.WriteConcernError('waiting for replication timed out', 64, {'nInserted': 1}),
+                  errors.BulkWriteError({'nInserted': 1, 'writeErrors': [],
+                                         'writeConcernErrors': [{'code': 64, 'errmsg': 'timed out'}]}),
+                  ConnectionError('server went away')]:
+        with pytest.raises(type(error)):
+            insert_documents(FakeCollection(error=error), 'users', [{'_id': 1}])
+
+def test_migrates_a_table_into_mongomock(tmp_path):
+    mongomock = pytest.importorskip('mongomock')
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    metadata = db.MetaData()
+    products = db.Table('products', metadata, db.Column('_id', db.Integer, primary_key=True),
+                        db.Column('price', db.Numeric(10, 2)), db.Column('released', db.Date),
+                        db.Column('image', db.LargeBinary))
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(products.insert(), [{'_id': i, 'price': Decimal(i) / 4, 'released': date(2024, 1, 1) + timedelta(days=i),
+                                          'image': bytes([i % 256])} for i in range(1, 1201)])
+    mongo_db = mongomock.MongoClient().shop
+    # 이미 옮겨진 문서와 _id가 겹치는 행은 거부되고 나머지는 들어감
+    mongo_db.products.insert_many([{'_id': 7}, {'_id': 700}])
+
+    results = migrate_tables(engine, ['products'], {}, batch_size=250, writers=3, decimal_mode='double', mongo_db=mongo_db)
+
+    assert results == {'products': 1198}
+    assert mongo_db.products.count_documents({}) == 1200
+    document = mongo_db.products.find_one({'_id': 10})
+    assert document == {'_id': 10, 'price': 2.5, 'released': datetime(2024, 1, 11), 'image': b'\n'}
+    engine.dispose()
+
+def test_write_failures_stop_the_migration(tmp_path):
+    errors = pytest.importorskip('pymongo.errors')
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    metadata = db.MetaData()
+    products = db.Table('products', metadata, db.Column('_id', db.Integer, primary_key=True))
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(products.insert(), [{'_id': i} for i in range(1, 101)])
+    mongo_db = {'products': FakeCollection(error=errors.OperationFailure('not authorized', 13))}
+    with pytest.raises(errors.OperationFailure):
+        migrate_tables(engine, ['products'], {}, batch_size=10, writers=2, decimal_mode='double', mongo_db=mongo_db)
+    engine.dispose()
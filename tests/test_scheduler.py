@@ -0,0 +1,63 @@
+import sqlalchemy as db
+from utils.data_generator import build_column_plans, make_column_plan
+from utils.db_utils import get_table_detail
+from utils.scheduler import build_dependency_levels, truncate_in_dependency_order
+
+
+def make_plan(*foreign_keys):
+    plan = [make_column_plan('id', 'INTEGER', {}, True)]
+    plan += [make_column_plan(f'{parent}_id', 'INTEGER', {}, False, (parent, 'id')) for parent in foreign_keys]
+    return tuple(plan)
+
+def test_parents_come_before_children():
+    column_plans = {
+        'orders': make_plan('users', 'products'),
+        'reviews': make_plan('orders', 'users'),
+        'users': make_plan(),
+        'products': make_plan(),
+    }
+    levels = build_dependency_levels(['orders', 'reviews', 'users', 'products'], column_plans)
+    assert levels == [['users', 'products'], ['orders'], ['reviews']]
+
+def test_parents_outside_the_run_and_self_references_are_ignored():
+    column_plans = {
+        'employees': make_plan('employees', 'departments'),
+        'notes': make_plan(),
+    }
+    assert build_dependency_levels(['employees', 'notes'], column_plans) == [['employees', 'notes']]
+
+def test_circular_foreign_keys_share_the_last_level():
+    column_plans = {
+        'a': make_plan('b'),
+        'b': make_plan('a'),
+        'c': make_plan(),
+    }
+    assert build_dependency_levels(['a', 'b', 'c'], column_plans) == [['c'], ['a', 'b']]
+
+def test_tables_that_cannot_be_cleared_are_not_seeded(tmp_path):
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'truncate.db'}")
+
+    @db.event.listens_for(engine, 'connect')
+    def enable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute('PRAGMA foreign_keys = ON')
+
+    metadata = db.MetaData()
+    db.Table('users', metadata, db.Column('id', db.Integer, primary_key=True))
+    db.Table('tags', metadata, db.Column('id', db.Integer, primary_key=True))
+    for name in ['orders', 'reviews']:
+        db.Table(name, metadata, db.Column('id', db.Integer, primary_key=True),
+                 db.Column('user_id', db.Integer, db.ForeignKey('users.id')))
+    db.Table('payments', metadata, db.Column('id', db.Integer, primary_key=True),
+             db.Column('order_id', db.Integer, db.ForeignKey('orders.id')))
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        for name in ['users', 'tags', 'orders', 'reviews']:
+            conn.execute(db.text(f"INSERT INTO {name} VALUES (1{', 1' if name in {'orders', 'reviews'} else ''})"))
+
+    table_names = ['users', 'orders', 'payments', 'tags']
+    column_plans = build_column_plans(get_table_detail(engine, table_names))
+    # reviews는 이번 실행에 없는데 users의 행을 참조하고 있어서 users는 비울 수 없음
+    assert truncate_in_dependency_order(engine, table_names, column_plans) == ['tags']
+    with engine.connect() as conn:
+        assert [conn.execute(db.text(f"SELECT COUNT(*) FROM {name}")).scalar() for name in table_names] == [1, 0, 0, 0]
+    engine.dispose()
@@ -0,0 +1,59 @@
+import pytest
+import sqlalchemy as db
+import yaml
+from utils import schema_cache
+from utils.data_generator import COLUMN_PLAN_CACHE_VERSION, load_column_plans
+from utils.schema_cache import load_schema
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    metadata = db.MetaData()
+    db.Table('users', metadata, db.Column('id', db.Integer, primary_key=True), db.Column('name', db.String(20)))
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def fingerprints(monkeypatch):
+    # SQLite에는 지문 쿼리가 없으므로 MySQL에서 받은 것처럼 지문을 직접 줌
+    fingerprints = {'users': 'created-1:aaa'}
+    monkeypatch.setattr(schema_cache, 'get_schema_fingerprints', lambda engine, table_names: dict(fingerprints))
+    return fingerprints
+
+def get_names(metadata, column_plans):
+    return list(metadata.tables['users'].columns.keys()), [column.name for column in column_plans['users']]
+
+def test_schema_change_invalidates_the_cached_metadata_and_plans(engine, fingerprints, tmp_path):
+    plan_cache_path = str(tmp_path / 'db_plan.yaml')
+    assert get_names(*load_schema(engine, ['users'], plan_cache_path)) == (['id', 'name'], ['id', 'name'])
+    with engine.begin() as conn:
+        conn.execute(db.text("ALTER TABLE users ADD COLUMN email VARCHAR(30)"))
+
+    # 지문이 그대로면 리플렉션 없이 캐시를 씀 (새 컬럼이 보이지 않음)
+    assert get_names(*load_schema(engine, ['users'], plan_cache_path)) == (['id', 'name'], ['id', 'name'])
+
+    fingerprints['users'] = 'created-1:bbb'
+    expected = (['id', 'name', 'email'], ['id', 'name', 'email'])
+    assert get_names(*load_schema(engine, ['users'], plan_cache_path)) == expected
+    # 바뀐 지문으로 다시 저장했으므로 다음 실행은 새 캐시를 그대로 씀
+    with open(plan_cache_path) as file:
+        assert yaml.safe_load(file)['fingerprints'] == {'users': 'created-1:bbb'}
+    assert get_names(*load_schema(engine, ['users'], plan_cache_path)) == expected
+
+def test_plan_cache_from_another_version_is_rebuilt(engine, fingerprints, tmp_path):
+    plan_cache_path = str(tmp_path / 'db_plan.yaml')
+    load_schema(engine, ['users'], plan_cache_path)
+    with open(plan_cache_path) as file:
+        data = yaml.safe_load(file)
+    data['version'] = COLUMN_PLAN_CACHE_VERSION - 1
+    data['tables']['users'] = [{'name': 'stale', 'data_type': 'INTEGER', 'params': {}, 'unique': False}]
+    with open(plan_cache_path, 'w') as file:
+        yaml.safe_dump(data, file)
+
+    assert load_column_plans(plan_cache_path) == {}
+    _, column_plans = load_schema(engine, ['users'], plan_cache_path)
+    assert [column.name for column in column_plans['users']] == ['id', 'name']
+    with open(plan_cache_path) as file:
+        assert yaml.safe_load(file)['version'] == COLUMN_PLAN_CACHE_VERSION
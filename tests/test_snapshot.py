@@ -0,0 +1,81 @@
+import os
+from datetime import datetime
+from decimal import Decimal
+import numpy as np
+import pytest
+import sqlalchemy as db
+from utils.data_generator import make_column_plan
+from utils.pipeline import replay_dummy_data, stream_dummy_data
+from utils.snapshot import get_snapshot_path, iter_snapshot_chunks, record_snapshot
+
+pytest.importorskip('pyarrow')
+
+PLAN = (
+    make_column_plan('id', 'INTEGER', {}, True),
+    make_column_plan('user_id', 'INTEGER', {}, False, ('users', 'id')),
+    make_column_plan('amount', 'DECIMAL', {'data_left_digits': 6, 'data_right_digits': 2}, False),
+    make_column_plan('created_at', 'DATETIME', {}, False),
+    make_column_plan('note', 'VARCHAR', {'data_length': 20}, False),
+    make_column_plan('payload', 'BLOB', {}, False),
+)
+KEY_POOLS = {('users', 'id'): np.arange(1, 51, dtype=object)}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = db.create_engine(f"sqlite:///{tmp_path / 'snapshot.db'}")
+    metadata = db.MetaData()
+    db.Table('orders', metadata, db.Column('id', db.Integer, primary_key=True), db.Column('user_id', db.Integer),
+             db.Column('amount', db.Numeric(8, 2)), db.Column('created_at', db.DateTime), db.Column('note', db.String(20)),
+             db.Column('payload', db.LargeBinary))
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+def get_snapshot(tmp_path, seed=5, key_pools=KEY_POOLS, plan=PLAN, chunk_size=200, workers=1):
+    return get_snapshot_path(str(tmp_path / 'snapshots'), 'orders', plan, seed, 700, chunk_size, workers, key_pools)
+
+def select_orders(engine):
+    with engine.connect() as conn:
+        return conn.execute(db.text("SELECT * FROM orders ORDER BY id")).fetchall()
+
+def test_replay_loads_the_rows_of_the_first_run(engine, tmp_path):
+    path = get_snapshot(tmp_path)
+    assert stream_dummy_data('orders', 700, db.MetaData(), engine, PLAN, 100, 200, seed=5, key_pools=KEY_POOLS,
+                             snapshot_path=path) == 700
+    assert os.path.exists(path) and not os.path.exists(f"{path}.tmp")
+    generated = select_orders(engine)
+    with engine.begin() as conn:
+        conn.execute(db.text("DELETE FROM orders"))
+
+    assert replay_dummy_data('orders', db.MetaData(), engine, path, 100) == 700
+    assert select_orders(engine) == generated
+
+def test_snapshot_keeps_chunks_and_value_types(tmp_path):
+    # 첫 청크보다 자릿수가 많은 DECIMAL도 컬럼 정의의 자릿수로 기록됨
+    chunks = [[{'id': 1, 'amount': Decimal('1.50'), 'created_at': datetime(2024, 1, 2, 3, 4, 5), 'payload': b'\x00\xff'}],
+              [{'id': 2, 'amount': Decimal('123456.78'), 'created_at': datetime(1999, 12, 31), 'payload': b''},
+               {'id': 3, 'amount': None, 'created_at': None, 'payload': None}]]
+    path = str(tmp_path / 'chunks.arrow')
+    assert list(record_snapshot(iter(chunks), path, PLAN)) == chunks
+    assert list(iter_snapshot_chunks(path)) == chunks
+
+def test_unfinished_snapshot_is_not_kept(tmp_path):
+    path = str(tmp_path / 'partial.arrow')
+    chunks = record_snapshot(iter([[{'id': 1}], [{'id': 2}]]), path, PLAN)
+    next(chunks)
+    chunks.close()
+    assert not os.path.exists(path) and not os.path.exists(f"{path}.tmp")
+
+def test_snapshot_key_changes_with_the_inputs(tmp_path):
+    path = get_snapshot(tmp_path)
+    assert get_snapshot(tmp_path, key_pools={('users', 'id'): np.arange(1, 51, dtype=object)}) == path
+    changed = [
+        get_snapshot(tmp_path, seed=6),
+        get_snapshot(tmp_path, key_pools={('users', 'id'): np.arange(1, 52, dtype=object)}),
+        get_snapshot(tmp_path, key_pools={('users', 'id'): np.arange(2, 52, dtype=object)}),
+        get_snapshot(tmp_path, plan=PLAN[:-1]),
+        get_snapshot(tmp_path, chunk_size=300),
+        get_snapshot(tmp_path, workers=2),
+    ]
+    assert path not in changed and len(set(changed)) == len(changed)
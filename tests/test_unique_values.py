@@ -0,0 +1,71 @@
+from datetime import timedelta
+import numpy as np
+import pytest
+from utils.data_generator import make_column_plan
+from utils.unique_values import (create_permutation, create_unique_filler, decode_existing_values, decode_value,
+                                 encode_values, get_value_space)
+
+COLUMN_TYPES = [
+    ('CHAR', {'data_length': 3}),
+    ('VARCHAR', {'data_length': 30}),
+    ('TEXT', {}),
+    ('SMALLINT', {}),
+    ('INTEGER', {}),
+    ('FLOAT', {}),
+    ('DECIMAL', {'data_left_digits': 3, 'data_right_digits': 2}),
+    ('DATE', {}),
+    ('DATETIME', {}),
+    ('TIME', {}),
+    ('YEAR', {}),
+    ('BOOLEAN', {}),
+    ('ENUM', {'data_options': ['a', 'B', 'c']}),
+]
+
+
+@pytest.mark.parametrize('value_space', [1, 2, 7, 36, 1000, 46656, 2 ** 15])
+def test_permutation_is_a_bijection(value_space):
+    a, b = create_permutation(value_space, np.random.default_rng(value_space))
+    assert sorted((a * k + b) % value_space for k in range(value_space)) == list(range(value_space))
+
+@pytest.mark.parametrize('data_type, params', COLUMN_TYPES)
+def test_encode_values_are_distinct_and_decode_back(data_type, params):
+    rng = np.random.default_rng(0)
+    value_space = get_value_space(data_type, params)
+    indices = sorted({int(index) for index in rng.integers(0, value_space, size=min(value_space, 2000))})
+    values = encode_values(data_type, params, indices, rng)
+    assert len({str(value).casefold() for value in values}) == len(indices)
+    assert [decode_value(data_type, params, value) for value in values] == indices
+
+def test_unique_strings_do_not_differ_only_in_case():
+    params = {'data_length': 3}
+    values = encode_values('CHAR', params, list(range(get_value_space('CHAR', params))), np.random.default_rng(0))
+    assert len({value.casefold() for value in values}) == len(values)
+    assert all(value == value.lower() for value in values)
+
+def test_existing_values_are_matched_in_the_driver_representation():
+    # SQLite는 DATETIME을 문자열로, DECIMAL을 float로 돌려주고 MySQL은 TIME을 timedelta로 돌려줌
+    decimal_params = {'data_left_digits': 3, 'data_right_digits': 2}
+    assert decode_existing_values('DATETIME', {}, ['1970-01-01 00:01:40.000000']) == {100}
+    assert decode_existing_values('DECIMAL', decimal_params, [1.25]) == {124}
+    assert decode_existing_values('TIME', {}, [timedelta(hours=1, seconds=5)]) == {3605}
+    assert decode_existing_values('CHAR', {'data_length': 3}, ['ABA']) == decode_existing_values('CHAR', {'data_length': 3}, ['aba'])
+
+def test_values_the_encoder_cannot_produce_are_ignored():
+    assert decode_existing_values('CHAR', {'data_length': 3}, ['ab', 'a-b', 'abcd']) == set()
+    assert decode_existing_values('DATETIME', {}, ['1970-01-01 00:00:01.500000']) == set()
+    assert decode_existing_values('DECIMAL', {'data_left_digits': 3, 'data_right_digits': 2}, ['1.234', '-1']) == set()
+
+def test_filler_skips_existing_values():
+    plan = (make_column_plan('code', 'CHAR', {'data_length': 2}, True),)
+    value_space = get_value_space('CHAR', {'data_length': 2})
+    existing = set(range(0, value_space, 2))
+    fill = create_unique_filler('t', plan, value_space - len(existing), np.random.default_rng(1), {'code': existing})
+    rows = fill([{} for _ in range(value_space - len(existing))])
+    indices = [decode_value('CHAR', {'data_length': 2}, row['code']) for row in rows]
+    assert len(set(indices)) == len(indices)
+    assert not existing & set(indices)
+
+def test_filler_rejects_more_rows_than_the_value_space():
+    plan = (make_column_plan('flag', 'BOOLEAN', {}, True),)
+    with pytest.raises(ValueError):
+        create_unique_filler('t', plan, 3, np.random.default_rng(0))
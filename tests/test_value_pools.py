@@ -0,0 +1,52 @@
+from multiprocessing import shared_memory
+import pytest
+from utils import value_pools
+from utils.data_generator import generate_dummy_data_chunks_parallel, make_column_plan
+from utils.value_pools import apply_value_pools, get_value_pool, release_value_pools
+
+PLAN = (
+    make_column_plan('id', 'INTEGER', {}, True),
+    make_column_plan('note', 'TEXT', {}, False),
+    make_column_plan('summary', 'TEXT', {}, False),
+    make_column_plan('name', 'VARCHAR', {'data_length': 10}, False),
+)
+
+
+@pytest.fixture(autouse=True)
+def release_pools():
+    yield
+    release_value_pools()
+
+def generate(workers, pool_seed=3):
+    plan = apply_value_pools({'posts': PLAN}, {'enabled': True, 'size': 50}, pool_seed)['posts']
+    chunks = generate_dummy_data_chunks_parallel('posts', 600, None, None, 100, workers, seed=7, plan=plan)
+    return [row for chunk in chunks for row in chunk]
+
+def test_only_text_columns_are_pooled():
+    plan = apply_value_pools({'posts': PLAN}, {'enabled': True, 'size': 50}, 3)['posts']
+    assert [column.generator.func.__name__ for column in plan] == [
+        'generate_null_column', 'generate_pooled_column', 'generate_pooled_column', 'generate_string_column']
+    assert apply_value_pools({'posts': PLAN}, {'enabled': False}, 3)['posts'] == PLAN
+
+def test_pooled_rows_are_the_same_with_any_worker_count_and_a_rebuilt_pool():
+    rows = generate(1)
+    pool = get_value_pool('TEXT', {}, 50, 3)
+    offsets, data = value_pools.get_pool_view(pool)
+    values = {bytes(data[start:end]).decode() for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())}
+    assert {row['note'] for row in rows} <= values and len({row['note'] for row in rows}) > 1
+
+    assert generate(2) == rows
+    release_value_pools()
+    # 같은 시드로 다시 만든 풀(다른 공유 메모리)에서도 같은 행이 나옴
+    assert generate(2) == rows
+    release_value_pools()
+    assert [row['note'] for row in generate(1, pool_seed=4)] != [row['note'] for row in rows]
+
+def test_release_unlinks_the_shared_memory():
+    pool = get_value_pool('TEXT', {}, 20, 3)
+    value_pools.get_pool_view(pool)
+    release_value_pools()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=pool.shm_name)
+    # 풀을 지운 뒤에는 새 풀을 만듦
+    assert get_value_pool('TEXT', {}, 20, 3).shm_name != pool.shm_name
@@ -0,0 +1,141 @@
+# async_insert.py
+import asyncio
+import logging
+import time
+import sqlalchemy as db
+from .insert_data import record_failed_row, log_failure_summary, DEFAULT_BATCH_SIZE
+from .metrics import timed, count
+from .pipeline import start_producer, DEFAULT_CHUNK_SIZE, DEFAULT_QUEUE_SIZE, _DONE
+from .scheduler import run_in_dependency_order_async
+
+# 동기 엔진의 DB 종류별로 사용할 async 드라이버. sqlite는 MySQL 없이 테스트할 때 씀
+ASYNC_DRIVERS = {
+    'mysql': 'aiomysql',
+    'sqlite': 'aiosqlite',
+}
+
+
+def create_async_engine_for(engine, **engine_options):
+    """
+    동기 엔진과 같은 DB를 가리키는 async 엔진을 만듭니다. (mysql+pymysql -> mysql+aiomysql)
+    async 모드는 선택 기능이라 sqlalchemy[asyncio]와 async 드라이버가 설치되어 있어야 합니다.
+    """
+    try:
+        from sqlalchemy.ext.asyncio import create_async_engine
+    except ImportError as e:
+        raise RuntimeError("async_mode requires the optional async dependencies: pip install 'sqlalchemy[asyncio]' aiomysql") from e
+    dialect_name = engine.dialect.name
+    if dialect_name not in ASYNC_DRIVERS:
+        raise ValueError(f"async_mode is not supported for {dialect_name}. Use one of: {', '.join(ASYNC_DRIVERS)}")
+    url = engine.url.set(drivername=f"{dialect_name}+{ASYNC_DRIVERS[dialect_name]}")
+    return create_async_engine(url, **engine_options)
+
+async def insert_batch_async(conn, table, selected_table, batch):
+    """
+    insert_batch의 async 버전. 실패한 배치는 반으로 나눠 다시 시도하고 한 행까지 실패하면 그 행만 건너뜁니다.
+    """
+    if not batch:
+        return 0
+    count('batches', table_name=selected_table)
+    try:
+        async with conn.begin_nested():
+            await conn.execute(table.insert(), batch)
+        count('rows', len(batch), selected_table)
+        return len(batch)
+    except Exception as e:
+        if len(batch) == 1:
+            record_failed_row(selected_table, e, batch[0])
+            return 0
+        count('retries', table_name=selected_table)
+        mid = len(batch) // 2
+        return (await insert_batch_async(conn, table, selected_table, batch[:mid])
+                + await insert_batch_async(conn, table, selected_table, batch[mid:]))
+
+async def iterate_rows(data):
+    if hasattr(data, '__aiter__'):
+        async for row in data:
+            yield row
+    else:
+        for row in data:
+            yield row
+
+async def async_insert_dummy_data(selected_table, metadata, engine, data, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    insert_dummy_data와 같은 인터페이스의 async 버전. engine은 async 엔진이고 data는 일반 iterable이나 async iterable입니다.
+    """
+    batch_size = max(int(batch_size or DEFAULT_BATCH_SIZE), 1)
+    insert_num = 0
+    # insert_dummy_data처럼 rows/sec는 INSERT에 걸린 시간만으로 계산
+    insert_seconds = 0.0
+    start = time.perf_counter()
+
+    async def flush(conn, table, batch):
+        nonlocal insert_num, insert_seconds
+        batch_start = time.perf_counter()
+        with timed('insert', selected_table):
+            insert_num += await insert_batch_async(conn, table, selected_table, batch)
+        insert_seconds += time.perf_counter() - batch_start
+
+    async with engine.connect() as conn:
+        table = await conn.run_sync(lambda sync_conn: db.Table(selected_table, metadata, autoload_with=sync_conn))
+        async with conn.begin():
+            batch = []
+            async for d in iterate_rows(data):
+                batch.append(d)
+                if len(batch) >= batch_size:
+                    await flush(conn, table, batch)
+                    batch = []
+            if batch:
+                await flush(conn, table, batch)
+    log_failure_summary(selected_table)
+    elapsed = time.perf_counter() - start
+    rows_per_sec = insert_num / insert_seconds if insert_seconds > 0 else 0.0
+    logging.info(f"Inserted {insert_num} rows into {selected_table} in {insert_seconds:.2f}s of INSERT time "
+                 f"({rows_per_sec:.0f} rows/sec, batch_size={batch_size}, async); {elapsed:.2f}s end to end")
+    if insert_num == 0:
+        print("제약조건으로 인해 데이터를 더 추가할 수 없습니다.")
+    else:
+        print(f"{insert_num}개의 데이터를 {selected_table}에 넣었습니다. ({rows_per_sec:.0f} rows/sec)")
+    return insert_num
+
+async def consume_chunks_async(chunk_queue):
+    """
+    consume_chunks의 async 버전. 큐에서 기다리는 동안 이벤트 루프를 막지 않도록 get은 스레드에서 실행합니다.
+    """
+    while True:
+        item = await asyncio.to_thread(chunk_queue.get)
+        if item is _DONE:
+            return
+        if isinstance(item, Exception):
+            raise item
+        for row in item:
+            yield row
+
+async def async_stream_dummy_data(table_name, dummy_num, metadata, async_engine, plan, batch_size=DEFAULT_BATCH_SIZE,
+                                  chunk_size=DEFAULT_CHUNK_SIZE, queue_size=DEFAULT_QUEUE_SIZE, seed=None, workers=1,
+                                  key_pools=None, existing_values=None):
+    """
+    stream_dummy_data의 async 버전. 생성은 그대로 별도 스레드(또는 프로세스)에서 돌고 insert만 async 엔진으로 합니다.
+    """
+    chunk_queue, stop_event, producer = start_producer(table_name, dummy_num, None, plan, chunk_size, queue_size,
+                                                       seed, workers, key_pools, existing_values)
+    logging.info(f"Streaming {dummy_num} rows into {table_name} (chunk_size={chunk_size}, queue_size={queue_size}, workers={workers}, async)")
+    try:
+        return await async_insert_dummy_data(table_name, metadata, async_engine, consume_chunks_async(chunk_queue), batch_size)
+    finally:
+        stop_event.set()
+        await asyncio.to_thread(producer.join)
+
+async def seed_in_dependency_order_async(engine, table_names, column_plans, task, max_concurrency=1):
+    """
+    async 엔진을 만들어 부모 테이블부터 단계별로 task(table_name, key_pools, async_engine)를 실행하고, 끝나면 엔진을 닫습니다.
+    같은 단계의 테이블들은 이벤트 루프 하나에서 max_concurrency개까지 동시에 insert 합니다.
+    """
+    max_concurrency = max(int(max_concurrency or 1), 1)
+    async_engine = create_async_engine_for(engine, pool_size=max(max_concurrency, 5))
+    try:
+        return await run_in_dependency_order_async(
+            engine, table_names, column_plans,
+            lambda table_name, key_pools: task(table_name, key_pools, async_engine), max_concurrency)
+    finally:
+        await async_engine.dispose()
@@ -0,0 +1,137 @@
+# bulk_load.py
+import logging
+import os
+import tempfile
+import time
+from datetime import date, datetime, time as datetime_time, timedelta
+from decimal import Decimal
+from itertools import chain
+import sqlalchemy as db
+from sqlalchemy.pool import NullPool
+from .insert_data import insert_dummy_data, DEFAULT_BATCH_SIZE
+from .engine_pool import get_engine
+from .bulk_session import bulk_session
+from .metrics import timed, count
+
+# LOAD DATA 한 번에 넣을 행 수. 이 수만큼 임시 파일에 쓴 뒤 로드함
+DEFAULT_LOAD_BATCH_SIZE = 100000
+# LOAD DATA 기본 형식(탭 구분, \ 이스케이프)에서 이스케이프해야 하는 바이트
+ESCAPES = {
+    ord('\\'): b'\\\\',
+    ord('\t'): b'\\t',
+    ord('\n'): b'\\n',
+    ord('\r'): b'\\r',
+    0: b'\\0',
+}
+NULL_FIELD = b'\\N'
+
+
+
+def escape_bytes(value):
+    if not any(byte in ESCAPES for byte in value):
+        return value
+    return b''.join(ESCAPES.get(byte, bytes((byte,))) for byte in value)
+
+def encode_field(value):
+    """
+    값 하나를 LOAD DATA 기본 형식의 필드로 변환합니다.
+    """
+    if value is None:
+        return NULL_FIELD
+    if isinstance(value, bool):
+        return b'1' if value else b'0'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return escape_bytes(bytes(value))
+    if isinstance(value, Decimal):
+        # 지수 표기(1E+3 등)를 피하기 위해 고정 소수점으로 씀
+        return format(value, 'f').encode()
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ').encode()
+    if isinstance(value, (date, datetime_time)):
+        return value.isoformat().encode()
+    if isinstance(value, timedelta):
+        seconds = int(value.total_seconds())
+        return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}".encode()
+    return escape_bytes(str(value).encode('utf-8'))
+
+def write_load_file(file, column_names, rows):
+    for row in rows:
+        file.write(b'\t'.join(encode_field(row.get(name)) for name in column_names))
+        file.write(b'\n')
+
+def get_local_infile_engine(engine):
+    """
+    LOAD DATA LOCAL은 local_infile을 켠 연결에서만 되므로 기존 엔진의 URL로 만든 엔진을 엔진 풀에서 재사용합니다.
+    """
+    url = engine.url.render_as_string(hide_password=False)
+    return get_engine(engine.url, key=f"local_infile:{url}", connect_args={'local_infile': True}, poolclass=NullPool)
+
+def load_file(conn, selected_table, column_names, file_path):
+    """
+    임시 파일을 LOAD DATA LOCAL INFILE로 넣고 들어간 행 수를 반환합니다.
+    LOCAL 모드에서는 중복 키 등 제약조건 위반 행은 경고로 처리되어 건너뜁니다.
+    """
+    columns = ', '.join(f"`{name}`" for name in column_names)
+    query = db.text(
+        f"LOAD DATA LOCAL INFILE :file_path INTO TABLE `{selected_table}` CHARACTER SET utf8mb4 "
+        f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({columns})")
+    result = conn.execute(query, {'file_path': file_path})
+    conn.commit()
+    return result.rowcount
+
+def load_dummy_data(selected_table, metadata, engine, data, batch_size=DEFAULT_BATCH_SIZE, session_options=None,
+                    commit_rows=None, load_batch_size=DEFAULT_LOAD_BATCH_SIZE):
+    """
+    더미 데이터를 탭 구분 임시 파일로 쓰고 LOAD DATA LOCAL INFILE로 넣습니다. insert_dummy_data와 같은 인터페이스입니다.
+    파일 하나마다 커밋하므로 commit_rows가 있으면 파일 하나의 행 수로 씁니다.
+    MySQL이 아니거나 서버/클라이언트에서 LOCAL INFILE이 막혀 있으면 남은 행은 배치 INSERT로 넣습니다.
+    """
+    if engine.dialect.name != 'mysql':
+        logging.info(f"LOAD DATA is only available on MySQL; using batched INSERT for {selected_table}")
+        return insert_dummy_data(selected_table, metadata, engine, data, batch_size, session_options, commit_rows)
+    load_batch_size = commit_rows or load_batch_size
+
+    rows = iter(data)
+    load_num = 0
+    # rows/sec는 LOAD DATA에 걸린 시간만으로 계산 (rows가 생성 중인 스트림이면 생성을 기다린 시간은 빠짐)
+    load_seconds = 0.0
+    start = time.perf_counter()
+    fd, file_path = tempfile.mkstemp(prefix=f"{selected_table}_", suffix='.tsv')
+    os.close(fd)
+    try:
+        with get_local_infile_engine(engine).connect() as conn, bulk_session(conn, session_options):
+            while True:
+                batch = [row for _, row in zip(range(max(int(load_batch_size), 1)), rows)]
+                if not batch:
+                    break
+                column_names = list(batch[0].keys())
+                with open(file_path, 'wb') as file:
+                    write_load_file(file, column_names, batch)
+                try:
+                    load_start = time.perf_counter()
+                    with timed('insert', selected_table):
+                        loaded = load_file(conn, selected_table, column_names, file_path)
+                    load_seconds += time.perf_counter() - load_start
+                    load_num += loaded
+                    count('batches', table_name=selected_table)
+                    count('rows', loaded, selected_table)
+                    # LOCAL 모드에서 경고로 건너뛴 행은 제약조건 위반으로 셈
+                    count('constraint_failures', max(len(batch) - loaded, 0), selected_table)
+                except (db.exc.OperationalError, db.exc.InternalError, db.exc.ProgrammingError) as e:
+                    logging.warning(f"LOAD DATA LOCAL INFILE is unavailable for {selected_table} ({e}); "
+                                    f"falling back to batched INSERT")
+                    conn.rollback()
+                    return load_num + insert_dummy_data(selected_table, metadata, engine, chain(batch, rows), batch_size,
+                                                        session_options, commit_rows)
+    finally:
+        os.remove(file_path)
+
+    elapsed = time.perf_counter() - start
+    rows_per_sec = load_num / load_seconds if load_seconds > 0 else 0.0
+    logging.info(f"Loaded {load_num} rows into {selected_table} in {load_seconds:.2f}s of LOAD DATA time "
+                 f"({rows_per_sec:.0f} rows/sec); {elapsed:.2f}s end to end")
+    if load_num == 0:
+        print("제약조건으로 인해 데이터를 더 추가할 수 없습니다.")
+    else:
+        print(f"{load_num}개의 데이터를 {selected_table}에 넣었습니다. ({rows_per_sec:.0f} rows/sec, LOAD DATA)")
+    return load_num
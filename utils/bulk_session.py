@@ -0,0 +1,178 @@
+# bulk_session.py
+import logging
+import re
+from contextlib import contextmanager
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+from .metrics import timed
+
+# 청크 커밋 기본 행 수. 트랜잭션 하나가 테이블 전체만큼 커지지 않도록 이 행 수마다 커밋함
+DEFAULT_COMMIT_ROWS = 50000
+# drop_indexes를 켜도 이보다 적게 넣는 테이블은 인덱스를 지우지 않음 (다시 만드는 비용이 더 큼)
+DEFAULT_DROP_INDEXES_MIN_ROWS = 100000
+# SHOW CREATE TABLE에서 보조 인덱스(일반/FULLTEXT/SPATIAL KEY) 정의 줄. PRIMARY/UNIQUE KEY는 제외
+SECONDARY_INDEX_PATTERN = re.compile(r"^\s*((?:FULLTEXT |SPATIAL )?KEY `([^`]+)` \(.*?\).*?),?$")
+
+
+def get_session_options(bulk_config):
+    """
+    settings.yaml의 bulk_session 설정으로 적재 커넥션에 걸 세션 변수를 만듭니다. 꺼져 있으면 None을 반환합니다.
+    """
+    if not bulk_config or not bulk_config.get('enabled'):
+        return None
+    options = {'unique_checks': 0, 'foreign_key_checks': 0}
+    if bulk_config.get('disable_binlog'):
+        # SUPER(또는 SYSTEM_VARIABLES_ADMIN) 권한이 필요하고 복제 서버에는 이 데이터가 넘어가지 않음
+        options['sql_log_bin'] = 0
+    return options
+
+def get_commit_rows(bulk_config):
+    if not bulk_config or not bulk_config.get('enabled'):
+        return None
+    return max(int(bulk_config.get('commit_rows') or DEFAULT_COMMIT_ROWS), 1)
+
+@contextmanager
+def bulk_session(conn, options):
+    """
+    커넥션의 세션 변수를 options로 바꾸고, with 블록이 끝나면(에러가 나도) 원래 값으로 되돌립니다.
+    되돌리지 못한 커넥션은 느슨한 설정으로 풀에 돌아가지 않도록 버립니다. MySQL이 아니면 아무것도 하지 않습니다.
+    """
+    if not options or conn.dialect.name != 'mysql':
+        yield conn
+        return
+    names = list(options)
+    previous = dict(zip(names, conn.execute(text("SELECT " + ", ".join(f"@@SESSION.{name}" for name in names))).one()))
+    conn.commit()
+    applied = []
+    try:
+        for name in names:
+            try:
+                conn.execute(text(f"SET SESSION {name} = {int(options[name])}"))
+                applied.append(name)
+            except DBAPIError as e:
+                logging.warning(f"Could not set {name} for the bulk session: {e.orig}")
+                conn.rollback()
+        conn.commit()
+        logging.info(f"Bulk session enabled: {', '.join(f'{name}=0' for name in applied)}")
+        yield conn
+    finally:
+        try:
+            if conn.in_transaction():
+                conn.rollback()
+            for name in applied:
+                conn.execute(text(f"SET SESSION {name} = {int(previous[name])}"))
+            conn.commit()
+            logging.info("Bulk session settings restored")
+        except Exception as e:
+            logging.error(f"Failed to restore session settings; discarding the connection: {e}")
+            conn.invalidate()
+
+def get_secondary_index_definitions(engine, table_name):
+    """
+    FK에 쓰이지 않는 보조 인덱스들의 {이름: 정의}를 SHOW CREATE TABLE에서 그대로 가져옵니다.
+    FK 컬럼으로 시작하는 인덱스는 MySQL이 지우지 못하게 하므로 제외하고, UNIQUE 인덱스는 중복 검사를 위해 남깁니다.
+    """
+    foreign_key_columns = {foreign_key['constrained_columns'][0]
+                           for foreign_key in inspect(engine).get_foreign_keys(table_name)}
+    with engine.connect() as conn:
+        create_table = conn.execute(text(f"SHOW CREATE TABLE `{table_name}`")).one()[1]
+    indexes = {}
+    for line in create_table.splitlines():
+        match = SECONDARY_INDEX_PATTERN.match(line)
+        if not match:
+            continue
+        first_column = re.search(r"\(`([^`]+)`", match.group(1))
+        if first_column and first_column.group(1) in foreign_key_columns:
+            continue
+        indexes[match.group(2)] = match.group(1)
+    return indexes
+
+def drop_secondary_indexes(engine, table_name):
+    """
+    보조 인덱스를 ALTER TABLE 한 번으로 지우고 다시 만들 때 쓸 정의를 반환합니다.
+    실행이 중간에 죽어도 직접 다시 만들 수 있도록 정의를 로그에 남깁니다.
+    """
+    indexes = get_secondary_index_definitions(engine, table_name)
+    if not indexes:
+        return {}
+    logging.warning(f"Dropping secondary indexes of {table_name} for the bulk load: {list(indexes.values())}")
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE `{table_name}` " + ", ".join(f"DROP INDEX `{name}`" for name in indexes)))
+    return indexes
+
+def rebuild_indexes(engine, table_name, indexes):
+    """
+    drop_secondary_indexes로 지운 인덱스를 ALTER TABLE 한 번으로 다시 만듭니다. (테이블을 한 번만 훑음)
+    """
+    if not indexes:
+        return
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE `{table_name}` " + ", ".join(f"ADD {definition}" for definition in indexes.values())))
+    logging.info(f"Rebuilt {len(indexes)} secondary indexes of {table_name}")
+
+def get_unique_column_groups(engine, table_name):
+    """
+    PK와 unique 제약조건의 컬럼 묶음을 반환합니다. UNIQUE KEY (a, b)는 a, b 각각이 아니라 (a, b) 하나로 검사해야 합니다.
+    """
+    inspector = inspect(engine)
+    groups = [tuple(inspector.get_pk_constraint(table_name)['constrained_columns'])]
+    groups.extend(tuple(constraint['column_names']) for constraint in inspector.get_unique_constraints(table_name))
+    return list(dict.fromkeys(group for group in groups if group))
+
+def verify_constraints(engine, table_name, plan):
+    """
+    검사를 끄고 넣은 뒤 unique 제약조건의 중복과 FK 컬럼의 고아 행(부모가 없는 행)을 셉니다.
+    중복은 제약조건마다 GROUP BY 한 번으로 세고, 묶음 컬럼 중 NULL이 있는 행은 MySQL처럼 중복으로 보지 않습니다.
+    {'컬럼 이름' 또는 'a, b': 위반 행 수} 중 위반이 있는 것만 반환합니다.
+    """
+    violations = {}
+    with timed('verify', table_name), engine.connect() as conn:
+        for column in plan:
+            if not column.foreign_key:
+                continue
+            parent_table, parent_column = column.foreign_key
+            num = conn.execute(text(
+                f"SELECT COUNT(*) FROM `{table_name}` c LEFT JOIN `{parent_table}` p "
+                f"ON c.`{column.name}` = p.`{parent_column}` "
+                f"WHERE c.`{column.name}` IS NOT NULL AND p.`{parent_column}` IS NULL")).scalar()
+            if num:
+                violations[column.name] = int(num)
+        for group in get_unique_column_groups(engine, table_name):
+            columns = ", ".join(f"`{name}`" for name in group)
+            not_null = " AND ".join(f"`{name}` IS NOT NULL" for name in group)
+            num = conn.execute(text(
+                f"SELECT COALESCE(SUM(n - 1), 0) FROM (SELECT COUNT(*) AS n FROM `{table_name}` "
+                f"WHERE {not_null} GROUP BY {columns} HAVING COUNT(*) > 1) d")).scalar()
+            if num:
+                violations[", ".join(group)] = int(num)
+    if violations:
+        print(f"{table_name}에 제약조건을 위반한 행이 있습니다: {violations}")
+    else:
+        logging.info(f"Verified unique and foreign key constraints of {table_name}")
+    return violations
+
+def run_bulk_session(engine, table_name, plan, dummy_num, bulk_config, seed_table):
+    """
+    bulk_session 모드로 테이블 하나를 채웁니다. seed_table(session_options, commit_rows)가 실제로 데이터를 넣고,
+    drop_indexes가 켜져 있고 dummy_num이 충분히 크면 그 전후로 보조 인덱스를 지우고 다시 만듭니다.
+    인덱스 재생성은 적재가 실패해도 항상 실행하고, 제약조건 확인은 적재가 성공했을 때만 합니다.
+    검사를 끄고 넣은 행 중 중복이나 고아 행이 있으면 RuntimeError를 냅니다.
+    """
+    session_options = get_session_options(bulk_config)
+    if session_options is None:
+        return seed_table(None, None)
+    if engine.dialect.name != 'mysql':
+        logging.info(f"bulk_session is only available on MySQL; loading {table_name} normally with chunked commits")
+    indexes = {}
+    if (engine.dialect.name == 'mysql' and bulk_config.get('drop_indexes')
+            and dummy_num >= int(bulk_config.get('drop_indexes_min_rows', DEFAULT_DROP_INDEXES_MIN_ROWS))):
+        indexes = drop_secondary_indexes(engine, table_name)
+    try:
+        result = seed_table(session_options, get_commit_rows(bulk_config))
+    finally:
+        rebuild_indexes(engine, table_name, indexes)
+    # 적재 중에 난 예외를 확인 쿼리의 예외가 가리지 않도록 적재가 끝난 뒤에만 확인
+    violations = verify_constraints(engine, table_name, plan)
+    if violations:
+        raise RuntimeError(f"Constraint violations in {table_name} after the bulk load: {violations}")
+    return result
@@ -0,0 +1,135 @@
+# checkpoint.py
+import json
+import logging
+import os
+import threading
+import time
+import numpy as np
+import sqlalchemy as db
+from .insert_data import insert_batch, log_failure_summary, DEFAULT_BATCH_SIZE
+from .bulk_session import bulk_session
+from .db_utils import get_row_count
+from .metrics import timed
+from .pipeline import start_producer, DEFAULT_CHUNK_SIZE, DEFAULT_QUEUE_SIZE, _DONE
+
+# 체크포인트 저널 파일 형식 버전
+JOURNAL_VERSION = 2
+
+
+def open_journal(path, command, seed=None, resume=False):
+    """
+    체크포인트 저널을 엽니다. resume이면 기존 저널을 불러오고, 아니면 새 저널을 만듭니다.
+    저널은 {'path', 'data', 'lock'} dict이고, data는 실행 명령, 시드, 테이블별 진행 상태를 담습니다.
+    시드가 없으면 이어서 만들 때 같은 데이터가 나오도록 시드를 하나 만들어 저널에 기록합니다.
+    """
+    if resume:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No checkpoint journal to resume at {path}")
+        with open(path, 'r') as file:
+            data = json.load(file)
+        if data.get('version') != JOURNAL_VERSION:
+            raise ValueError(f"Checkpoint journal {path} was written by an incompatible version")
+        done = [name for name, table in data['tables'].items() if table['done']]
+        logging.info(f"Resuming '{data['command']}' run from {path} (seed={data['seed']}, completed tables: {done})")
+    else:
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % 2 ** 63)
+            logging.info(f"No seed given; using generated seed {seed} for the checkpointed run")
+        data = {'version': JOURNAL_VERSION, 'command': command, 'seed': seed, 'tables': {}}
+    journal = {'path': path, 'data': data, 'lock': threading.Lock()}
+    write_journal(journal)
+    return journal
+
+def write_journal(journal):
+    # 쓰는 도중 죽어도 이전 저널이 남도록 임시 파일에 쓰고 교체
+    with journal['lock']:
+        os.makedirs(os.path.dirname(journal['path']) or '.', exist_ok=True)
+        temp_path = f"{journal['path']}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(journal['data'], file)
+        os.replace(temp_path, journal['path'])
+
+def get_table_checkpoint(journal, table_name):
+    return journal['data']['tables'].get(table_name)
+
+def update_table_checkpoint(journal, table_name, **fields):
+    with journal['lock']:
+        journal['data']['tables'].setdefault(table_name, {}).update(fields)
+    write_journal(journal)
+
+def remove_journal(journal):
+    """
+    모든 테이블이 끝난 뒤 저널을 지웁니다.
+    """
+    if os.path.exists(journal['path']):
+        os.remove(journal['path'])
+    logging.info(f"Checkpointed run completed; removed journal {journal['path']}")
+
+def checkpointed_stream_dummy_data(table_name, dummy_num, metadata, engine, plan, journal, batch_size=DEFAULT_BATCH_SIZE,
+                                   chunk_size=DEFAULT_CHUNK_SIZE, queue_size=DEFAULT_QUEUE_SIZE, workers=1,
+                                   key_pools=None, existing_values=None, session_options=None):
+    """
+    stream_dummy_data처럼 생성과 insert를 동시에 하되, 청크마다 커밋하고 커밋이 끝난 청크까지의 생성 상태를 저널에 기록합니다.
+    저널에 이 테이블의 진행 상태가 있으면 마지막으로 커밋된 청크 다음부터 이어서 만들고,
+    시드, chunk_size, workers도 처음 실행 때 값을 그대로 써서 한 번에 끝까지 돌린 것과 같은 데이터를 넣습니다.
+    청크를 커밋하기 전에 그 청크까지의 상태를 pending으로 먼저 적어두므로, 커밋 직후 저널을 쓰기 전에 죽어도
+    이어서 만들 때 테이블 행 수로 그 청크가 커밋됐는지 확인해서 다시 넣지 않습니다. (그 사이 다른 곳에서 행을 넣지 않는다고 가정)
+    session_options가 있으면 적재하는 동안 커넥션의 세션 변수를 바꿉니다. (bulk_session 모드, 커밋은 원래 청크마다 함)
+    """
+    checkpoint = get_table_checkpoint(journal, table_name)
+    if checkpoint and checkpoint['done']:
+        logging.info(f"{table_name} was already completed in the checkpointed run; skipping")
+        return checkpoint['inserted']
+    if checkpoint:
+        dummy_num, chunk_size, workers = checkpoint['dummy_num'], checkpoint['chunk_size'], checkpoint['workers']
+        pending = checkpoint['pending']
+        if pending:
+            committed = get_row_count(engine, table_name) - checkpoint['base_rows']
+            if committed == pending['inserted']:
+                logging.info(f"The last chunk of {table_name} was committed before its checkpoint was written; skipping it")
+                checkpoint.update(inserted=pending['inserted'], state=pending['state'])
+            update_table_checkpoint(journal, table_name, inserted=checkpoint['inserted'], state=checkpoint['state'],
+                                    pending=None)
+        state = checkpoint['state'] or {'chunk': 0, 'rows': 0}
+        logging.info(f"Resuming {table_name} at chunk {state['chunk']} ({state['rows']}/{dummy_num} rows)")
+    else:
+        checkpoint = {'dummy_num': dummy_num, 'chunk_size': chunk_size, 'workers': workers, 'done': False,
+                      'inserted': 0, 'state': None, 'pending': None,
+                      'base_rows': get_row_count(engine, table_name)}
+        update_table_checkpoint(journal, table_name, **checkpoint)
+
+    chunk_queue, stop_event, producer = start_producer(
+        table_name, dummy_num, engine, plan, chunk_size, queue_size, journal['data']['seed'], workers, key_pools,
+        existing_values, resume_state=checkpoint['state'], with_state=True)
+    table = db.Table(table_name, metadata, autoload_with=engine)
+    batch_size = max(int(batch_size or DEFAULT_BATCH_SIZE), 1)
+    insert_num = checkpoint['inserted']
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn, bulk_session(conn, session_options):
+            while True:
+                item = chunk_queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                rows, state = item
+                chunk_num = 0
+                with conn.begin():
+                    with timed('insert', table_name):
+                        for offset in range(0, len(rows), batch_size):
+                            chunk_num += insert_batch(conn, table, table_name, rows[offset:offset + batch_size])
+                    # 커밋하기 전에 기록해둠. 커밋 후 아래 기록 전에 죽으면 이어서 만들 때 행 수로 커밋 여부를 판단함
+                    update_table_checkpoint(journal, table_name, pending={'inserted': insert_num + chunk_num, 'state': state})
+                insert_num += chunk_num
+                update_table_checkpoint(journal, table_name, inserted=insert_num, state=state, pending=None)
+    finally:
+        stop_event.set()
+        producer.join()
+        log_failure_summary(table_name)
+    update_table_checkpoint(journal, table_name, done=True)
+
+    elapsed = time.perf_counter() - start
+    logging.info(f"Inserted {insert_num} rows into {table_name} in {elapsed:.2f}s (checkpointed)")
+    print(f"{insert_num}개의 데이터를 {table_name}에 넣었습니다.")
+    return insert_num
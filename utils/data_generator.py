@@ -1,79 +1,487 @@
 # data_generator.py
-import random, string
+import os, string
+import logging
+import multiprocessing
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+from itertools import islice
+from decimal import Decimal
+import numpy as np
+import yaml
 from faker import Faker
-from .db_utils import get_existing_unique_values
-
-
-def generate_random_string(length):
-    # 문자와 숫자를 포함한 랜덤 문자열 생성
-    characters = string.ascii_letters + string.digits
-    return ''.join(random.choices(characters, k=length))
-
-def generate_dummy_data(data_dict, fake):
-    if data_dict.get('autoincrement'):
-        return 
-    
-    if data_dict.get('unique') or data_dict.get('primary_key'):
-        fake_instance = fake.unique
-    else: fake_instance=fake
-
-    # 다른 데이터 타입에 대한 처리
-    if data_dict['data_type'] == 'VARCHAR':
-        new_value = fake_instance.pystr(max_chars=data_dict['data_length'])
-    elif data_dict['data_type'] == 'CHAR':
-         new_value =fake_instance.pystr(max_chars=data_dict['data_length'])
-    elif data_dict['data_type'] == 'TEXT':
-        new_value = fake_instance.paragraph()
-    elif data_dict['data_type'] in ['INTEGER', 'MEDIUMINT', 'SMALLINT']:
-        new_value = fake_instance.pyint()
-    elif data_dict['data_type'] in ['FLOAT', 'DOUBLE']:
-        new_value = fake_instance.pyfloat(left_digits=2, right_digits=2, positive=True)
+from .db_utils import get_existing_unique_values, get_table_detail, get_missing_row_count
+from .unique_values import create_unique_filler
+from .snapshot import record_snapshot
+
+# 랜덤 문자열에 사용하는 문자 집합 (Faker pystr과 동일하게 영문 대소문자)
+STRING_ALPHABET = np.frombuffer(string.ascii_letters.encode(), dtype=np.uint8)
+# numpy int64로 한 번에 뽑을 수 있는 DECIMAL 최대 자릿수
+MAX_VECTOR_DECIMAL_DIGITS = 18
+# 길이 정보가 없는 VARCHAR/CHAR에 사용하는 기본 길이 (Faker pystr 기본값)
+DEFAULT_STRING_LENGTH = 20
+# fill 명령에서 넣은 뒤에도 행이 모자랄 때(중복 키 등으로 건너뛴 행) 다시 넣어보는 최대 횟수
+FILL_RETRIES = 3
+
+
+def get_column_info(row):
+    """
+    get_table_detail의 컬럼 정보에서 데이터 타입, 길이, 자릿수 등을 한 번만 뽑아냅니다.
+    """
+    data_dict = row.copy()
+    data = row['type']
+    data_dict['data_type'] = data.__class__.__name__
+    if data_dict['data_type'] in ['CHAR', 'VARCHAR']:
+        data_dict['data_length'] = data.length
     elif data_dict['data_type'] == 'DECIMAL':
-        new_value = fake_instance.pydecimal(left_digits=data_dict['data_left_digits'], right_digits=data_dict['data_right_digits'], positive=True)
-    elif data_dict['data_type'] == 'DATE':
-        new_value = fake_instance.date()
-    elif data_dict['data_type'] == 'TIME':
-        new_value = fake_instance.time()
-    elif data_dict['data_type'] in ['DATETIME', 'TIMESTAMP']:
-        new_value = fake_instance.date_time()
-    elif data_dict['data_type'] == 'YEAR':
-        new_value = fake_instance.year()
-    elif data_dict['data_type'] == 'BOOLEAN':
-        new_value = fake_instance.boolean()
+        data_dict['data_left_digits'] = data.precision - data.scale
+        data_dict['data_right_digits'] = data.scale
     elif data_dict['data_type'] == 'ENUM':
-        new_value = fake_instance.random_element(elements=data_dict['data_options'])
-    elif data_dict['data_type'] in ['BLOB', 'BINARY']:
-        new_value = fake_instance.binary(length=10)
+        data_dict['data_options'] = data.enums
+    elif data_dict['data_type'] == 'TINYINT':
+        data_dict['data_display_width'] = data.display_width
+    del data_dict['type']
+    return data_dict
+
+def generate_random_strings(rng, dummy_num, length):
+    """
+    길이가 length인 영문 랜덤 문자열 dummy_num개를 한 번에 만듭니다.
+    """
+    length = length or DEFAULT_STRING_LENGTH
+    codes = STRING_ALPHABET[rng.integers(0, len(STRING_ALPHABET), size=(dummy_num, length))]
+    return codes.view(f'S{length}').ravel().astype(f'U{length}').tolist()
+
+def generate_random_decimals(rng, dummy_num, left_digits, right_digits):
+    """
+    DECIMAL(left+right, right) 범위의 양수 Decimal 값을 dummy_num개 만듭니다.
+    int64 범위를 넘는 자릿수는 18자리씩 나눠서 뽑은 뒤 이어 붙입니다.
+    """
+    unscaled = [0] * dummy_num
+    remaining = left_digits + right_digits
+    while remaining > 0:
+        step = min(remaining, MAX_VECTOR_DECIMAL_DIGITS)
+        chunk = rng.integers(0, 10 ** step, size=dummy_num, dtype=np.int64).tolist()
+        unscaled = [value * 10 ** step + part for value, part in zip(unscaled, chunk)]
+        remaining -= step
+    return [Decimal(value or 1).scaleb(-right_digits) for value in unscaled]
+
+def generate_random_datetimes(rng, dummy_num, unit):
+    """
+    1970-01-01부터 오늘까지의 numpy datetime64 배열을 만듭니다. (Faker date/date_time과 같은 범위)
+    """
+    end = np.datetime64(date.today(), unit).astype(np.int64)
+    return rng.integers(0, end, size=dummy_num).astype(f'datetime64[{unit}]')
+
+def generate_string_column(dummy_num, fake, rng, data_length=None):
+    return generate_random_strings(rng, dummy_num, data_length)
+
+def generate_text_column(dummy_num, fake, rng):
+    return [fake.paragraph() for _ in range(dummy_num)]
+
+def generate_int_column(dummy_num, fake, rng):
+    return rng.integers(0, 10000, size=dummy_num).tolist()
+
+def generate_float_column(dummy_num, fake, rng):
+    return (rng.integers(1, 10000, size=dummy_num) / 100).tolist()
+
+def generate_decimal_column(dummy_num, fake, rng, data_left_digits, data_right_digits):
+    return generate_random_decimals(rng, dummy_num, data_left_digits, data_right_digits)
+
+def generate_date_column(dummy_num, fake, rng):
+    return generate_random_datetimes(rng, dummy_num, 'D').astype(str).tolist()
+
+def generate_time_column(dummy_num, fake, rng):
+    seconds = rng.integers(0, 24 * 60 * 60, size=dummy_num)
+    return [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in seconds.tolist()]
+
+def generate_datetime_column(dummy_num, fake, rng):
+    return generate_random_datetimes(rng, dummy_num, 's').astype(object).tolist()
+
+def generate_year_column(dummy_num, fake, rng):
+    return generate_random_datetimes(rng, dummy_num, 'Y').astype(str).tolist()
+
+def generate_boolean_column(dummy_num, fake, rng):
+    return (rng.random(dummy_num) < 0.5).tolist()
+
+def generate_enum_column(dummy_num, fake, rng, data_options):
+    options = list(data_options)
+    return [options[i] for i in rng.integers(0, len(options), size=dummy_num).tolist()]
+
+def generate_binary_column(dummy_num, fake, rng):
+    raw = rng.bytes(dummy_num * 10)
+    return [raw[i:i + 10] for i in range(0, dummy_num * 10, 10)]
+
+def generate_null_column(dummy_num, fake, rng, **params):
+    # 지원하지 않는 타입은 기존처럼 None으로 채움
+    return [None] * dummy_num
+
+# 데이터 타입별 컬럼 생성 함수
+COLUMN_GENERATORS = {
+    'VARCHAR': generate_string_column,
+    'CHAR': generate_string_column,
+    'TEXT': generate_text_column,
+    'INTEGER': generate_int_column,
+    'MEDIUMINT': generate_int_column,
+    'SMALLINT': generate_int_column,
+    'FLOAT': generate_float_column,
+    'DOUBLE': generate_float_column,
+    'DECIMAL': generate_decimal_column,
+    'DATE': generate_date_column,
+    'TIME': generate_time_column,
+    'DATETIME': generate_datetime_column,
+    'TIMESTAMP': generate_datetime_column,
+    'YEAR': generate_year_column,
+    'BOOLEAN': generate_boolean_column,
+    'ENUM': generate_enum_column,
+    'BLOB': generate_binary_column,
+    'BINARY': generate_binary_column,
+}
+
+# 컬럼 플랜: 컬럼 이름, 타입, 생성 파라미터, unique 여부, 파라미터가 바인딩된 생성 함수, FK가 가리키는 (부모 테이블, 부모 컬럼)
+ColumnPlan = namedtuple('ColumnPlan', ['name', 'data_type', 'params', 'unique', 'generator', 'foreign_key'], defaults=(None,))
+# low부터 high까지 연속된 정수 키 풀 (auto_increment 부모). 키 배열을 만들지 않고 범위에서 바로 뽑음
+KeyRange = namedtuple('KeyRange', ['low', 'high'])
+# 컬럼 플랜 캐시 파일 형식 버전. 버전이 다른 캐시는 무시하고 다시 만듦
+COLUMN_PLAN_CACHE_VERSION = 4
+
+def make_column_plan(name, data_type, params, unique, foreign_key=None):
+    if foreign_key:
+        # FK 컬럼은 생성 후 부모 키 풀에서 채우므로 자리만 잡아둠
+        foreign_key = tuple(foreign_key)
+        generator = partial(generate_null_column)
+    elif unique:
+        # unique/primary key 컬럼은 생성 후 create_unique_filler가 중복 없이 채우므로 자리만 잡아둠
+        generator = partial(generate_null_column)
     else:
-        return None
+        generator = partial(COLUMN_GENERATORS.get(data_type, generate_null_column), **params)
+    return ColumnPlan(name, data_type, params, unique, generator, foreign_key)
 
-    return new_value
+def get_composite_unique_columns(details, unique_constraints=None):
+    """
+    여러 컬럼으로 된 unique 제약조건과 PK마다 중복 없이 만들 컬럼 하나를 골라서, 묶음의 값 조합이 겹치지 않게 합니다.
+    묶음에 이미 중복 없이 만드는 컬럼(한 컬럼 unique/PK, autoincrement)이 있으면 고르지 않습니다.
+    FK가 아닌 컬럼을 먼저 고르고, 묶음이 전부 FK 컬럼이면 첫 컬럼을 섞어둔 부모 키 풀에서 차례로 씁니다.
+    """
+    columns = {row['name']: row for row in details}
+    primary_keys = [row['name'] for row in details if row.get('primary_key')]
+    groups = [constraint['column_names'] for constraint in unique_constraints or []]
+    if len(primary_keys) > 1:
+        groups.append(primary_keys)
+    selected = set()
+    for group in groups:
+        group = [name for name in group if name in columns]
+        if len(group) < 2:
+            continue
+        if any(name in selected or columns[name].get('unique') or columns[name].get('autoincrement')
+               or (columns[name].get('primary_key') and len(primary_keys) == 1) for name in group):
+            continue
+        candidates = [name for name in group if not columns[name].get('foreign_key')] or group
+        selected.add(candidates[0])
+    return selected
 
-def create_dummy_data_list(table_name, dummy_num, table_detail, engine):
-    datas = []
+def build_table_plan(details, unique_constraints=None):
+    """
+    get_table_detail의 컬럼 목록으로 테이블의 컬럼 플랜(튜플)을 만듭니다. autoincrement 컬럼은 제외합니다.
+    unique_constraints(get_table_detail의 여러 컬럼 제약조건)는 get_composite_unique_columns가 고른 컬럼만 unique로 만듭니다.
+    """
+    composite_unique_columns = get_composite_unique_columns(details, unique_constraints)
+    # 여러 컬럼 PK는 각 컬럼이 아니라 조합이 unique이므로 한 컬럼 PK만 컬럼 자체를 unique로 만듦
+    single_primary_key = sum(1 for row in details if row.get('primary_key')) == 1
+    plan = []
+    for row in details:
+        if row.get('autoincrement'):
+            continue
+        data_dict = get_column_info(row)
+        data_type = data_dict['data_type']
+        params = {}
+        if data_type in ['CHAR', 'VARCHAR']:
+            params['data_length'] = data_dict['data_length']
+        elif data_type == 'DECIMAL':
+            params['data_left_digits'] = data_dict['data_left_digits']
+            params['data_right_digits'] = data_dict['data_right_digits']
+        elif data_type == 'ENUM':
+            params['data_options'] = list(data_dict['data_options'])
+        unique = bool(data_dict.get('unique') or (data_dict.get('primary_key') and single_primary_key)
+                      or data_dict['name'] in composite_unique_columns)
+        plan.append(make_column_plan(data_dict['name'], data_type, params, unique, data_dict.get('foreign_key')))
+    return tuple(plan)
+
+def build_column_plans(table_detail):
+    return {table_name: build_table_plan(detail['details'], detail.get('unique_constraints'))
+            for table_name, detail in table_detail.items()}
+
+def save_column_plans(plans, file_path, fingerprints=None):
+    """
+    컬럼 플랜을 yaml 파일로 저장합니다. 생성 함수는 저장하지 않고 불러올 때 다시 바인딩합니다.
+    fingerprints({테이블 이름: 스키마 지문})를 같이 저장해서 다음 실행에서 DDL 변경을 감지합니다.
+    이번에 지문을 구하지 않은 테이블은 기존 캐시의 지문을 유지합니다.
+    """
+    saved_fingerprints = {}
+    if os.path.exists(file_path):
+        with open(file_path, 'r') as file:
+            saved_fingerprints = (yaml.safe_load(file) or {}).get('fingerprints') or {}
+    saved_fingerprints.update(fingerprints or {})
+    data = {
+        'version': COLUMN_PLAN_CACHE_VERSION,
+        'fingerprints': {table_name: saved_fingerprints.get(table_name) for table_name in plans},
+        'tables': {
+            table_name: [
+                {'name': column.name, 'data_type': column.data_type, 'params': column.params, 'unique': column.unique,
+                 'foreign_key': list(column.foreign_key) if column.foreign_key else None}
+                for column in plan
+            ]
+            for table_name, plan in plans.items()
+        },
+    }
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    with open(file_path, 'w') as file:
+        yaml.safe_dump(data, file, default_flow_style=False, allow_unicode=True)
+    logging.info(f"Saved column plans for {len(plans)} tables to {file_path}")
+
+def load_column_plans(file_path, fingerprints=None):
+    """
+    캐시 파일에서 컬럼 플랜을 불러옵니다. fingerprints가 주어지면 저장된 지문과 다른(스키마가 바뀐) 테이블은 버립니다.
+    """
+    with open(file_path, 'r') as file:
+        data = yaml.safe_load(file) or {}
+    if data.get('version') != COLUMN_PLAN_CACHE_VERSION:
+        logging.info(f"Ignoring column plan cache {file_path} written by an older version")
+        return {}
+    tables = data.get('tables') or {}
+    if fingerprints:
+        cached_fingerprints = data.get('fingerprints') or {}
+        changed_tables = [table_name for table_name in tables if table_name in fingerprints
+                          and cached_fingerprints.get(table_name) != fingerprints[table_name]]
+        if changed_tables:
+            logging.info(f"Schema changed for {changed_tables}; rebuilding their column plans")
+        tables = {table_name: columns for table_name, columns in tables.items() if table_name not in changed_tables}
+    logging.info(f"Loaded column plans for {len(tables)} tables from {file_path}")
+    return {
+        table_name: tuple(
+            make_column_plan(column['name'], column['data_type'], column.get('params') or {}, column.get('unique', False),
+                             column.get('foreign_key'))
+            for column in columns
+        )
+        for table_name, columns in tables.items()
+    }
+
+def load_or_build_column_plans(engine, table_names, cache_path=None, fingerprints=None):
+    """
+    캐시 파일이 있으면 컬럼 플랜을 불러오고, 없거나 스키마 지문이 바뀐 테이블만 리플렉션해서 플랜을 만든 뒤 캐시에 저장합니다.
+    """
+    plans = {}
+    if cache_path and os.path.exists(cache_path):
+        plans = load_column_plans(cache_path, fingerprints)
+    missing_tables = [table_name for table_name in table_names if table_name not in plans]
+    if missing_tables:
+        plans.update(build_column_plans(get_table_detail(engine, missing_tables)))
+        if cache_path:
+            save_column_plans(plans, cache_path, fingerprints)
+    return plans
+
+def load_existing_unique_values(table_name, plan, engine):
+    """
+    insert/fill 명령에서 새 unique 값이 기존 행과 겹치지 않도록 unique 컬럼들의 기존 값을 읽어옵니다.
+    """
+    return {
+        column.name: get_existing_unique_values(table_name, column.name, engine, column.data_type, column.params)
+        for column in plan
+        if column.unique and not column.foreign_key
+    }
+
+def iter_missing_rows(table_name, plan, engine, target, retries=FILL_RETRIES):
+    """
+    fill 명령: 넣고 난 뒤 행 수를 COUNT(*)로 다시 세어서 target보다 모자라면 (모자란 행 수, 다시 읽은 unique 기존 값, 시도 번호)를 내줍니다.
+    호출하는 쪽은 그만큼 더 넣고, retries번 더 넣어도 모자라면 모자란 행 수를 로그와 출력으로 알리고 끝납니다.
+    """
+    for attempt in range(1, retries + 1):
+        missing = get_missing_row_count(engine, table_name, target)
+        if missing == 0:
+            return
+        logging.warning(f"{table_name} is {missing} rows short of {target}; topping up (attempt {attempt}/{retries})")
+        yield missing, load_existing_unique_values(table_name, plan, engine), attempt
+    missing = get_missing_row_count(engine, table_name, target)
+    if missing:
+        logging.error(f"{table_name} is still {missing} rows short of {target} after {retries} top-up attempts")
+        print(f"{table_name}을 {target}개까지 채우지 못했습니다. ({missing}개 부족)")
+
+def build_rows(plan, dummy_num, fake, rng):
+    names = [column.name for column in plan]
+    columns = [column.generator(dummy_num, fake, rng) for column in plan]
+
+    if not columns:
+        return [{} for _ in range(dummy_num)]
+    # 마지막에 컬럼들을 행 단위 dict로 조립
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+def create_generators(seed=None):
     fake = Faker()
+    if seed is not None:
+        fake.seed_instance(seed)
+    return fake, np.random.default_rng(seed)
+
+def create_dummy_data_list(table_name, dummy_num, table_detail, engine, seed=None, plan=None,
+                           key_pools=None, existing_values=None, snapshot_path=None):
+    # 한 청크로 전부 만들어서 리스트로 반환. snapshot_path가 있으면 스냅샷 파일로도 저장
+    if plan is None:
+        plan = build_table_plan(table_detail[table_name]['details'], table_detail[table_name].get('unique_constraints'))
+    chunks = generate_dummy_data_chunks(table_name, dummy_num, table_detail, engine, max(dummy_num, 1),
+                                        seed, plan, key_pools, existing_values)
+    if snapshot_path:
+        chunks = record_snapshot(chunks, snapshot_path, plan)
+    return [row for chunk in chunks for row in chunk]
+
+def create_foreign_key_filler(plan, key_pools, rng):
+    """
+    FK 컬럼을 부모 키 풀에서 뽑아 채우는 함수를 만듭니다.
+    일반 FK 컬럼은 풀에서 복원 추출하고, unique FK 컬럼은 섞어둔 풀을 앞에서부터 차례로 사용해 청크 사이에서도 겹치지 않습니다.
+    풀은 키 배열 또는 KeyRange이고, KeyRange는 unique FK 컬럼일 때만 키 배열로 펼칩니다.
+    풀이 비어 있거나 unique 풀을 다 쓰면 None을 넣습니다.
+    """
+    key_pools = key_pools or {}
+    fk_columns = []
+    for column in plan:
+        if not column.foreign_key:
+            continue
+        keys = key_pools.get(column.foreign_key)
+        key_count = keys.high - keys.low + 1 if isinstance(keys, KeyRange) else len(keys) if keys is not None else 0
+        if key_count <= 0:
+            logging.warning(f"No parent keys in {column.foreign_key[0]}.{column.foreign_key[1]} for column {column.name}")
+            keys = None
+        elif column.unique and isinstance(keys, KeyRange):
+            keys = rng.permutation(key_count) + keys.low
+        elif column.unique:
+            keys = rng.permutation(keys)
+        # [컬럼 이름, unique 여부, 키 배열, unique 풀에서 다음에 쓸 위치]
+        fk_columns.append([column.name, column.unique, keys, 0])
+
+    def fill(rows):
+        dummy_num = len(rows)
+        for entry in fk_columns:
+            name, unique, keys, cursor = entry
+            if keys is None:
+                values = [None] * dummy_num
+            elif unique:
+                values = keys[cursor:cursor + dummy_num].tolist()
+                values += [None] * (dummy_num - len(values))
+                entry[3] = cursor + dummy_num
+            elif isinstance(keys, KeyRange):
+                values = rng.integers(keys.low, keys.high + 1, size=dummy_num).tolist()
+            else:
+                values = keys[rng.integers(0, len(keys), size=dummy_num)].tolist()
+            for row, value in zip(rows, values):
+                row[name] = value
+        return rows
+
+    # 체크포인트용: unique FK 컬럼의 다음 위치를 저장하고 복원함
+    def get_state():
+        return [entry[3] for entry in fk_columns]
+
+    def set_state(cursors):
+        for entry, cursor in zip(fk_columns, cursors):
+            entry[3] = cursor
+
+    fill.get_state = get_state
+    fill.set_state = set_state
+    return fill
+
+def get_generator_state(chunk, rows, rng, fake, fill_unique_values, fill_foreign_keys):
+    """
+    chunk번째 청크부터 똑같은 데이터를 이어서 만들 수 있도록 생성 상태를 json으로 저장할 수 있는 dict로 만듭니다.
+    """
+    return {
+        'chunk': chunk,
+        'rows': rows,
+        'rng': rng.bit_generator.state,
+        'faker': list(fake.random.getstate()) if fake is not None else None,
+        'unique': fill_unique_values.get_state(),
+        'foreign_keys': fill_foreign_keys.get_state(),
+    }
+
+def restore_generator_state(state, rng, fake, fill_unique_values, fill_foreign_keys):
+    rng.bit_generator.state = state['rng']
+    if fake is not None and state.get('faker'):
+        version, internal_state, gauss_next = state['faker']
+        fake.random.setstate((version, tuple(internal_state), gauss_next))
+    fill_unique_values.set_state(state['unique'])
+    fill_foreign_keys.set_state(state['foreign_keys'])
+
+def generate_dummy_data_chunks(table_name, dummy_num, table_detail, engine, chunk_size, seed=None, plan=None,
+                               key_pools=None, existing_values=None, resume_state=None, with_state=False):
+    """
+    dummy_num개의 더미 데이터를 chunk_size개씩 나눠서 yield 합니다.
+    unique 컬럼과 FK 컬럼을 채우는 상태는 청크 사이에 공유하므로 전체 청크에 걸쳐 중복되지 않습니다.
+    with_state가 True면 (청크, 다음 청크부터 이어서 만들 수 있는 생성 상태)를 yield 하고,
+    resume_state로 그 상태를 주면 같은 시드로 처음부터 만든 것과 똑같은 나머지 청크들을 만듭니다.
+    """
+    fake, rng = create_generators(seed)
+    if plan is None:
+        plan = build_table_plan(table_detail[table_name]['details'], table_detail[table_name].get('unique_constraints'))
+    fill_unique_values = create_unique_filler(table_name, plan, dummy_num, rng, existing_values)
+    fill_foreign_keys = create_foreign_key_filler(plan, key_pools, rng)
+    chunk, done = 0, 0
+    if resume_state:
+        restore_generator_state(resume_state, rng, fake, fill_unique_values, fill_foreign_keys)
+        chunk, done = resume_state['chunk'], resume_state['rows']
+    while done < dummy_num:
+        size = min(chunk_size, dummy_num - done)
+        rows = fill_foreign_keys(fill_unique_values(build_rows(plan, size, fake, rng)))
+        chunk, done = chunk + 1, done + size
+        if with_state:
+            yield rows, get_generator_state(chunk, done, rng, fake, fill_unique_values, fill_foreign_keys)
+        else:
+            yield rows
+
+def generate_shard(plan, dummy_num, seed):
+    """
+    워커 프로세스에서 실행: 주어진 시드로 dummy_num개의 행을 만듭니다.
+    """
+    fake, rng = create_generators(seed)
+    return build_rows(plan, dummy_num, fake, rng)
+
+def derive_shard_seeds(seed, shard_count):
+    """
+    마스터 시드에서 샤드별 시드를 만듭니다. 같은 마스터 시드면 항상 같은 시드 목록이 나옵니다.
+    """
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(shard_count)]
+
+def generate_dummy_data_chunks_parallel(table_name, dummy_num, table_detail, engine, chunk_size, workers, seed=None, plan=None,
+                                        key_pools=None, existing_values=None, resume_state=None, with_state=False):
+    """
+    청크를 여러 프로세스에서 나눠 생성하고 순서대로 yield 합니다.
+    청크마다 마스터 시드에서 파생한 시드를 쓰므로 같은 시드와 청크 크기라면 항상 같은 데이터가 나옵니다.
+    미리 제출하는 청크 수를 workers * 2개로 제한해서 메모리 사용량은 일정하게 유지됩니다.
+    with_state, resume_state는 generate_dummy_data_chunks와 같습니다.
+    """
+    if plan is None:
+        plan = build_table_plan(table_detail[table_name]['details'], table_detail[table_name].get('unique_constraints'))
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+        logging.info(f"No seed given for {table_name}; using generated seed {seed}")
+    chunk_sizes = [min(chunk_size, dummy_num - start) for start in range(0, dummy_num, chunk_size)]
+    shard_seeds = derive_shard_seeds(seed, len(chunk_sizes) + 1)
+    # 마지막 시드는 부모 프로세스에서 unique/FK 컬럼을 채울 때 사용. 이 컬럼들은 샤드 전체에 걸쳐 중복되면 안 되므로 부모에서 채움
+    rng = np.random.default_rng(shard_seeds[-1])
+    fill_unique_values = create_unique_filler(table_name, plan, dummy_num, rng, existing_values)
+    fill_foreign_keys = create_foreign_key_filler(plan, key_pools, rng)
+    chunk, done = 0, 0
+    if resume_state:
+        restore_generator_state(resume_state, rng, None, fill_unique_values, fill_foreign_keys)
+        chunk, done = resume_state['chunk'], resume_state['rows']
 
-    for _ in range(dummy_num):
-        temp = {}
-        for row in table_detail[table_name]['details']:
-            data_dict = row.copy()
-            if data_dict.get('autoincrement'):
-                continue
-            data = row['type']
-            data_dict['data_type'] = data.__class__.__name__
-            if data_dict['data_type'] in ['CHAR', 'VARCHAR']:
-                data_dict['data_length'] = data.length
-            elif data_dict['data_type'] == 'DECIMAL':
-                data_dict['data_left_digits'] = data.precision - data.scale
-                data_dict['data_right_digits'] = data.scale
-            elif data_dict['data_type'] == 'ENUM':
-                data_dict['data_options'] = data.enums
-            elif data_dict['data_type'] == 'TINYINT':
-                data_dict['data_display_width'] = data.display_width
-            del data_dict['type']
-
-            dummy_data = generate_dummy_data(data_dict, fake)
-            temp[data_dict['name']] = dummy_data
-        datas.append(temp)
-
-    return datas
\ No newline at end of file
+    # 생성 스레드 안에서 fork하면 락이 꼬일 수 있어서 spawn으로 워커를 띄움
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        shards = islice(zip(chunk_sizes, shard_seeds), chunk, None)
+        pending = deque(executor.submit(generate_shard, plan, size, shard_seed)
+                        for size, shard_seed in islice(shards, workers * 2))
+        while pending:
+            rows = pending.popleft().result()
+            for size, shard_seed in islice(shards, 1):
+                pending.append(executor.submit(generate_shard, plan, size, shard_seed))
+            rows = fill_foreign_keys(fill_unique_values(rows))
+            chunk, done = chunk + 1, done + len(rows)
+            if with_state:
+                yield rows, get_generator_state(chunk, done, rng, None, fill_unique_values, fill_foreign_keys)
+            else:
+                yield rows
@@ -2,6 +2,7 @@ import yaml
 import sqlalchemy as db
 from sqlalchemy import inspect
 import logging
+from .engine_pool import get_engine, get_pool_options
 
 def load_settings(file_path):
     """
@@ -29,29 +30,33 @@ def load_connection_config(file_path):
         logging.error(f"Failed to load connection config from {file_path}: {e}", exc_info=True)
         raise
 
-def create_engine_connection(config):
+def create_engine_connection(config, pool_size=None):
     """
-    데이터베이스 엔진을 생성합니다.
+    데이터베이스 엔진을 가져옵니다. 커넥션 풀 설정은 connection.yaml의 database 항목에서 읽고,
+    pool_size가 주어지면 최소한 동시에 쓰는 스레드 수만큼 커넥션 풀을 잡습니다.
     """
     try:
         db_config = config['database']
         base_url = f"{db_config['type']}+{db_config['driver']}://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/"
         database_name = db_config['database_name']
         connection_string = f"{base_url}{database_name}"
-        engine = db.create_engine(connection_string)
+        engine_options = get_pool_options(db_config)
+        if pool_size:
+            engine_options['pool_size'] = max(int(pool_size), engine_options.get('pool_size', 5))
+        engine = get_engine(connection_string, **engine_options)
         logging.info(f"Created database engine for {database_name}")
         return engine
     except Exception as e:
         logging.error(f"Failed to create database engine: {e}", exc_info=True)
         raise
 
-def setup_database(connection_config):
+def setup_database(connection_config, pool_size=None):
     """
-    데이터베이스 엔진과 메타데이터를 설정하고 테이블 정보를 가져옵니다.
+    데이터베이스 엔진을 설정하고 테이블 정보를 가져옵니다.
+    메타데이터는 비어 있는 채로 반환하고, 채울 테이블의 메타데이터는 schema_cache.load_schema로 가져옵니다.
     """
-    engine = create_engine_connection(connection_config)
+    engine = create_engine_connection(connection_config, pool_size)
     metadata = db.MetaData()
-    metadata.reflect(bind=engine)
     inspector = inspect(engine)
 
     tables = inspector.get_table_names()
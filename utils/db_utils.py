@@ -1,11 +1,27 @@
-from sqlalchemy import create_engine, inspect, text
+import os
+import re
+import logging
+from contextlib import closing
+import numpy as np
+from sqlalchemy import create_engine, inspect, text, bindparam
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql import sqltypes
+from .unique_values import decode_existing_values
+from .metrics import timed
+
+# enum('a','b') 형식의 COLUMN_TYPE에서 옵션 값들을 뽑아내는 패턴
+ENUM_OPTION_PATTERN = re.compile(r"'((?:[^']|'')*)'")
+DISPLAY_WIDTH_PATTERN = re.compile(r'\((\d+)\)')
+# 뷰어가 한 번에 읽고 출력하는 행 수
+DEFAULT_PAGE_SIZE = 1000
+# unique 컬럼의 기존 값을 읽을 때 서버 사이드 커서에서 한 번에 가져오는 행 수
+EXISTING_VALUES_FETCH_SIZE = 10000
 
-<<<<<<< Updated upstream:utils/db_utils.py
 def create_engine_connection(base_url, database_name):
     connection_string = f"{base_url}{database_name}"
     engine = create_engine(connection_string, echo=False)
     return engine
-=======
+
 def check_yaml_exists(db_names, server_name):
     missing_yaml_files = []
     for db_name in db_names:
@@ -13,84 +29,299 @@ def check_yaml_exists(db_names, server_name):
         if not os.path.exists(yaml_filename):
             missing_yaml_files.append(db_name)
     return missing_yaml_files
->>>>>>> Stashed changes:DummyGenerator/utils/db_utils.py
+
+def parse_column_type(dialect, row):
+    """
+    INFORMATION_SCHEMA.COLUMNS의 한 행으로 인스펙터가 만드는 것과 같은 SQLAlchemy 타입 객체를 만듭니다.
+    """
+    type_class = dialect.ischema_names.get(row['DATA_TYPE'].lower())
+    if type_class is None:
+        logging.warning(f"Unknown column type {row['COLUMN_TYPE']} for {row['TABLE_NAME']}.{row['COLUMN_NAME']}")
+        return sqltypes.NULLTYPE
+    if type_class.__name__ in ['CHAR', 'VARCHAR']:
+        return type_class(row['CHARACTER_MAXIMUM_LENGTH'])
+    elif type_class.__name__ == 'DECIMAL':
+        return type_class(precision=row['NUMERIC_PRECISION'], scale=row['NUMERIC_SCALE'])
+    elif type_class.__name__ in ['ENUM', 'SET']:
+        # enum('a','b''c') -> ['a', "b'c"]
+        options = [value.replace("''", "'") for value in ENUM_OPTION_PATTERN.findall(row['COLUMN_TYPE'])]
+        return type_class(*options)
+    elif type_class.__name__ == 'TINYINT':
+        display_width = DISPLAY_WIDTH_PATTERN.search(row['COLUMN_TYPE'])
+        return type_class(display_width=int(display_width.group(1)) if display_width else None)
+    return type_class()
+
+def get_schema_detail(engine, tables):
+    """
+    INFORMATION_SCHEMA 쿼리 두 번으로 스키마 전체의 컬럼, PK, unique, FK, auto_increment 정보를 가져와서
+    get_table_detail과 같은 형식의 table_detail을 만듭니다. (MySQL 전용)
+    여러 컬럼 unique 제약조건은 unique_constraints에 묶음으로 남기고, 컬럼의 unique는 한 컬럼 제약조건에만 표시합니다.
+    """
+    columns_query = text("""
+        SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, COLUMN_TYPE, IS_NULLABLE, COLUMN_DEFAULT, EXTRA,
+               CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE, COLUMN_COMMENT
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME IN :table_names
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
+    """).bindparams(bindparam('table_names', expanding=True))
+    # PRIMARY KEY, UNIQUE, FOREIGN KEY 제약조건의 컬럼들
+    constraints_query = text("""
+        SELECT k.TABLE_NAME, k.CONSTRAINT_NAME, c.CONSTRAINT_TYPE, k.COLUMN_NAME,
+               k.REFERENCED_TABLE_NAME, k.REFERENCED_COLUMN_NAME
+        FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE k
+        JOIN INFORMATION_SCHEMA.TABLE_CONSTRAINTS c
+          ON c.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA
+         AND c.TABLE_NAME = k.TABLE_NAME
+         AND c.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+        WHERE k.TABLE_SCHEMA = DATABASE()
+        AND k.TABLE_NAME IN :table_names
+        ORDER BY k.TABLE_NAME, k.CONSTRAINT_NAME, k.ORDINAL_POSITION
+    """).bindparams(bindparam('table_names', expanding=True))
+
+    tables = list(tables)
+    if not tables:
+        return {}
+    with engine.connect() as connection:
+        column_rows = connection.execute(columns_query, {'table_names': tables}).mappings().all()
+        constraint_rows = connection.execute(constraints_query, {'table_names': tables}).mappings().all()
+
+    primary_keys = {table: set() for table in tables}
+    # 테이블 이름 -> {제약조건 이름: 컬럼 이름 리스트 (제약조건 안의 순서대로)}
+    unique_constraints = {table: {} for table in tables}
+    # 테이블 이름 -> {제약조건 이름: 인스펙터 get_foreign_keys 형식의 dict}
+    foreign_keys = {table: {} for table in tables}
+    for row in constraint_rows:
+        table = row['TABLE_NAME']
+        if row['CONSTRAINT_TYPE'] == 'PRIMARY KEY':
+            primary_keys[table].add(row['COLUMN_NAME'])
+        elif row['CONSTRAINT_TYPE'] == 'UNIQUE':
+            unique_constraints[table].setdefault(row['CONSTRAINT_NAME'], []).append(row['COLUMN_NAME'])
+        elif row['CONSTRAINT_TYPE'] == 'FOREIGN KEY':
+            foreign_key = foreign_keys[table].setdefault(row['CONSTRAINT_NAME'], {
+                'name': row['CONSTRAINT_NAME'],
+                'constrained_columns': [],
+                'referred_schema': None,
+                'referred_table': row['REFERENCED_TABLE_NAME'],
+                'referred_columns': [],
+            })
+            foreign_key['constrained_columns'].append(row['COLUMN_NAME'])
+            foreign_key['referred_columns'].append(row['REFERENCED_COLUMN_NAME'])
+
+    table_detail = {}
+    for row in column_rows:
+        table = row['TABLE_NAME']
+        if table not in table_detail:
+            table_detail[table] = {
+                'details': [],
+                'foreign_keys': list(foreign_keys[table].values()),
+                'unique_constraints': [{'name': name, 'column_names': column_names}
+                                       for name, column_names in unique_constraints[table].items()],
+            }
+        unique_columns = {column_names[0] for column_names in unique_constraints[table].values() if len(column_names) == 1}
+        foreign_key_columns = {
+            column_name: (foreign_key['referred_table'], referred_column)
+            for foreign_key in foreign_keys[table].values()
+            for column_name, referred_column in zip(foreign_key['constrained_columns'], foreign_key['referred_columns'])
+        }
+        column_name = row['COLUMN_NAME']
+        table_detail[table]['details'].append({
+            'name': column_name,
+            'type': parse_column_type(engine.dialect, row),
+            'nullable': row['IS_NULLABLE'] == 'YES',
+            'default': row['COLUMN_DEFAULT'],
+            'comment': row['COLUMN_COMMENT'] or None,
+            'primary_key': column_name in primary_keys[table],
+            'unique': column_name in unique_columns,
+            'autoincrement': 'auto_increment' in (row['EXTRA'] or '').lower(),
+            'foreign_key': foreign_key_columns.get(column_name),
+        })
+
+    missing_tables = [table for table in tables if table not in table_detail]
+    if missing_tables:
+        logging.warning(f"Tables not found in INFORMATION_SCHEMA: {missing_tables}")
+    logging.info(f"Reflected {len(table_detail)} tables with {len(column_rows)} columns from INFORMATION_SCHEMA")
+    return table_detail
 
 def get_table_detail(engine, tables):
+    """
+    테이블별 컬럼 정보를 가져옵니다. MySQL이면 INFORMATION_SCHEMA 일괄 조회를 쓰고,
+    다른 DB에서는 테이블마다 인스펙터를 호출합니다.
+    """
+    if engine.dialect.name == 'mysql':
+        return get_schema_detail(engine, tables)
+
     inspector = inspect(engine)
     table_detail = {}
-<<<<<<< Updated upstream:utils/db_utils.py
 
-=======
->>>>>>> Stashed changes:DummyGenerator/utils/db_utils.py
     for table in tables:
         columns = inspector.get_columns(table)
         primary_keys = set(inspector.get_pk_constraint(table)['constrained_columns'])
         unique_constraints = inspector.get_unique_constraints(table)
+        # UNIQUE (a, b)는 a, b 각각이 unique인 것이 아니므로 한 컬럼 제약조건만 컬럼에 표시
         unique_column_names = set(
-            column_name
+            constraint['column_names'][0]
             for constraint in unique_constraints
-            for column_name in constraint['column_names']
+            if len(constraint['column_names']) == 1
         )
-<<<<<<< Updated upstream:utils/db_utils.py
-
-=======
->>>>>>> Stashed changes:DummyGenerator/utils/db_utils.py
-        with engine.connect() as connection:
-            auto_increment_query = text("""
-                SELECT COLUMN_NAME 
-                FROM INFORMATION_SCHEMA.COLUMNS 
-                WHERE TABLE_SCHEMA = DATABASE() 
-                AND TABLE_NAME = :table_name 
-                AND EXTRA LIKE '%auto_increment%'
-            """)
-            result = connection.execute(auto_increment_query, {'table_name': table})
-            auto_increment_columns = {row[0] for row in result}
+        foreign_keys = inspector.get_foreign_keys(table)
+        # 컬럼 이름 -> (부모 테이블, 부모 컬럼)
+        foreign_key_columns = {
+            column_name: (foreign_key['referred_table'], referred_column)
+            for foreign_key in foreign_keys
+            for column_name, referred_column in zip(foreign_key['constrained_columns'], foreign_key['referred_columns'])
+        }
 
         temp = []
         for column in columns:
             column_name = column['name']
             column['primary_key'] = column_name in primary_keys
             column['unique'] = column_name in unique_column_names
-            column['autoincrement'] = column_name in auto_increment_columns
+            column['autoincrement'] = column.get('autoincrement') is True
+            column['foreign_key'] = foreign_key_columns.get(column_name)
             temp.append(column)
 
-        table_detail[table] = {'details': temp}
+        table_detail[table] = {'details': temp, 'foreign_keys': foreign_keys, 'unique_constraints': unique_constraints}
 
     return table_detail
 
-<<<<<<< Updated upstream:utils/db_utils.py
-def get_existing_unique_values(table_name, column_name, engine):
+def get_existing_unique_values(table_name, column_name, engine, data_type, params):
+    """
+    컬럼의 기존 값들을 서버 사이드 커서로 읽으면서 바로 decode_existing_values로 unique 순열의 정수로 바꿔 set에 모읍니다.
+    결과 전체를 한 번에 버퍼링하지 않고, 값 대신 정수만 담아서 메모리를 줄입니다.
+    """
     with engine.connect() as conn:
-        query = text(f"SELECT {column_name} FROM {table_name};")
-        result = conn.execute(query)
-        return set(row[0] for row in result)
+        query = text(f"SELECT {column_name} FROM {table_name} WHERE {column_name} IS NOT NULL;")
+        result = conn.execution_options(yield_per=EXISTING_VALUES_FETCH_SIZE).execute(query)
+        return decode_existing_values(data_type, params, result.scalars())
+
+def get_row_count(engine, selected_table, estimate=False):
+    """
+    테이블의 행 수를 반환합니다. estimate가 True이고 MySQL이면 COUNT(*) 대신 INFORMATION_SCHEMA.TABLES의 TABLE_ROWS 추정치를 씁니다.
+    (InnoDB 추정치는 실제와 수십 % 차이가 날 수 있음)
+    """
+    with engine.connect() as conn:
+        if estimate and engine.dialect.name == 'mysql':
+            query = text("""
+                SELECT TABLE_ROWS
+                FROM INFORMATION_SCHEMA.TABLES
+                WHERE TABLE_SCHEMA = DATABASE()
+                AND TABLE_NAME = :table_name
+            """)
+            row_count = conn.execute(query, {'table_name': selected_table}).scalar()
+            if row_count is not None:
+                return int(row_count)
+        return conn.execute(text(f"SELECT COUNT(*) FROM {selected_table};")).scalar()
+
+def get_missing_row_count(engine, selected_table, target, estimate=False):
+    """
+    fill 명령용: 테이블이 target 행이 되려면 몇 행을 더 넣어야 하는지 반환합니다.
+    """
+    current = get_row_count(engine, selected_table, estimate)
+    missing = max(int(target) - current, 0)
+    logging.info(f"{selected_table} has {current} rows{' (estimated)' if estimate else ''}; "
+                 f"{missing} rows needed to reach {target}")
+    return missing
+
+def load_key_pool(engine, table_name, column_name):
+    """
+    자식 테이블의 FK 컬럼이 샘플링할 부모 키 값들을 배열로 가져옵니다.
+    같은 시드로 다시 만들거나 이어서 만들 때 같은 키를 뽑도록 키 순서로 정렬해서 가져옵니다.
+    """
+    with engine.connect() as conn:
+        query = text(f"SELECT DISTINCT {column_name} FROM {table_name} WHERE {column_name} IS NOT NULL ORDER BY {column_name};")
+        keys = [row[0] for row in conn.execute(query)]
+    return np.array(keys, dtype=object)
 
-=======
->>>>>>> Stashed changes:DummyGenerator/utils/db_utils.py
 def truncate_table(selected_table, engine):
-    conn = engine.connect()
-    conn.execute(text(f"TRUNCATE TABLE {selected_table};"))
-    conn.commit()
+    """
+    테이블을 비웁니다. MySQL은 foreign_key_checks=1이면 다른 테이블의 FK가 참조하는 테이블의 TRUNCATE를 거부하므로,
+    TRUNCATE가 실패하면 DELETE FROM으로 지웁니다. DELETE는 FK 검사를 그대로 받아서 이번 실행에 없는 자식 테이블이
+    아직 행을 참조하고 있으면 예외가 납니다. TRUNCATE가 없는 DB(SQLite 등)는 처음부터 DELETE FROM을 씁니다.
+    """
+    with timed('truncate', selected_table):
+        truncated = False
+        if engine.dialect.name == 'mysql':
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(f"TRUNCATE TABLE {selected_table};"))
+                truncated = True
+            except DBAPIError as e:
+                logging.warning(f"TRUNCATE TABLE {selected_table} failed ({e.orig}); deleting its rows instead")
+        if not truncated:
+            with engine.begin() as conn:
+                conn.execute(text(f"DELETE FROM {selected_table};"))
     print(f"{selected_table} 내 데이터들을 삭제했습니다.")
 
-<<<<<<< Updated upstream:utils/db_utils.py
+def get_primary_key_columns(engine, selected_table):
+    return inspect(engine).get_pk_constraint(selected_table)['constrained_columns']
+
+def iter_table_pages(selected_table, engine, page_size=DEFAULT_PAGE_SIZE, after_key=None):
+    """
+    테이블 전체를 page_size개씩 나눠서 행 리스트로 돌려주는 제너레이터입니다.
+    PK가 있으면 마지막으로 읽은 키 다음부터 읽는 keyset 방식이라 뒤쪽 페이지도 앞 페이지를 다시 훑지 않고,
+    페이지마다 커넥션을 새로 잡으므로 페이지 사이에 커넥션을 붙잡고 있지 않습니다.
+    after_key(PK 컬럼 순서대로의 값 리스트)를 주면 그 키 다음 행부터 읽습니다.
+    PK가 없으면 서버 사이드 커서 하나로 스트리밍합니다. 어느 쪽이든 메모리에는 한 페이지만 올라갑니다.
+    """
+    primary_keys = get_primary_key_columns(engine, selected_table)
+    if not primary_keys:
+        if after_key is not None:
+            raise ValueError(f"{selected_table} has no primary key to resume paging from")
+        with engine.connect() as conn:
+            result = conn.execution_options(yield_per=page_size).execute(text(f"SELECT * FROM {selected_table}"))
+            for rows in result.partitions(page_size):
+                yield rows
+        return
+
+    key_columns = ', '.join(primary_keys)
+    first_query = text(f"SELECT * FROM {selected_table} ORDER BY {key_columns} LIMIT :limit")
+    # (pk1, pk2) > (:key_0, :key_1) 형식의 행 값 비교
+    next_query = text(
+        f"SELECT * FROM {selected_table} WHERE ({key_columns}) > ({', '.join(f':key_{i}' for i in range(len(primary_keys)))}) "
+        f"ORDER BY {key_columns} LIMIT :limit")
+    last_key = list(after_key) if after_key is not None else None
+    while True:
+        with engine.connect() as conn:
+            if last_key is None:
+                rows = conn.execute(first_query, {'limit': page_size}).fetchall()
+            else:
+                params = {f'key_{i}': value for i, value in enumerate(last_key)}
+                rows = conn.execute(next_query, dict(params, limit=page_size)).fetchall()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < page_size:
+            return
+        last_key = [rows[-1]._mapping[column] for column in primary_keys]
+
+def iter_table_rows(selected_table, engine, page_size=DEFAULT_PAGE_SIZE):
+    """
+    테이블 전체를 한 행씩 스트리밍합니다. 메모리 사용량은 테이블 크기와 상관없이 page_size 행 정도입니다.
+    """
+    for rows in iter_table_pages(selected_table, engine, page_size):
+        yield from rows
+
+def print_page(selected_table, rows, page):
+    print(f"{selected_table}의 데이터 (페이지 {page})")
+    for row in rows:
+        print(row)
+
 def select_all_data(selected_table, engine):
-    with engine.begin() as conn:
-        result = conn.execute(text(f"SELECT * FROM {selected_table};"))
     print(f"{selected_table}의 데이터")
-    for i in result:
-        print(i)
-=======
-def select_paginated_data(selected_table, engine, page=1, page_size=1000):
-    offset = (page - 1) * page_size
-    query = text(f"SELECT * FROM {selected_table} LIMIT :limit OFFSET :offset")
-    
-    with engine.connect() as conn:
-        result = conn.execute(query, {'limit': page_size, 'offset': offset})
-    
-    print(f"{selected_table}의 데이터 (페이지 {page})")
-    for row in result:
+    for row in iter_table_rows(selected_table, engine):
         print(row)
 
-    return result.rowcount  # 반환된 행의 수를 반환
->>>>>>> Stashed changes:DummyGenerator/utils/db_utils.py
+def select_paginated_data(selected_table, engine, page=1, page_size=DEFAULT_PAGE_SIZE, after_key=None):
+    """
+    after_key(앞 페이지 마지막 행의 PK 값들) 다음부터 한 페이지를 읽어서 page번째 페이지로 출력하고,
+    (행 수, 다음 페이지를 읽을 때 넘길 after_key)를 반환합니다. 앞 페이지들을 다시 읽지 않으므로 어느 페이지든 쿼리 한 번입니다.
+    PK가 없는 테이블은 이어 읽을 키가 없어서 첫 페이지만 읽고 다음 키로 None을 반환합니다.
+    테이블 전체를 차례로 볼 때는 iter_table_pages를 쓰세요.
+    """
+    primary_keys = get_primary_key_columns(engine, selected_table)
+    with closing(iter_table_pages(selected_table, engine, page_size, after_key)) as pages:
+        rows = next(pages, [])
+    print_page(selected_table, rows, page)
+    next_key = [rows[-1]._mapping[column] for column in primary_keys] if rows and primary_keys else None
+    return len(rows), next_key
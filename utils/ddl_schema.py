@@ -0,0 +1,203 @@
+# ddl_schema.py
+import re
+import logging
+from sqlalchemy.dialects import mysql
+from .db_utils import parse_column_type
+
+# CREATE TABLE [IF NOT EXISTS] `db`.`table` ( 까지. 본문은 괄호 짝을 맞춰서 따로 잘라냄
+CREATE_TABLE_PATTERN = re.compile(
+    r"CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?:(?:`[^`]+`|\w+)\s*\.\s*)?(`[^`]+`|\w+)\s*\(",
+    re.IGNORECASE)
+IDENTIFIER = r"(`(?:[^`]|``)+`|\w+)"
+COLUMN_PATTERN = re.compile(IDENTIFIER + r"\s+(\w+)\s*(?:\(([^)]*)\))?(.*)$", re.DOTALL)
+PRIMARY_KEY_PATTERN = re.compile(r"^(?:CONSTRAINT\s+" + IDENTIFIER + r"\s+)?PRIMARY\s+KEY\b", re.IGNORECASE)
+# UNIQUE [KEY|INDEX] [이름] ( 까지. 제약조건 이름은 CONSTRAINT 뒤나 KEY 뒤에 옴
+UNIQUE_PATTERN = re.compile(
+    r"^(?:CONSTRAINT\s+" + IDENTIFIER + r"\s+)?UNIQUE\b(?:\s+(?:KEY|INDEX)\b)?(?:\s*" + IDENTIFIER + r")?\s*\(",
+    re.IGNORECASE)
+FOREIGN_KEY_PATTERN = re.compile(
+    r"^(?:CONSTRAINT\s+" + IDENTIFIER + r"\s+)?FOREIGN\s+KEY\b[^(]*\((.*?)\)\s*REFERENCES\s+"
+    r"(?:(?:`[^`]+`|\w+)\s*\.\s*)?(`[^`]+`|\w+)\s*\((.*?)\)", re.IGNORECASE | re.DOTALL)
+# 컬럼이 아닌 본문 항목 (보조 인덱스, CHECK 제약조건 등)
+SKIPPED_DEFINITION_PATTERN = re.compile(r"^(?:KEY|INDEX|FULLTEXT|SPATIAL|CHECK|CONSTRAINT)\b", re.IGNORECASE)
+# 문자열 리터럴 (DEFAULT, COMMENT 값 안의 단어를 키워드로 읽지 않도록 지움)
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+# INFORMATION_SCHEMA.COLUMNS의 DATA_TYPE으로 바꿔 적는 별칭
+DATA_TYPE_ALIASES = {
+    'bool': 'tinyint',
+    'boolean': 'tinyint',
+    'integer': 'int',
+    'dec': 'decimal',
+    'numeric': 'decimal',
+    'fixed': 'decimal',
+    'character': 'char',
+}
+
+
+def unquote_identifier(identifier):
+    identifier = identifier.strip()
+    if identifier.startswith('`') and identifier.endswith('`'):
+        return identifier[1:-1].replace('``', '`')
+    return identifier
+
+def get_parenthesized(text, open_index):
+    """
+    text[open_index]의 여는 괄호와 짝이 맞는 닫는 괄호 사이의 문자열을 반환합니다. 따옴표 안의 괄호는 세지 않습니다.
+    """
+    depth, quote = 0, None
+    index = open_index
+    while index < len(text):
+        char = text[index]
+        if quote:
+            if char == '\\' and quote != '`':
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return text[open_index + 1:index]
+        index += 1
+    raise ValueError("Unbalanced parentheses in CREATE TABLE statement.")
+
+def split_top_level(text):
+    """
+    괄호와 따옴표 밖에 있는 쉼표로 나눕니다. (decimal(10,2)나 enum('a,b')의 쉼표는 나누지 않음)
+    """
+    parts, depth, quote, start = [], 0, None, 0
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if quote:
+            if char == '\\' and quote != '`':
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:index].strip())
+            start = index + 1
+        index += 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+def parse_column_names(text):
+    # (`a`, `b`(10) DESC) -> ['a', 'b']
+    return [unquote_identifier(re.match(IDENTIFIER, part.strip()).group(1)) for part in split_top_level(text)]
+
+def parse_column_definition(table_name, definition):
+    """
+    컬럼 정의 한 줄을 get_schema_detail이 읽는 INFORMATION_SCHEMA.COLUMNS 행과 같은 dict로 바꿉니다.
+    인라인 PRIMARY KEY/UNIQUE/AUTO_INCREMENT 여부도 같이 반환합니다.
+    """
+    match = COLUMN_PATTERN.match(definition)
+    if not match:
+        return None
+    column_name, declared_type, arguments, rest = match.groups()
+    data_type = DATA_TYPE_ALIASES.get(declared_type.lower(), declared_type.lower())
+    # BOOL은 MySQL에서 tinyint(1)로 저장됨
+    arguments = '1' if declared_type.lower() in ['bool', 'boolean'] else (arguments or '').strip()
+    numbers = [int(value) for value in re.findall(r'\d+', arguments)] if data_type != 'enum' else []
+    row = {
+        'TABLE_NAME': table_name,
+        'COLUMN_NAME': unquote_identifier(column_name),
+        'DATA_TYPE': data_type,
+        'COLUMN_TYPE': f"{data_type}({arguments})" if arguments else data_type,
+        'CHARACTER_MAXIMUM_LENGTH': None,
+        'NUMERIC_PRECISION': None,
+        'NUMERIC_SCALE': None,
+    }
+    if data_type in ['char', 'varchar']:
+        row['CHARACTER_MAXIMUM_LENGTH'] = numbers[0] if numbers else 1
+    elif data_type == 'decimal':
+        row['NUMERIC_PRECISION'] = numbers[0] if numbers else 10
+        row['NUMERIC_SCALE'] = numbers[1] if len(numbers) > 1 else 0
+    options = STRING_LITERAL_PATTERN.sub("''", rest).upper()
+    return row, {
+        'nullable': 'NOT NULL' not in options and 'PRIMARY KEY' not in options,
+        'primary_key': 'PRIMARY KEY' in options,
+        'unique': re.search(r'\bUNIQUE\b', options) is not None,
+        'autoincrement': 'AUTO_INCREMENT' in options,
+    }
+
+def parse_create_tables(ddl, tables=None):
+    """
+    CREATE TABLE 문들(mysqldump --no-data 출력 등)로 get_table_detail과 같은 형식의 table_detail을 만듭니다.
+    DB에 연결하지 않고 컬럼 플랜을 만들 때 씁니다. tables가 주어지면 그 테이블들만 파싱합니다.
+    UNIQUE KEY (a, b)처럼 여러 컬럼으로 된 제약조건은 unique_constraints에 묶음으로 남기고, 컬럼의 unique는 한 컬럼 제약조건에만 표시합니다.
+    """
+    dialect = mysql.dialect()
+    table_detail = {}
+    for match in CREATE_TABLE_PATTERN.finditer(ddl):
+        table_name = unquote_identifier(match.group(1))
+        if tables is not None and table_name not in tables:
+            continue
+        columns, primary_keys, unique_constraints, foreign_keys = [], set(), [], []
+        for definition in split_top_level(get_parenthesized(ddl, match.end() - 1)):
+            if PRIMARY_KEY_PATTERN.match(definition):
+                primary_keys.update(parse_column_names(get_parenthesized(definition, definition.index('('))))
+            elif UNIQUE_PATTERN.match(definition):
+                unique_match = UNIQUE_PATTERN.match(definition)
+                column_names = parse_column_names(get_parenthesized(definition, unique_match.end() - 1))
+                name = unique_match.group(1) or unique_match.group(2)
+                unique_constraints.append({'name': unquote_identifier(name) if name else column_names[0],
+                                           'column_names': column_names})
+            elif FOREIGN_KEY_PATTERN.match(definition):
+                foreign_key_match = FOREIGN_KEY_PATTERN.match(definition)
+                foreign_keys.append({
+                    'name': unquote_identifier(foreign_key_match.group(1)) if foreign_key_match.group(1) else None,
+                    'constrained_columns': parse_column_names(foreign_key_match.group(2)),
+                    'referred_schema': None,
+                    'referred_table': unquote_identifier(foreign_key_match.group(3)),
+                    'referred_columns': parse_column_names(foreign_key_match.group(4)),
+                })
+            elif SKIPPED_DEFINITION_PATTERN.match(definition):
+                continue
+            else:
+                parsed = parse_column_definition(table_name, definition)
+                if parsed is None:
+                    logging.warning(f"Could not parse column definition in {table_name}: {definition}")
+                    continue
+                columns.append(parsed)
+
+        foreign_key_columns = {
+            column_name: (foreign_key['referred_table'], referred_column)
+            for foreign_key in foreign_keys
+            for column_name, referred_column in zip(foreign_key['constrained_columns'], foreign_key['referred_columns'])
+        }
+        # 인라인 UNIQUE는 MySQL처럼 컬럼 이름으로 된 한 컬럼 제약조건
+        unique_constraints.extend({'name': row['COLUMN_NAME'], 'column_names': [row['COLUMN_NAME']]}
+                                  for row, options in columns if options['unique'])
+        unique_columns = {constraint['column_names'][0]
+                          for constraint in unique_constraints if len(constraint['column_names']) == 1}
+        details = []
+        for row, options in columns:
+            column_name = row['COLUMN_NAME']
+            details.append({
+                'name': column_name,
+                'type': parse_column_type(dialect, row),
+                'nullable': options['nullable'] and column_name not in primary_keys,
+                'default': None,
+                'comment': None,
+                'primary_key': options['primary_key'] or column_name in primary_keys,
+                'unique': column_name in unique_columns,
+                'autoincrement': options['autoincrement'],
+                'foreign_key': foreign_key_columns.get(column_name),
+            })
+        table_detail[table_name] = {'details': details, 'foreign_keys': foreign_keys,
+                                    'unique_constraints': unique_constraints}
+
+    missing_tables = [table for table in (tables or []) if table not in table_detail]
+    if missing_tables:
+        logging.warning(f"Tables not found in the DDL: {missing_tables}")
+    logging.info(f"Parsed {len(table_detail)} tables from CREATE TABLE statements")
+    return table_detail
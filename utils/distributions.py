@@ -0,0 +1,157 @@
+# distributions.py
+import logging
+from collections import namedtuple
+from datetime import date
+from decimal import Decimal
+from functools import partial
+import numpy as np
+
+# 컬럼별 분포 프로필 종류
+# zipf: 1부터 n까지의 순위를 1/k^s 비율로 뽑음 (상위 몇 개 값에 몰리는 분포). s(기본 1.1), n(기본 1000), offset(기본 1)
+# normal: 평균 mean, 표준편차 std인 정규분포. min/max로 범위를 자름
+# categorical: values의 값들을 weights 비율로 뽑음. values를 {값: 가중치} dict로 줘도 됨
+# date_range: start부터 end까지의 날짜(시간). skew가 1보다 크면 end(최근) 쪽에 몰림
+DISTRIBUTION_KINDS = ('zipf', 'normal', 'categorical', 'date_range')
+DEFAULT_ZIPF_EXPONENT = 1.1
+DEFAULT_ZIPF_SIZE = 1000
+INTEGER_TYPES = {'INTEGER', 'MEDIUMINT', 'SMALLINT', 'YEAR'}
+STRING_TYPES = {'VARCHAR', 'CHAR', 'TEXT', 'ENUM'}
+
+# 미리 계산한 표본 추출 테이블. 워커 프로세스로 넘어가도록 numpy 배열과 기본 타입만 담음
+# alias 방식: 칸 하나를 고르고 prob보다 작으면 그 칸, 아니면 alias 칸을 쓰므로 값 하나당 O(1)
+Sampler = namedtuple('Sampler', ['kind', 'data_type', 'params', 'values', 'prob', 'alias'])
+
+
+def build_alias_table(weights):
+    """
+    가중치 목록으로 Vose alias 테이블 (prob, alias)을 만듭니다.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.ndim != 1 or not len(weights) or (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError("Distribution weights must be a non-empty list of non-negative numbers")
+    size = len(weights)
+    scaled = weights * size / weights.sum()
+    prob = np.ones(size)
+    alias = np.arange(size)
+    small = [i for i in range(size) if scaled[i] < 1.0]
+    large = [i for i in range(size) if scaled[i] >= 1.0]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        prob[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        (small if scaled[more] < 1.0 else large).append(more)
+    return prob, alias
+
+def sample_alias(rng, dummy_num, prob, alias):
+    index = rng.integers(0, len(prob), size=dummy_num)
+    return np.where(rng.random(dummy_num) < prob[index], index, alias[index])
+
+def get_date_unit(data_type):
+    return {'DATE': 'D', 'YEAR': 'Y'}.get(data_type, 's')
+
+def build_sampler(profile, data_type):
+    """
+    yaml의 분포 프로필 하나로 Sampler를 만듭니다. 가중치 테이블은 여기서 한 번만 계산합니다.
+    """
+    kind = profile.get('kind')
+    if kind == 'zipf':
+        exponent = float(profile.get('s', DEFAULT_ZIPF_EXPONENT))
+        size = int(profile.get('n', DEFAULT_ZIPF_SIZE))
+        prob, alias = build_alias_table(1.0 / np.arange(1, size + 1) ** exponent)
+        return Sampler(kind, data_type, {'offset': int(profile.get('offset', 1))}, None, prob, alias)
+    if kind == 'normal':
+        params = {'mean': float(profile.get('mean', 0)), 'std': float(profile.get('std', 1)),
+                  'min': profile.get('min'), 'max': profile.get('max')}
+        return Sampler(kind, data_type, params, None, None, None)
+    if kind == 'categorical':
+        values = profile.get('values')
+        if isinstance(values, dict):
+            values, weights = list(values.keys()), list(values.values())
+        else:
+            values = list(values or [])
+            weights = profile.get('weights') or [1] * len(values)
+        if len(weights) != len(values):
+            raise ValueError("categorical distribution needs one weight per value")
+        prob, alias = build_alias_table(weights)
+        return Sampler(kind, data_type, {}, values, prob, alias)
+    if kind == 'date_range':
+        unit = get_date_unit(data_type)
+        start = np.datetime64(profile.get('start', '1970-01-01'), unit).astype(np.int64)
+        end = np.datetime64(profile.get('end', date.today()), unit).astype(np.int64)
+        if end <= start:
+            raise ValueError("date_range end must be after start")
+        params = {'unit': unit, 'start': int(start), 'end': int(end), 'skew': float(profile.get('skew', 1))}
+        return Sampler(kind, data_type, params, None, None, None)
+    raise ValueError(f"Unknown distribution kind '{kind}'. Use one of: {', '.join(DISTRIBUTION_KINDS)}")
+
+def convert_numbers(values, data_type, params):
+    """
+    뽑은 숫자 배열을 컬럼 타입에 맞는 파이썬 값 리스트로 바꿉니다.
+    """
+    if data_type in INTEGER_TYPES:
+        return np.rint(values).astype(np.int64).tolist()
+    if data_type == 'DECIMAL':
+        right_digits = params.get('data_right_digits', 0)
+        return [Decimal(f"{value:.{right_digits}f}") for value in values.tolist()]
+    if data_type in STRING_TYPES:
+        return [str(value) for value in values.tolist()]
+    return values.astype(np.float64).tolist()
+
+def generate_distribution_column(dummy_num, fake, rng, sampler, **params):
+    """
+    컬럼 생성 함수: Sampler로 dummy_num개의 값을 한 번에 뽑습니다.
+    params는 원래 컬럼 생성 파라미터(data_length, DECIMAL 자릿수 등)입니다.
+    """
+    kind, data_type = sampler.kind, sampler.data_type
+    if kind == 'categorical':
+        values = sampler.values
+        return [values[i] for i in sample_alias(rng, dummy_num, sampler.prob, sampler.alias).tolist()]
+    if kind == 'zipf':
+        ranks = sample_alias(rng, dummy_num, sampler.prob, sampler.alias) + sampler.params['offset']
+        return convert_numbers(ranks, data_type, params)
+    if kind == 'normal':
+        values = rng.normal(sampler.params['mean'], sampler.params['std'], size=dummy_num)
+        if sampler.params['min'] is not None or sampler.params['max'] is not None:
+            values = np.clip(values, sampler.params['min'], sampler.params['max'])
+        return convert_numbers(values, data_type, params)
+    # date_range: u^(1/skew)는 skew가 클수록 1(end) 쪽에 몰림
+    start, end, unit = sampler.params['start'], sampler.params['end'], sampler.params['unit']
+    offsets = (rng.random(dummy_num) ** (1.0 / sampler.params['skew']) * (end - start)).astype(np.int64)
+    dates = (start + offsets).astype(f'datetime64[{unit}]')
+    if data_type in ('DATETIME', 'TIMESTAMP'):
+        return dates.astype(object).tolist()
+    if data_type == 'YEAR':
+        return (dates.astype(np.int64) + 1970).tolist()
+    return dates.astype(str).tolist()
+
+def apply_distributions(table_name, plan, profiles):
+    """
+    테이블 컬럼 플랜에서 profiles({컬럼 이름: 분포 프로필})에 있는 컬럼의 생성 함수를 분포 샘플러로 바꾼 새 플랜을 반환합니다.
+    unique/PK 컬럼과 FK 컬럼은 별도로 채우므로 프로필을 무시합니다.
+    """
+    if not profiles:
+        return plan
+    columns = {column.name: column for column in plan}
+    for name in profiles:
+        if name not in columns:
+            logging.warning(f"Distribution profile for unknown column {table_name}.{name} is ignored")
+    new_plan = []
+    for column in plan:
+        profile = profiles.get(column.name)
+        if profile and (column.unique or column.foreign_key):
+            logging.warning(f"Distribution profile for {table_name}.{column.name} is ignored (unique or foreign key column)")
+        elif profile:
+            sampler = build_sampler(profile, column.data_type)
+            column = column._replace(generator=partial(generate_distribution_column, sampler=sampler, **column.params))
+            logging.info(f"Using {sampler.kind} distribution for {table_name}.{column.name}")
+        new_plan.append(column)
+    return tuple(new_plan)
+
+def apply_distribution_profiles(column_plans, distributions):
+    """
+    설정 파일의 distributions({테이블 이름: {컬럼 이름: 분포 프로필}})를 모든 테이블 플랜에 적용합니다.
+    """
+    distributions = distributions or {}
+    return {table_name: apply_distributions(table_name, plan, distributions.get(table_name))
+            for table_name, plan in column_plans.items()}
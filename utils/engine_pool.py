@@ -0,0 +1,45 @@
+# engine_pool.py
+import atexit
+import logging
+import threading
+import sqlalchemy as db
+
+# connection.yaml에서 create_engine으로 넘기는 커넥션 풀 설정 키
+POOL_OPTION_KEYS = ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'pool_pre_ping')
+
+# 서버와 DB(연결 문자열)별로 엔진을 하나만 만들어 메뉴 동작과 여러 DB 처리에서 같은 커넥션 풀을 재사용
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_pool_options(config):
+    """
+    서버/DB 설정 dict에서 커넥션 풀 설정만 골라냅니다.
+    """
+    return {key: config[key] for key in POOL_OPTION_KEYS if config.get(key) is not None}
+
+def get_engine(url, key=None, **engine_options):
+    """
+    url(또는 key)에 해당하는 엔진을 반환합니다. 처음 요청될 때만 engine_options로 엔진을 만들고 이후에는 만들어 둔 엔진을 돌려줍니다.
+    같은 URL에 다른 연결 옵션을 쓰는 엔진이 필요하면 key를 따로 줍니다.
+    """
+    key = key or db.engine.make_url(url).render_as_string(hide_password=False)
+    with _engines_lock:
+        if key not in _engines:
+            _engines[key] = db.create_engine(url, **engine_options)
+            logging.info(f"Created engine for {db.engine.make_url(url).render_as_string()} with {engine_options}")
+        return _engines[key]
+
+def dispose_engines():
+    """
+    만들어 둔 엔진을 모두 닫습니다. 프로세스 종료 시 자동으로 호출됩니다.
+    """
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.dispose()
+    if engines:
+        logging.info(f"Disposed {len(engines)} database engines")
+
+atexit.register(dispose_engines)
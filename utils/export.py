@@ -0,0 +1,292 @@
+# export.py
+import atexit
+import csv
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time as datetime_time, timedelta
+from decimal import Decimal
+from multiprocessing import shared_memory
+import numpy as np
+from .data_generator import KeyRange, create_generators, create_foreign_key_filler, build_rows, derive_shard_seeds
+from .unique_values import create_unique_filler
+from .scheduler import build_dependency_levels
+from .metrics import timed, count
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'sql')
+DEFAULT_EXPORT_DIR = 'export'
+DEFAULT_EXPORT_CHUNK_SIZE = 10000
+# sql 형식에서 INSERT 문 하나에 넣는 행 수
+DEFAULT_SQL_BATCH_SIZE = 1000
+# gzip 압축 레벨. 9는 6보다 파일이 조금 작지만 몇 배 느림
+EXPORT_GZIP_LEVEL = 6
+# MySQL 문자열 리터럴에서 이스케이프해야 하는 문자
+SQL_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    "'": "\\'",
+    '\n': '\\n',
+    '\r': '\\r',
+    '\x00': '\\0',
+    '\x1a': '\\Z',
+})
+
+# 공유 메모리에 올린 정수 키 배열의 위치. 워커 프로세스로는 이 작은 튜플만 넘어감
+SharedKeys = namedtuple('SharedKeys', ['shm_name', 'dtype', 'size'])
+# 워커 프로세스가 시작할 때 한 번 받아둔 부모 키 풀과, 키 배열이 가리키는 공유 메모리
+_worker_key_pools = {}
+_worker_shared_memory = []
+
+
+def format_value(value):
+    """
+    CSV 필드와 SQL 문자열 리터럴에 쓸 텍스트로 바꿉니다. (NULL은 형식마다 따로 처리)
+    """
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, Decimal):
+        # 지수 표기(1E+3 등)를 피하기 위해 고정 소수점으로 씀
+        return format(value, 'f')
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, (date, datetime_time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        seconds = int(value.total_seconds())
+        return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return str(value)
+
+def format_sql_value(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float, Decimal)):
+        return format_value(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"X'{bytes(value).hex()}'"
+    return f"'{format_value(value).translate(SQL_ESCAPES)}'"
+
+def format_json_value(value):
+    # json이 직접 쓰지 못하는 값: DECIMAL은 정밀도를 잃지 않도록 문자열로, 바이너리는 16진수 문자열로 씀
+    return format_value(value)
+
+def create_chunk_writer(file, export_format, table_name, column_names, sql_batch_size=DEFAULT_SQL_BATCH_SIZE):
+    """
+    파일에 청크(행 dict 리스트)를 export_format 형식으로 쓰는 함수를 만듭니다. CSV는 헤더를 먼저 씁니다.
+    """
+    if export_format == 'csv':
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(column_names)
+
+        def write(rows):
+            # NULL은 빈 필드로 씀
+            writer.writerows([['' if row[name] is None else format_value(row[name]) for name in column_names]
+                              for row in rows])
+    elif export_format == 'jsonl':
+        def write(rows):
+            file.writelines(json.dumps(row, ensure_ascii=False, separators=(',', ':'), default=format_json_value) + '\n'
+                            for row in rows)
+    elif export_format == 'sql':
+        prefix = f"INSERT INTO `{table_name}` ({', '.join(f'`{name}`' for name in column_names)}) VALUES\n"
+        sql_batch_size = max(int(sql_batch_size or DEFAULT_SQL_BATCH_SIZE), 1)
+
+        def write(rows):
+            for start in range(0, len(rows), sql_batch_size):
+                values = ',\n'.join('(' + ', '.join(format_sql_value(row[name]) for name in column_names) + ')'
+                                    for row in rows[start:start + sql_batch_size])
+                file.write(f"{prefix}{values};\n")
+    else:
+        raise ValueError(f"Unknown export format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+    return write
+
+def open_export_file(path, compress=False):
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=EXPORT_GZIP_LEVEL)
+    return open(path, 'w', encoding='utf-8', newline='')
+
+def get_export_path(output_dir, table_name, export_format, compress=False, shard=0, shards=1):
+    """
+    샤드가 하나면 테이블이름.csv, 여러 개면 테이블이름.0000.csv처럼 샤드 번호를 붙입니다. 압축하면 .gz를 붙입니다.
+    """
+    name = table_name if shards == 1 else f"{table_name}.{shard:04d}"
+    return os.path.join(output_dir, f"{name}.{export_format}{'.gz' if compress else ''}")
+
+def split_rows(dummy_num, shards):
+    """
+    dummy_num개의 행을 샤드들에 나눈 (시작 위치, 행 수) 목록을 반환합니다.
+    """
+    base, remainder = divmod(dummy_num, shards)
+    ranges, start = [], 0
+    for shard in range(shards):
+        size = base + (1 if shard < remainder else 0)
+        ranges.append((start, size))
+        start += size
+    return ranges
+
+def to_key_array(values):
+    # 정수 키는 numpy 정수 배열로 두어서 큰 부모 테이블에서도 키 풀의 메모리를 줄임
+    values = [value for value in values if value is not None]
+    keys = np.array(values)
+    return keys if keys.dtype.kind in 'iu' else np.array(values, dtype=object)
+
+def export_shard(table_name, plan, dummy_num, start, size, seed, shard_seed, key_pools, path, export_format,
+                 compress=False, chunk_size=DEFAULT_EXPORT_CHUNK_SIZE, sql_batch_size=DEFAULT_SQL_BATCH_SIZE,
+                 key_columns=()):
+    """
+    워커 프로세스에서 실행: 테이블의 start번째 행부터 size개를 청크 단위로 생성해서 path에 씁니다.
+    unique 순열과 unique FK 풀은 모든 샤드가 테이블 시드로 똑같이 만들고 카운터만 start부터 시작하므로
+    샤드 사이에서도 값이 겹치지 않습니다. 나머지 값은 샤드 시드로 만듭니다.
+    자식 테이블의 FK가 참조하는 key_columns의 값들은 {컬럼 이름: 배열}로 모아서 (행 수, 키)로 반환합니다.
+    key_pools가 None이면 워커 프로세스가 시작할 때 받아둔 키 풀을 씁니다.
+    """
+    if key_pools is None:
+        key_pools = _worker_key_pools
+    _, rng = create_generators(seed)
+    fill_unique_values = create_unique_filler(table_name, plan, dummy_num, rng)
+    fill_foreign_keys = create_foreign_key_filler(plan, key_pools, rng)
+    fill_unique_values.set_state([start] * len(fill_unique_values.get_state()))
+    fill_foreign_keys.set_state([start] * len(fill_foreign_keys.get_state()))
+    fake, shard_rng = create_generators(shard_seed)
+    rng.bit_generator.state = shard_rng.bit_generator.state
+
+    column_names = [column.name for column in plan]
+    keys = {name: [] for name in key_columns}
+    temp_path = f"{path}.tmp"
+    done = 0
+    try:
+        with open_export_file(temp_path, compress) as file:
+            write = create_chunk_writer(file, export_format, table_name, column_names, sql_batch_size)
+            while done < size:
+                rows = fill_foreign_keys(fill_unique_values(build_rows(plan, min(chunk_size, size - done), fake, rng)))
+                write(rows)
+                for name in key_columns:
+                    keys[name].append(to_key_array([row[name] for row in rows]))
+                done += len(rows)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return done, {name: np.concatenate(parts) if parts else to_key_array([]) for name, parts in keys.items()}
+
+def share_key_pools(key_pools):
+    """
+    정수 키 배열을 공유 메모리에 올려서, 샤드 작업마다 키 배열을 피클해서 넘기지 않게 합니다.
+    문자열 키처럼 공유 메모리에 올릴 수 없는 배열과 KeyRange는 그대로 두고 워커마다 한 번만 넘깁니다.
+    (워커에 넘길 풀, 다 쓰고 지워야 할 SharedMemory 리스트)를 반환합니다.
+    """
+    shared_pools, shms = {}, []
+    for key, keys in (key_pools or {}).items():
+        if isinstance(keys, np.ndarray) and keys.dtype.kind in 'iu' and len(keys):
+            shm = shared_memory.SharedMemory(create=True, size=keys.nbytes)
+            shms.append(shm)
+            np.ndarray(keys.shape, dtype=keys.dtype, buffer=shm.buf)[:] = keys
+            keys = SharedKeys(shm.name, keys.dtype.str, len(keys))
+        shared_pools[key] = keys
+    return shared_pools, shms
+
+def attach_key_pools(key_pools):
+    """
+    워커 프로세스 초기화 함수: 공유 메모리의 키 배열을 복사하지 않고 numpy 배열로 바로 씁니다.
+    """
+    atexit.register(detach_key_pools)
+    for key, keys in key_pools.items():
+        if isinstance(keys, SharedKeys):
+            shm = shared_memory.SharedMemory(name=keys.shm_name)
+            # 워커가 끝날 때까지 열어두고, 끝날 때 detach_key_pools가 배열을 먼저 놓은 뒤 닫음
+            _worker_shared_memory.append(shm)
+            keys = np.ndarray(keys.size, dtype=keys.dtype, buffer=shm.buf)
+        _worker_key_pools[key] = keys
+
+def detach_key_pools():
+    # 공유 메모리를 가리키는 배열이 남아 있으면 닫을 수 없으므로 키 풀을 먼저 비움
+    _worker_key_pools.clear()
+    for shm in _worker_shared_memory:
+        shm.close()
+    _worker_shared_memory.clear()
+
+def export_table(table_name, plan, dummy_num, output_dir, export_format='csv', compress=False, shards=1,
+                 chunk_size=DEFAULT_EXPORT_CHUNK_SIZE, seed=None, sql_batch_size=DEFAULT_SQL_BATCH_SIZE,
+                 key_pools=None, key_columns=()):
+    """
+    테이블 하나를 shards개의 파일로 나눠 씁니다. 샤드가 여러 개면 샤드마다 별도 프로세스에서 생성과 쓰기를 동시에 합니다.
+    각 샤드는 chunk_size개씩 만들어서 바로 쓰므로 메모리 사용량은 행 수와 관계없이 일정합니다.
+    key_columns 값들을 샤드 순서대로 이어 붙인 {컬럼 이름: 배열}을 반환합니다.
+    """
+    shards = max(min(int(shards or 1), dummy_num), 1)
+    chunk_size = max(int(chunk_size or DEFAULT_EXPORT_CHUNK_SIZE), 1)
+    shard_seeds = derive_shard_seeds(seed, shards)
+    # 여러 샤드를 프로세스로 나눌 때는 키 풀을 작업마다 넘기지 않고 워커가 시작할 때 한 번만 넘김
+    shard_key_pools = key_pools if shards == 1 else None
+    jobs = [(table_name, plan, dummy_num, start, size, seed, shard_seed, shard_key_pools,
+             get_export_path(output_dir, table_name, export_format, compress, shard, shards), export_format, compress,
+             chunk_size, sql_batch_size, key_columns)
+            for shard, ((start, size), shard_seed) in enumerate(zip(split_rows(dummy_num, shards), shard_seeds))]
+    logging.info(f"Exporting {dummy_num} rows of {table_name} to {shards} {export_format} file(s) in {output_dir}")
+    start_time = time.perf_counter()
+    if shards == 1:
+        results = [export_shard(*jobs[0])]
+    else:
+        # 생성은 CPU를 쓰므로 스레드 대신 프로세스로 나눔
+        shared_pools, shms = share_key_pools(key_pools)
+        try:
+            with ProcessPoolExecutor(max_workers=min(shards, os.cpu_count() or 1),
+                                     mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=attach_key_pools, initargs=(shared_pools,)) as executor:
+                results = list(executor.map(export_shard, *zip(*jobs)))
+        finally:
+            for shm in shms:
+                shm.close()
+                shm.unlink()
+    written = sum(rows for rows, _ in results)
+    count('rows', written, table_name)
+    count('files', len(results), table_name)
+    elapsed = time.perf_counter() - start_time
+    print(f"{written}개의 데이터를 {table_name} 파일 {len(results)}개로 내보냈습니다. "
+          f"({written / elapsed if elapsed > 0 else 0:.0f} rows/sec)")
+    return {name: np.concatenate([keys[name] for _, keys in results]) for name in key_columns}
+
+def export_tables(table_names, column_plans, dummy_nums, output_dir=DEFAULT_EXPORT_DIR, export_format='csv',
+                  compress=False, shards=1, chunk_size=DEFAULT_EXPORT_CHUNK_SIZE, seed=None,
+                  sql_batch_size=DEFAULT_SQL_BATCH_SIZE):
+    """
+    DB에 연결하지 않고 테이블들의 더미 데이터를 파일로 내보냅니다. 부모 테이블부터 FK 의존 순서대로 쓰고,
+    자식 테이블의 FK는 먼저 내보낸 부모 파일의 키에서 뽑습니다.
+    auto_increment 컬럼은 파일에 쓰지 않으므로, 빈 테이블에 넣었을 때 매겨지는 1부터 행 수까지의 범위(KeyRange)를 부모 키로 씁니다.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+        logging.info(f"No seed given for the export; using generated seed {seed}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    # {부모 테이블: 자식 FK가 참조하는 컬럼 집합}
+    referenced_columns = {}
+    for table_name in table_names:
+        for column in column_plans[table_name]:
+            if column.foreign_key:
+                referenced_columns.setdefault(column.foreign_key[0], set()).add(column.foreign_key[1])
+
+    key_pools = {}
+    for level in build_dependency_levels(table_names, column_plans):
+        for table_name in level:
+            plan = column_plans[table_name]
+            dummy_num = dummy_nums.get(table_name, 1000)
+            plan_columns = {column.name for column in plan}
+            key_columns = sorted(referenced_columns.get(table_name, set()) & plan_columns)
+            with timed('export', table_name):
+                keys = export_table(table_name, plan, dummy_num, output_dir, export_format, compress, shards,
+                                    chunk_size, seed, sql_batch_size, key_pools, key_columns)
+            for column_name in referenced_columns.get(table_name, ()):
+                if column_name in keys:
+                    key_pools[(table_name, column_name)] = keys[column_name]
+                elif column_name not in plan_columns:
+                    key_pools[(table_name, column_name)] = KeyRange(1, dummy_num)
+    logging.info(f"Exported {len(table_names)} tables to {output_dir}")
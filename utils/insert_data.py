@@ -1,39 +1,152 @@
+import re
+import threading
 import sqlalchemy as db
 import logging
+import time
+from itertools import islice
+from .bulk_session import bulk_session
+from .metrics import timed, count
 
-# 로깅 설정
+# 로깅 설정. 핸들러(콘솔, error.log)는 log_setup.setup_logging에서 큐를 거쳐 붙음
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.ERROR)  # ERROR 레벨 이상의 로그만 기록
 
-# 콘솔 핸들러 (로그를 콘솔에 출력)
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.ERROR)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-console_handler.setFormatter(formatter)
+# settings.yaml에 batch_size가 없을 때 사용하는 기본 배치 크기
+DEFAULT_BATCH_SIZE = 1000
+# 테이블별로 남겨두는 실패 행 예시 수. 실패가 아무리 많아도 로그 양은 이 수로 고정됨
+MAX_FAILURE_SAMPLES = 5
+# 예시 행의 값은 이 길이까지만 남김
+MAX_SAMPLE_VALUE_LENGTH = 100
+# 에러 메시지에서 제약조건(키) 이름을 찾는 패턴. MySQL 중복 키/FK/CHECK, SQLite 순서
+CONSTRAINT_PATTERNS = [
+    re.compile(r"for key '([^']+)'"),
+    re.compile(r"CONSTRAINT `([^`]+)`"),
+    re.compile(r"[Cc]heck constraint '([^']+)'"),
+    re.compile(r"constraint failed: (.+)$", re.MULTILINE),
+]
 
-# 파일 핸들러 (로그를 파일에 기록)
-file_handler = logging.FileHandler('error.log')
-file_handler.setLevel(logging.ERROR)
-file_handler.setFormatter(formatter)
+# {테이블: {'counts': {(에러 코드, 제약조건): 행 수}, 'samples': [예시]}}
+_failures = {}
+_failures_lock = threading.Lock()
 
-# 핸들러를 로거에 추가
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
 
-def insert_dummy_data(selected_table, metadata, engine, data):
-    table = db.Table(selected_table, metadata, autoload=True, autoload_with=engine)
+def get_failure_key(error):
+    """
+    실패한 행의 에러를 (에러 코드, 제약조건 이름)으로 분류합니다. 코드가 없는 드라이버는 예외 클래스 이름을 씁니다.
+    """
+    orig = getattr(error, 'orig', None) or error
+    args = getattr(orig, 'args', ())
+    code = args[0] if args and isinstance(args[0], int) else type(orig).__name__
+    message = str(orig)
+    for pattern in CONSTRAINT_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return code, match.group(1).strip()
+    return code, None
+
+def format_sample_row(row):
+    return {name: value if len(repr(value)) <= MAX_SAMPLE_VALUE_LENGTH else repr(value)[:MAX_SAMPLE_VALUE_LENGTH] + '...'
+            for name, value in row.items()}
+
+def record_failed_row(selected_table, error, row):
+    """
+    행마다 로그를 남기지 않고 에러 코드/제약조건별 개수만 세고, 예시는 MAX_FAILURE_SAMPLES개까지만 남깁니다.
+    """
+    count('failed_rows', table_name=selected_table)
+    # 건너뛴 행 중 중복 키, FK 위반 같은 제약조건 위반은 따로 셈
+    if isinstance(error, db.exc.IntegrityError):
+        count('constraint_failures', table_name=selected_table)
+    key = get_failure_key(error)
+    with _failures_lock:
+        failures = _failures.setdefault(selected_table, {'counts': {}, 'samples': []})
+        failures['counts'][key] = failures['counts'].get(key, 0) + 1
+        if len(failures['samples']) < MAX_FAILURE_SAMPLES:
+            message = str(getattr(error, 'orig', None) or error).splitlines()[0]
+            failures['samples'].append({'error': message, 'row': format_sample_row(row)})
+
+def log_failure_summary(selected_table):
+    """
+    테이블의 실패 집계를 로그로 한 번에 남기고 비웁니다. 건너뛴 행 수를 반환합니다.
+    """
+    with _failures_lock:
+        failures = _failures.pop(selected_table, None)
+    if not failures:
+        return 0
+    skipped = sum(failures['counts'].values())
+    by_key = ', '.join(f"{code}/{constraint or '-'}: {num}"
+                       for (code, constraint), num in sorted(failures['counts'].items(), key=lambda item: -item[1]))
+    logger.error(f"Skipped {skipped} rows in {selected_table} (error code/constraint: {by_key})")
+    for sample in failures['samples']:
+        logger.error(f"Example failed row in {selected_table}: {sample['error']} row={sample['row']}")
+    print(f"제약조건 등으로 {selected_table}에서 {skipped}개의 행을 건너뛰었습니다. (자세한 내용은 error.log)")
+    return skipped
+
+def insert_batch(conn, table, selected_table, batch):
+    """
+    배치를 한 번의 executemany로 넣고, 제약조건 등으로 실패하면 배치를 반으로 나눠 다시 시도합니다.
+    한 행짜리 배치까지 실패하면 그 행만 건너뛰고 실패 집계에 더합니다. 실제로 들어간 행 수를 반환합니다.
+    """
+    if not batch:
+        return 0
+    count('batches', table_name=selected_table)
+    try:
+        # 세이브포인트로 감싸서 실패한 배치만 롤백하고 바깥 트랜잭션은 유지
+        with conn.begin_nested():
+            conn.execute(table.insert(), batch)
+        count('rows', len(batch), selected_table)
+        return len(batch)
+    except Exception as e:
+        if len(batch) == 1:
+            record_failed_row(selected_table, e, batch[0])
+            return 0
+        count('retries', table_name=selected_table)
+        mid = len(batch) // 2
+        return (insert_batch(conn, table, selected_table, batch[:mid])
+                + insert_batch(conn, table, selected_table, batch[mid:]))
+
+def insert_dummy_data(selected_table, metadata, engine, data, batch_size=DEFAULT_BATCH_SIZE, session_options=None,
+                      commit_rows=None):
+    """
+    data를 batch_size행씩 넣습니다. commit_rows가 있으면 그 행 수마다 커밋해서 트랜잭션이 테이블 전체만큼 커지지 않고,
+    session_options가 있으면 적재하는 동안 커넥션의 세션 변수를 바꿉니다. (bulk_session 모드)
+    """
+    table = db.Table(selected_table, metadata, autoload_with=engine)
+    batch_size = max(int(batch_size or DEFAULT_BATCH_SIZE), 1)
     insert_num = 0
-    with engine.connect() as conn:
-        with conn.begin():
-            for d in data:
-                try:
-                    query = table.insert().values(d)
-                    conn.execute(query)
-                    insert_num += 1
-                except Exception as e:
-                    logger.error(f"Failed to insert data into {selected_table}: {e}", exc_info=True)
-                    continue
+    # rows/sec는 executemany에 걸린 시간만으로 계산함. data가 생성 중인 스트림이면 전체 시간에는 생성을 기다린 시간도 들어감
+    insert_seconds = 0.0
+    start = time.perf_counter()
+    rows = iter(data)
+
+    def flush(conn, batch):
+        nonlocal insert_num, insert_seconds
+        batch_start = time.perf_counter()
+        with timed('insert', selected_table):
+            insert_num += insert_batch(conn, table, selected_table, batch)
+        insert_seconds += time.perf_counter() - batch_start
+
+    with engine.connect() as conn, bulk_session(conn, session_options):
+        while True:
+            seen = 0
+            with conn.begin():
+                batch = []
+                for d in (islice(rows, commit_rows) if commit_rows else rows):
+                    seen += 1
+                    batch.append(d)
+                    if len(batch) >= batch_size:
+                        flush(conn, batch)
+                        batch = []
+                if batch:
+                    flush(conn, batch)
+            if not commit_rows or seen < commit_rows:
+                break
+    log_failure_summary(selected_table)
+    elapsed = time.perf_counter() - start
+    rows_per_sec = insert_num / insert_seconds if insert_seconds > 0 else 0.0
+    logging.info(f"Inserted {insert_num} rows into {selected_table} in {insert_seconds:.2f}s of INSERT time "
+                 f"({rows_per_sec:.0f} rows/sec, batch_size={batch_size}); {elapsed:.2f}s end to end")
     if insert_num == 0:
         print("제약조건으로 인해 데이터를 더 추가할 수 없습니다.")
     else:
-        print(f"{insert_num}개의 데이터를 {selected_table}에 넣었습니다.")
\ No newline at end of file
+        print(f"{insert_num}개의 데이터를 {selected_table}에 넣었습니다. ({rows_per_sec:.0f} rows/sec)")
+    return insert_num
@@ -0,0 +1,42 @@
+# log_setup.py
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+
+
+def setup_logging(log_file='application.log', error_log_file='error.log', level=logging.INFO):
+    """
+    로그를 큐에 넣기만 하고 파일/콘솔 쓰기는 별도 스레드(QueueListener)에서 합니다.
+    insert 스레드는 로그 I/O를 기다리지 않습니다. ERROR 이상은 error_log_file에도 기록합니다.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.FileHandler(log_file)
+    console_handler = logging.StreamHandler()
+    error_handler = logging.FileHandler(error_log_file)
+    error_handler.setLevel(logging.ERROR)
+    for handler in (file_handler, console_handler, error_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    # QueueHandler는 큐에 넣기 전에 메시지를 미리 포맷하므로 시간/레벨은 붙이지 않고 실제 핸들러의 포맷에 맡김
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=level, handlers=[queue_handler])
+    _listener = QueueListener(log_queue, file_handler, console_handler, error_handler, respect_handler_level=True)
+    _listener.start()
+    # 종료 시 큐에 남은 로그를 모두 쓰고 멈춤
+    atexit.register(stop_logging)
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
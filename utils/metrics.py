@@ -0,0 +1,235 @@
+# metrics.py
+import cProfile
+import json
+import logging
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+# 측정하는 단계: 리플렉션, 생성, truncate, insert, 확인(조회), 파일로 내보내기
+PHASES = ('reflection', 'generate', 'truncate', 'insert', 'verify', 'export')
+# 테이블과 상관없는 단계(리플렉션 등)를 기록할 때 쓰는 이름
+ALL_TABLES = '_all'
+METRICS_FORMATS = ('json', 'prometheus')
+PROFILE_MODES = ('cprofile', 'tracemalloc')
+# --profile-file를 주지 않았을 때 프로파일 결과를 쓰는 파일
+DEFAULT_PROFILE_FILES = {
+    'cprofile': 'cprofile.prof',
+    'tracemalloc': 'tracemalloc.txt',
+}
+
+# {테이블: {'phases': {단계: {'seconds', 'calls'}}, 'counters': {이름: 값}}}
+_metrics = {}
+_metrics_lock = threading.Lock()
+_profiler = None
+# 프로파일링을 켠 스레드와, 다른 스레드(워커, 생산자)에서 profile_thread로 모은 스레드별 cProfile 결과
+_profiler_thread = None
+_thread_profilers = []
+# 3.12부터 cProfile은 sys.monitoring을 써서 한 프로파일러가 모든 스레드를 측정하고, 프로파일러를 두 개 켤 수 없음
+CPROFILE_ALL_THREADS = sys.version_info >= (3, 12)
+
+
+def get_table_metrics(table_name):
+    return _metrics.setdefault(table_name or ALL_TABLES, {'phases': {}, 'counters': {}})
+
+def record_phase(phase, seconds, table_name=None):
+    with _metrics_lock:
+        entry = get_table_metrics(table_name)['phases'].setdefault(phase, {'seconds': 0.0, 'calls': 0})
+        entry['seconds'] += seconds
+        entry['calls'] += 1
+
+@contextmanager
+def timed(phase, table_name=None):
+    """
+    with 블록에 걸린 시간을 테이블별 단계 시간에 더합니다. 예외가 나도 기록합니다.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - start, table_name)
+
+def count(name, value=1, table_name=None):
+    """
+    테이블별 카운터(rows, batches, retries, constraint_failures 등)를 value만큼 늘립니다.
+    """
+    with _metrics_lock:
+        counters = get_table_metrics(table_name)['counters']
+        counters[name] = counters.get(name, 0) + value
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+def get_peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, 리눅스는 KB 단위
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def snapshot_metrics():
+    """
+    지금까지 기록한 값을 json으로 저장할 수 있는 dict로 만듭니다.
+    """
+    with _metrics_lock:
+        tables = json.loads(json.dumps(_metrics))
+    snapshot = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'peak_rss_mb': round(get_peak_rss_mb(), 1),
+        'tables': tables,
+    }
+    if tracemalloc.is_tracing():
+        snapshot['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+    return snapshot
+
+def format_prometheus(snapshot):
+    lines = [
+        '# HELP dummy_phase_seconds Seconds spent in each phase per table.',
+        '# TYPE dummy_phase_seconds counter',
+    ]
+    for table_name, table in snapshot['tables'].items():
+        for phase, entry in table['phases'].items():
+            lines.append(f'dummy_phase_seconds{{table="{table_name}",phase="{phase}"}} {entry["seconds"]:.6f}')
+    lines += [
+        '# HELP dummy_phase_calls Number of times each phase ran per table.',
+        '# TYPE dummy_phase_calls counter',
+    ]
+    for table_name, table in snapshot['tables'].items():
+        for phase, entry in table['phases'].items():
+            lines.append(f'dummy_phase_calls{{table="{table_name}",phase="{phase}"}} {entry["calls"]}')
+    lines += [
+        '# HELP dummy_events_total Rows, batches, retries and constraint failures per table.',
+        '# TYPE dummy_events_total counter',
+    ]
+    for table_name, table in snapshot['tables'].items():
+        for name, value in table['counters'].items():
+            lines.append(f'dummy_events_total{{table="{table_name}",event="{name}"}} {value}')
+    lines += [
+        '# HELP dummy_peak_rss_bytes Peak resident set size of the process.',
+        '# TYPE dummy_peak_rss_bytes gauge',
+        f'dummy_peak_rss_bytes {int(snapshot["peak_rss_mb"] * 1024 * 1024)}',
+    ]
+    if 'tracemalloc_peak_mb' in snapshot:
+        lines += [
+            '# HELP dummy_tracemalloc_peak_bytes Peak memory traced by tracemalloc.',
+            '# TYPE dummy_tracemalloc_peak_bytes gauge',
+            f'dummy_tracemalloc_peak_bytes {int(snapshot["tracemalloc_peak_mb"] * 1024 * 1024)}',
+        ]
+    return '\n'.join(lines) + '\n'
+
+def write_metrics(path, metrics_format='json'):
+    """
+    기록한 값을 json 또는 Prometheus 텍스트 형식 파일로 씁니다.
+    """
+    if metrics_format not in METRICS_FORMATS:
+        raise ValueError(f"Unknown metrics format '{metrics_format}'. Use one of: {', '.join(METRICS_FORMATS)}")
+    snapshot = snapshot_metrics()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as file:
+        if metrics_format == 'json':
+            json.dump(snapshot, file, indent=2, ensure_ascii=False)
+        else:
+            file.write(format_prometheus(snapshot))
+    logging.info(f"Wrote metrics to {path}")
+
+def start_profiling(mode):
+    """
+    cProfile 또는 tracemalloc 프로파일링을 시작합니다. cProfile은 이 함수를 부른 스레드를 측정하고,
+    워커/생산자 스레드는 profile_thread로 감싼 함수가 스레드마다 따로 측정합니다. (tracemalloc은 원래 모든 스레드를 추적함)
+    """
+    global _profiler, _profiler_thread
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}'. Use one of: {', '.join(PROFILE_MODES)}")
+    if mode == 'cprofile':
+        _profiler_thread = threading.get_ident()
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    else:
+        tracemalloc.start()
+    logging.info(f"Started {mode} profiling")
+
+def profile_thread(function):
+    """
+    cProfile은 켠 스레드만 측정하므로, 다른 스레드에서 실행할 함수를 그 스레드용 프로파일러로 감쌉니다.
+    스레드별 결과는 stop_profiling에서 pstats.Stats.add로 합칩니다. cProfile 프로파일링 중이 아니면 함수를 그대로 반환합니다.
+    """
+    if _profiler is None or CPROFILE_ALL_THREADS:
+        return function
+
+    @wraps(function)
+    def profiled(*args, **kwargs):
+        # 프로파일링을 켠 스레드에서 바로 실행되면 그 프로파일러가 이미 측정 중임 (두 번째로 켜면 덮어써짐)
+        if threading.get_ident() == _profiler_thread:
+            return function(*args, **kwargs)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with _metrics_lock:
+                _thread_profilers.append(profiler)
+    return profiled
+
+def stop_profiling(mode, output_path):
+    """
+    프로파일링을 멈추고 결과를 파일로 씁니다. cProfile은 모든 스레드의 결과를 합친 pstats 파일과 누적 시간 상위 목록(.txt)을,
+    tracemalloc은 메모리를 가장 많이 잡은 코드 위치 목록을 씁니다.
+    """
+    global _profiler, _profiler_thread
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    if mode == 'cprofile' and _profiler is not None:
+        _profiler.disable()
+        stats = pstats.Stats(_profiler)
+        with _metrics_lock:
+            thread_profilers = list(_thread_profilers)
+            _thread_profilers.clear()
+        for profiler in thread_profilers:
+            stats.add(profiler)
+        stats.dump_stats(output_path)
+        with open(f"{output_path}.txt", 'w') as file:
+            stats.stream = file
+            stats.sort_stats('cumulative').print_stats(50)
+        _profiler, _profiler_thread = None, None
+        logging.info(f"Wrote cProfile stats from {len(thread_profilers) + 1} threads to {output_path} and {output_path}.txt")
+    elif mode == 'tracemalloc' and tracemalloc.is_tracing():
+        top_stats = tracemalloc.take_snapshot().statistics('lineno')
+        current, peak = tracemalloc.get_traced_memory()
+        with open(output_path, 'w') as file:
+            file.write(f"current: {current / (1024 * 1024):.1f} MB, peak: {peak / (1024 * 1024):.1f} MB\n")
+            for stat in top_stats[:50]:
+                file.write(f"{stat}\n")
+        tracemalloc.stop()
+        logging.info(f"Wrote tracemalloc top allocations to {output_path}")
+
+def add_metrics_arguments(parser):
+    """
+    메트릭/프로파일링 CLI 옵션을 argparse 파서에 추가합니다.
+    """
+    parser.add_argument('--metrics-file', help='단계별 시간과 행/배치/재시도/제약조건 실패 수를 기록할 파일')
+    parser.add_argument('--metrics-format', choices=METRICS_FORMATS, default='json', help='메트릭 파일 형식')
+    parser.add_argument('--profile', choices=PROFILE_MODES, help='cProfile 또는 tracemalloc 프로파일링')
+    parser.add_argument('--profile-file', help='프로파일 결과 파일 (기본값: cprofile.prof 또는 tracemalloc.txt)')
+    return parser
+
+@contextmanager
+def collect_metrics(metrics_file=None, metrics_format='json', profile=None, profile_file=None):
+    """
+    with 블록 동안 프로파일링을 켜고, 끝나면(에러가 나도) 프로파일 결과와 메트릭 파일을 씁니다.
+    """
+    if profile:
+        start_profiling(profile)
+    try:
+        yield
+    finally:
+        # tracemalloc 최대 메모리가 메트릭에 들어가도록 프로파일링을 멈추기 전에 씀
+        if metrics_file:
+            write_metrics(metrics_file, metrics_format)
+        if profile:
+            stop_profiling(profile, profile_file or DEFAULT_PROFILE_FILES[profile])
@@ -0,0 +1,213 @@
+# mongo_migrate.py
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, time as datetime_time, timedelta
+from sqlalchemy import text, column
+from sqlalchemy.dialects.mysql import SET
+from sqlalchemy.sql import sqltypes
+from .db_utils import get_table_detail
+from .metrics import timed, count, profile_thread
+from .pipeline import put_until_stopped, _DONE
+
+# 한 번에 읽어서 insert_many로 넣는 행 수, 동시에 insert_many를 보내는 스레드 수
+DEFAULT_MIGRATE_BATCH_SIZE = 5000
+DEFAULT_MIGRATE_WRITERS = 4
+# DECIMAL 변환 방식. decimal128은 정밀도를 그대로 유지하고, double은 기존 문서의 매핑처럼 부동소수점으로 바꿈
+DECIMAL_MODES = ('decimal128', 'double')
+
+
+def connect_mongo(mongo_config):
+    """
+    connection.yaml의 mongodb 설정({uri, database})으로 MongoDB 데이터베이스를 엽니다. pymongo가 설치되어 있어야 합니다.
+    """
+    try:
+        from pymongo import MongoClient
+    except ImportError as e:
+        raise RuntimeError("The migrate command requires the optional MongoDB dependency: pip install pymongo") from e
+    client = MongoClient(mongo_config.get('uri', 'mongodb://localhost:27017'))
+    return client, client[mongo_config['database']]
+
+def convert_date(value):
+    # BSON에는 날짜만 있는 타입이 없으므로 자정 시각의 datetime으로 저장
+    return datetime.combine(value, datetime_time()) if value is not None else None
+
+def convert_time(value):
+    # BSON에는 시각/기간 타입이 없으므로 MySQL TIME 표기(HH:MM:SS) 문자열로 저장
+    if isinstance(value, timedelta):
+        seconds = int(value.total_seconds())
+        return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    return value.isoformat() if value is not None else None
+
+def convert_set(value):
+    return sorted(value) if value is not None else None
+
+def convert_double(value):
+    return float(value) if value is not None else None
+
+def get_decimal128_converter():
+    try:
+        from bson.decimal128 import Decimal128
+    except ImportError as e:
+        raise RuntimeError("decimal_mode: decimal128 requires pymongo (bson): pip install pymongo") from e
+    return lambda value: Decimal128(value) if value is not None else None
+
+def build_converter(column_type, decimal_mode='decimal128'):
+    """
+    컬럼 타입으로 MySQL 값을 BSON에 넣을 수 있는 값으로 바꾸는 함수를 고릅니다. 그대로 넣으면 되는 타입은 None을 반환합니다.
+    """
+    if isinstance(column_type, sqltypes.Float):
+        return None
+    if isinstance(column_type, sqltypes.Numeric):
+        return get_decimal128_converter() if decimal_mode == 'decimal128' else convert_double
+    if isinstance(column_type, sqltypes.DateTime):
+        return None
+    if isinstance(column_type, sqltypes.Date):
+        return convert_date
+    if isinstance(column_type, (sqltypes.Time, sqltypes.Interval)):
+        return convert_time
+    if isinstance(column_type, SET):
+        return convert_set
+    return None
+
+def build_document_converter(details, decimal_mode='decimal128'):
+    """
+    테이블 컬럼 정보로 행(튜플)을 문서(dict)로 바꾸는 함수를 만듭니다. 컬럼별 변환 함수는 여기서 한 번만 고릅니다.
+    """
+    if decimal_mode not in DECIMAL_MODES:
+        raise ValueError(f"Unknown decimal_mode '{decimal_mode}'. Use one of: {', '.join(DECIMAL_MODES)}")
+    names = [column['name'] for column in details]
+    converters = [(column['name'], converter) for column in details
+                  if (converter := build_converter(column['type'], decimal_mode)) is not None]
+
+    def convert(rows):
+        documents = [dict(zip(names, row)) for row in rows]
+        for name, converter in converters:
+            for document in documents:
+                document[name] = converter(document[name])
+        return documents
+
+    return names, convert
+
+def insert_documents(collection, table_name, documents):
+    """
+    순서 없는(unordered) insert_many로 넣습니다. 중복 _id 등으로 일부 문서가 거부되면(BulkWriteError) 나머지는 들어가고,
+    들어간 수를 반환합니다. 연결/인증 오류, write concern 오류 같은 다른 실패는 그대로 올려서 write_documents가 마이그레이션을 멈춥니다.
+    """
+    # 컬렉션은 connect_mongo(pymongo)로 연 것이므로 pymongo는 이미 설치되어 있음
+    from pymongo.errors import BulkWriteError
+    try:
+        collection.insert_many(documents, ordered=False)
+        return len(documents)
+    except BulkWriteError as e:
+        if e.details.get('writeConcernErrors'):
+            raise
+        inserted = e.details['nInserted']
+        count('failed_rows', len(documents) - inserted, table_name)
+        logging.warning(f"{len(documents) - inserted} documents of a batch for {table_name} were rejected: "
+                        f"{(e.details.get('writeErrors') or [{}])[0].get('errmsg')}")
+        return inserted
+
+def write_documents(collection, table_name, document_queue, stop_event, inserted, errors, lock):
+    """
+    쓰기 스레드: 큐에서 문서 배치를 꺼내 insert_many로 넣습니다. 실패하면 에러를 남기고 다른 스레드와 읽기도 멈춥니다.
+    """
+    try:
+        while not stop_event.is_set():
+            try:
+                documents = document_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if documents is _DONE:
+                return
+            with timed('insert', table_name):
+                num = insert_documents(collection, table_name, documents)
+            count('rows', num, table_name)
+            count('batches', table_name=table_name)
+            with lock:
+                inserted[0] += num
+    except Exception as e:
+        errors.append(e)
+        stop_event.set()
+
+def migrate_table(table_name, engine, mongo_db, batch_size=DEFAULT_MIGRATE_BATCH_SIZE, writers=DEFAULT_MIGRATE_WRITERS,
+                  decimal_mode='decimal128', details=None):
+    """
+    MySQL 테이블 하나를 같은 이름의 MongoDB 컬렉션으로 옮깁니다.
+    서버 사이드 커서로 batch_size개씩 읽어 문서로 바꾼 뒤, writers개의 스레드가 동시에 insert_many로 넣습니다.
+    큐에는 writers * 2개 배치까지만 쌓아두므로 테이블 크기와 관계없이 메모리 사용량이 일정합니다.
+    mongo_db는 컬렉션을 이름으로 꺼낼 수 있고 insert_many(documents, ordered=False)를 지원하면 됩니다.
+    """
+    batch_size = max(int(batch_size or DEFAULT_MIGRATE_BATCH_SIZE), 1)
+    writers = max(int(writers or DEFAULT_MIGRATE_WRITERS), 1)
+    if details is None:
+        details = get_table_detail(engine, [table_name])[table_name]['details']
+    names, convert = build_document_converter(details, decimal_mode)
+    collection = mongo_db[table_name]
+
+    document_queue = queue.Queue(maxsize=writers * 2)
+    stop_event = threading.Event()
+    inserted, errors, lock = [0], [], threading.Lock()
+    threads = [threading.Thread(target=profile_thread(write_documents),
+                                args=(collection, table_name, document_queue, stop_event, inserted, errors, lock),
+                                name=f"migrate-{table_name}-{i}", daemon=True)
+               for i in range(writers)]
+    for thread in threads:
+        thread.start()
+
+    read_num = 0
+    start = time.perf_counter()
+    columns = ', '.join(f"`{name}`" for name in names)
+    try:
+        with engine.connect() as conn:
+            # stream_results: 결과를 한꺼번에 받지 않고 서버 사이드 커서로 조금씩 읽음
+            # 리플렉션한 타입을 붙여서 드라이버가 문자열로 돌려주는 값(SQLite의 날짜 등)도 파이썬 타입으로 받음
+            query = text(f"SELECT {columns} FROM `{table_name}`").columns(
+                *[column(detail['name'], detail['type']) for detail in details])
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+            for rows in result.partitions():
+                documents = convert(rows)
+                read_num += len(documents)
+                if not put_until_stopped(document_queue, documents, stop_event):
+                    break
+    except BaseException:
+        stop_event.set()
+        raise
+    finally:
+        for _ in threads:
+            put_until_stopped(document_queue, _DONE, stop_event)
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+    elapsed = time.perf_counter() - start
+    docs_per_sec = inserted[0] / elapsed if elapsed > 0 else 0.0
+    logging.info(f"Migrated {inserted[0]}/{read_num} rows from {table_name} to MongoDB in {elapsed:.2f}s "
+                 f"({docs_per_sec:.0f} docs/sec, batch_size={batch_size}, writers={writers}, decimal_mode={decimal_mode})")
+    print(f"{table_name}의 {inserted[0]}개 행을 MongoDB 컬렉션 {table_name}으로 옮겼습니다. ({docs_per_sec:.0f} docs/sec)")
+    return inserted[0]
+
+def migrate_tables(engine, table_names, mongo_config, batch_size=DEFAULT_MIGRATE_BATCH_SIZE,
+                   writers=DEFAULT_MIGRATE_WRITERS, decimal_mode='decimal128', drop_collections=False, mongo_db=None):
+    """
+    여러 테이블을 차례로 옮깁니다. 컬럼 정보는 get_table_detail로 한 번에 가져옵니다.
+    drop_collections면 옮기기 전에 같은 이름의 컬렉션을 지웁니다. mongo_db를 주면 mongo_config 대신 그것을 씁니다.
+    """
+    client = None
+    if mongo_db is None:
+        client, mongo_db = connect_mongo(mongo_config)
+    try:
+        with timed('reflection'):
+            table_detail = get_table_detail(engine, table_names)
+        results = {}
+        for table_name in table_names:
+            if drop_collections:
+                mongo_db[table_name].drop()
+            results[table_name] = migrate_table(table_name, engine, mongo_db, batch_size, writers, decimal_mode,
+                                                table_detail[table_name]['details'])
+        return results
+    finally:
+        if client is not None:
+            client.close()
@@ -0,0 +1,128 @@
+# pipeline.py
+import logging
+import queue
+import threading
+import time
+from .data_generator import generate_dummy_data_chunks, generate_dummy_data_chunks_parallel
+from .insert_data import insert_dummy_data, DEFAULT_BATCH_SIZE
+from .bulk_load import load_dummy_data
+from .metrics import record_phase, profile_thread
+from .snapshot import record_snapshot, iter_snapshot_rows
+
+# 한 번에 생성하는 행 수와 큐에 쌓아둘 수 있는 최대 청크 수
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_QUEUE_SIZE = 4
+# loader 설정값별 적재 함수. insert는 배치 INSERT, load_data는 LOAD DATA LOCAL INFILE (불가능하면 배치 INSERT로 대체)
+LOADERS = {
+    'insert': insert_dummy_data,
+    'load_data': load_dummy_data,
+}
+# 생성이 끝났음을 알리는 표식
+_DONE = object()
+
+
+def put_until_stopped(chunk_queue, item, stop_event):
+    """
+    큐에 자리가 날 때까지 기다렸다가 넣습니다. insert 쪽이 멈추면 포기하고 False를 반환합니다.
+    """
+    while not stop_event.is_set():
+        try:
+            chunk_queue.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def produce_chunks(chunks, chunk_queue, stop_event, table_name=None):
+    """
+    생성 스레드: 청크를 만들어 큐에 넣습니다. 큐가 가득 차면 insert가 따라올 때까지 기다립니다.
+    큐를 기다린 시간은 빼고 청크를 만드는 데 걸린 시간만 generate 단계로 기록합니다.
+    """
+    try:
+        start = time.perf_counter()
+        for chunk in chunks:
+            record_phase('generate', time.perf_counter() - start, table_name)
+            if not put_until_stopped(chunk_queue, chunk, stop_event):
+                return
+            start = time.perf_counter()
+        put_until_stopped(chunk_queue, _DONE, stop_event)
+    except Exception as e:
+        # 생성 중 에러는 insert 쪽에서 다시 발생시킴
+        put_until_stopped(chunk_queue, e, stop_event)
+
+def consume_chunks(chunk_queue):
+    """
+    큐에서 청크를 꺼내 행 단위로 yield 합니다.
+    """
+    while True:
+        item = chunk_queue.get()
+        if item is _DONE:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield from item
+
+def start_producer(table_name, dummy_num, engine, plan, chunk_size=DEFAULT_CHUNK_SIZE, queue_size=DEFAULT_QUEUE_SIZE,
+                   seed=None, workers=1, key_pools=None, existing_values=None, resume_state=None, with_state=False,
+                   snapshot_path=None):
+    """
+    청크를 생성해서 크기가 제한된 큐에 넣는 생성 스레드를 시작하고 (큐, 중지 이벤트, 스레드)를 반환합니다.
+    workers가 2 이상이면 청크 생성을 여러 프로세스로 나눕니다.
+    with_state가 True면 큐에는 (청크, 생성 상태)가 들어갑니다.
+    snapshot_path가 있으면 생성한 청크를 그 경로의 스냅샷 파일에도 씁니다.
+    """
+    chunk_queue = queue.Queue(maxsize=max(int(queue_size or DEFAULT_QUEUE_SIZE), 1))
+    stop_event = threading.Event()
+    chunk_size = max(int(chunk_size or DEFAULT_CHUNK_SIZE), 1)
+    workers = max(int(workers or 1), 1)
+    if workers > 1:
+        chunks = generate_dummy_data_chunks_parallel(table_name, dummy_num, None, engine, chunk_size, workers,
+                                                     seed=seed, plan=plan, key_pools=key_pools,
+                                                     existing_values=existing_values, resume_state=resume_state,
+                                                     with_state=with_state)
+    else:
+        chunks = generate_dummy_data_chunks(table_name, dummy_num, None, engine, chunk_size, seed=seed, plan=plan,
+                                            key_pools=key_pools, existing_values=existing_values,
+                                            resume_state=resume_state, with_state=with_state)
+    if snapshot_path:
+        chunks = record_snapshot(chunks, snapshot_path, plan)
+    producer = threading.Thread(target=profile_thread(produce_chunks), args=(chunks, chunk_queue, stop_event, table_name),
+                                name=f"generate-{table_name}", daemon=True)
+    producer.start()
+    return chunk_queue, stop_event, producer
+
+def stream_dummy_data(table_name, dummy_num, metadata, engine, plan, batch_size=DEFAULT_BATCH_SIZE,
+                      chunk_size=DEFAULT_CHUNK_SIZE, queue_size=DEFAULT_QUEUE_SIZE, seed=None, workers=1,
+                      key_pools=None, existing_values=None, loader='insert', session_options=None, commit_rows=None,
+                      snapshot_path=None):
+    """
+    더미 데이터를 청크 단위로 생성하면서 동시에 DB에 넣습니다.
+    생성은 별도 스레드에서 돌고, 크기가 제한된 큐로 넘기기 때문에 메모리 사용량은 행 수와 관계없이 일정합니다.
+    workers가 2 이상이면 청크 생성을 여러 프로세스로 나눕니다. FK 컬럼은 key_pools의 부모 키에서 뽑고,
+    unique 컬럼은 existing_values에 있는 기존 값을 피해서 만듭니다. loader로 배치 INSERT와 LOAD DATA 중 적재 방식을 고릅니다.
+    session_options, commit_rows는 bulk_session 모드에서 적재 커넥션의 세션 변수와 청크 커밋 행 수입니다.
+    snapshot_path가 있으면 넣는 데이터를 스냅샷 파일로도 남겨서 다음에는 replay_dummy_data로 다시 생성하지 않고 넣습니다.
+    """
+    if loader not in LOADERS:
+        raise ValueError(f"Unknown loader '{loader}'. Use one of: {', '.join(LOADERS)}")
+    chunk_queue, stop_event, producer = start_producer(table_name, dummy_num, engine, plan, chunk_size, queue_size,
+                                                       seed, workers, key_pools, existing_values,
+                                                       snapshot_path=snapshot_path)
+    logging.info(f"Streaming {dummy_num} rows into {table_name} (chunk_size={chunk_size}, queue_size={queue_size}, workers={workers}, loader={loader})")
+    try:
+        return LOADERS[loader](table_name, metadata, engine, consume_chunks(chunk_queue), batch_size,
+                              session_options=session_options, commit_rows=commit_rows)
+    finally:
+        stop_event.set()
+        producer.join()
+
+def replay_dummy_data(table_name, metadata, engine, snapshot_path, batch_size=DEFAULT_BATCH_SIZE, loader='insert',
+                      session_options=None, commit_rows=None):
+    """
+    스냅샷 파일의 행을 다시 생성하지 않고 그대로 적재 함수로 넘깁니다. 파일은 레코드 배치 단위로 읽으므로 메모리 사용량은 일정합니다.
+    """
+    if loader not in LOADERS:
+        raise ValueError(f"Unknown loader '{loader}'. Use one of: {', '.join(LOADERS)}")
+    logging.info(f"Replaying {table_name} from snapshot {snapshot_path} (loader={loader})")
+    return LOADERS[loader](table_name, metadata, engine, iter_snapshot_rows(snapshot_path), batch_size,
+                           session_options=session_options, commit_rows=commit_rows)
@@ -0,0 +1,143 @@
+# scheduler.py
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .db_utils import load_key_pool, truncate_table
+from .metrics import profile_thread
+
+
+def run_concurrently(items, task, max_workers=1, label='table'):
+    """
+    items의 각 항목에 대해 task(item)를 스레드 풀에서 동시에 실행합니다.
+    한 항목이 실패해도 나머지는 계속 진행하고, 성공한 항목의 결과를 {item: result}로 반환합니다.
+    max_workers가 1이면 기존처럼 순서대로 하나씩 처리됩니다.
+    """
+    results = {}
+    max_workers = max(int(max_workers or 1), 1)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{label}-worker") as executor:
+        # --profile cprofile이면 워커 스레드에서 실행한 부분도 스레드마다 측정해서 합침
+        task = profile_thread(task)
+        futures = {executor.submit(task, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                results[item] = future.result()
+                logging.info(f"Successfully processed {label} {item}.")
+            except Exception as e:
+                logging.error(f"An error occurred while processing {label} {item}: {e}", exc_info=True)
+    return results
+
+def get_table_dependencies(table_names, column_plans):
+    """
+    컬럼 플랜의 FK 정보로 {테이블: 이번 실행에 포함된 부모 테이블 집합}을 만듭니다. 자기 참조는 제외합니다.
+    """
+    table_set = set(table_names)
+    return {
+        table_name: {
+            column.foreign_key[0]
+            for column in column_plans.get(table_name, ())
+            if column.foreign_key and column.foreign_key[0] in table_set and column.foreign_key[0] != table_name
+        }
+        for table_name in table_names
+    }
+
+def build_dependency_levels(table_names, column_plans):
+    """
+    FK 관계로 테이블들을 위상 정렬해서 단계별 목록으로 나눕니다. 같은 단계의 테이블들은 서로 의존하지 않습니다.
+    순환 참조가 있으면 남은 테이블들을 마지막 단계에 모아 넣습니다.
+    """
+    dependencies = get_table_dependencies(table_names, column_plans)
+    levels = []
+    done = set()
+    remaining = list(table_names)
+    while remaining:
+        level = [table_name for table_name in remaining if dependencies[table_name] <= done]
+        if not level:
+            logging.warning(f"Circular foreign keys between tables {remaining}; seeding them in one level.")
+            level = remaining
+        levels.append(level)
+        done.update(level)
+        remaining = [table_name for table_name in remaining if table_name not in done]
+    return levels
+
+def get_dependent_tables(table_names, column_plans, failed_tables):
+    """
+    failed_tables와, FK로 그 테이블들을 직접 또는 간접적으로 참조하는 table_names의 테이블들을 집합으로 반환합니다.
+    """
+    dependencies = get_table_dependencies(table_names, column_plans)
+    skipped = set(failed_tables)
+    while True:
+        dependents = {table_name for table_name in table_names
+                      if table_name not in skipped and dependencies[table_name] & skipped}
+        if not dependents:
+            return skipped
+        skipped |= dependents
+
+def truncate_in_dependency_order(engine, table_names, column_plans, max_workers=1):
+    """
+    자식 테이블부터 FK 의존 단계의 역순으로 테이블들을 비우고, 채워도 되는 테이블 이름 목록을 반환합니다.
+    비우지 못한 테이블에 그대로 채우면 남아 있는 행과 키가 겹치므로, 그 테이블과 그 테이블을 참조하는 테이블은 채우지 않습니다.
+    """
+    failed_tables = []
+    for level in reversed(build_dependency_levels(table_names, column_plans)):
+        truncated = run_concurrently(level, lambda table_name: truncate_table(table_name, engine), max_workers)
+        failed_tables += [table_name for table_name in level if table_name not in truncated]
+    if not failed_tables:
+        return list(table_names)
+    skipped = get_dependent_tables(table_names, column_plans, failed_tables)
+    logging.error(f"Could not clear tables {failed_tables}; not seeding {[name for name in table_names if name in skipped]}")
+    print(f"비우지 못한 테이블이 있어서 {', '.join(name for name in table_names if name in skipped)} 테이블은 채우지 않습니다.")
+    return [table_name for table_name in table_names if table_name not in skipped]
+
+def run_in_dependency_order(engine, table_names, column_plans, task, max_workers=1):
+    """
+    부모 테이블부터 단계별로 task(table_name, key_pools)를 실행합니다. 같은 단계 안의 테이블들은 동시에 처리합니다.
+    각 단계를 시작하기 전에 그 단계의 FK 컬럼이 참조하는 부모 키들을 DB에서 읽어 key_pools에 채워둡니다.
+    """
+    key_pools = {}
+    results = {}
+    for level in build_dependency_levels(table_names, column_plans):
+        for table_name in level:
+            for column in column_plans.get(table_name, ()):
+                if column.foreign_key and column.foreign_key not in key_pools:
+                    key_pools[column.foreign_key] = load_key_pool(engine, *column.foreign_key)
+        logging.info(f"Seeding tables {level}")
+        results.update(run_concurrently(level, lambda table_name: task(table_name, key_pools), max_workers))
+    return results
+
+async def run_concurrently_async(items, task, max_concurrency=1, label='table'):
+    """
+    run_concurrently의 asyncio 버전. 코루틴 task(item)를 세마포어로 max_concurrency개까지만 동시에 실행합니다.
+    """
+    semaphore = asyncio.Semaphore(max(int(max_concurrency or 1), 1))
+
+    async def run(item):
+        async with semaphore:
+            return await task(item)
+
+    items = list(items)
+    results = {}
+    outcomes = await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+    for item, outcome in zip(items, outcomes):
+        if isinstance(outcome, Exception):
+            logging.error(f"An error occurred while processing {label} {item}: {outcome}", exc_info=outcome)
+        else:
+            results[item] = outcome
+            logging.info(f"Successfully processed {label} {item}.")
+    return results
+
+async def run_in_dependency_order_async(engine, table_names, column_plans, task, max_concurrency=1):
+    """
+    run_in_dependency_order의 asyncio 버전. task는 코루틴 함수 task(table_name, key_pools)이고,
+    부모 키는 동기 engine으로 스레드에서 읽습니다.
+    """
+    key_pools = {}
+    results = {}
+    for level in build_dependency_levels(table_names, column_plans):
+        for table_name in level:
+            for column in column_plans.get(table_name, ()):
+                if column.foreign_key and column.foreign_key not in key_pools:
+                    key_pools[column.foreign_key] = await asyncio.to_thread(load_key_pool, engine, *column.foreign_key)
+        logging.info(f"Seeding tables {level}")
+        results.update(await run_concurrently_async(level, lambda table_name: task(table_name, key_pools), max_concurrency))
+    return results
@@ -0,0 +1,109 @@
+# schema_cache.py
+import os
+import pickle
+import logging
+import sqlalchemy as db
+from sqlalchemy import text, bindparam
+from .data_generator import load_or_build_column_plans, load_column_plans, build_column_plans
+from .ddl_schema import parse_create_tables
+from .metrics import timed
+
+# 테이블별 스키마 지문: CREATE_TIME과 컬럼 정의/제약조건 목록의 MD5
+# UPDATE_TIME은 데이터가 바뀔 때마다 갱신되어 더미 데이터를 넣는 것만으로도 캐시가 무효화되므로 쓰지 않음
+SCHEMA_FINGERPRINT_QUERY = text("""
+    SELECT c.TABLE_NAME, t.CREATE_TIME,
+           MD5(GROUP_CONCAT(
+               CONCAT_WS(':', c.COLUMN_NAME, c.COLUMN_TYPE, c.IS_NULLABLE, c.COLUMN_KEY, c.EXTRA,
+                         IFNULL(k.CONSTRAINT_NAME, ''), IFNULL(k.REFERENCED_TABLE_NAME, ''),
+                         IFNULL(k.REFERENCED_COLUMN_NAME, ''))
+               ORDER BY c.ORDINAL_POSITION, k.CONSTRAINT_NAME SEPARATOR ',')) AS FINGERPRINT
+    FROM INFORMATION_SCHEMA.COLUMNS c
+    JOIN INFORMATION_SCHEMA.TABLES t
+      ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+    LEFT JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE k
+      ON k.TABLE_SCHEMA = c.TABLE_SCHEMA AND k.TABLE_NAME = c.TABLE_NAME AND k.COLUMN_NAME = c.COLUMN_NAME
+    WHERE c.TABLE_SCHEMA = DATABASE()
+    AND c.TABLE_NAME IN :table_names
+    GROUP BY c.TABLE_NAME, t.CREATE_TIME
+""").bindparams(bindparam('table_names', expanding=True))
+# GROUP_CONCAT 기본 최대 길이(1024)로는 컬럼이 많은 테이블의 정의가 잘려서 변경을 놓칠 수 있음
+GROUP_CONCAT_MAX_LEN = 1024 * 1024
+
+
+def get_schema_fingerprints(engine, table_names):
+    """
+    테이블별 스키마 지문을 쿼리 한 번으로 가져옵니다. MySQL이 아니면 빈 dict를 반환하고 캐시는 검증 없이 쓰입니다.
+    """
+    table_names = list(table_names)
+    if engine.dialect.name != 'mysql' or not table_names:
+        return {}
+    with engine.connect() as conn:
+        conn.execute(text(f"SET SESSION group_concat_max_len = {GROUP_CONCAT_MAX_LEN}"))
+        result = conn.execute(SCHEMA_FINGERPRINT_QUERY, {'table_names': table_names})
+        return {row[0]: f"{row[1]}:{row[2]}" for row in result}
+
+def get_metadata_cache_path(plan_cache_path):
+    """
+    컬럼 플랜 캐시(config/서버이름/db이름_plan.yaml) 옆에 MetaData 캐시 파일을 둡니다.
+    """
+    return f"{os.path.splitext(plan_cache_path)[0]}_metadata.pickle"
+
+def load_metadata(engine, table_names, cache_path=None, fingerprints=None):
+    """
+    MetaData 캐시의 지문이 모든 테이블에서 현재 스키마와 같으면 리플렉션 없이 캐시를 쓰고,
+    아니면 table_names만 리플렉션한 뒤 캐시에 저장합니다. 지문이 없으면(MySQL이 아니면) 항상 리플렉션합니다.
+    """
+    if cache_path and fingerprints and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as file:
+                cached = pickle.load(file)
+            cached_fingerprints = cached['fingerprints']
+            if all(name in cached['metadata'].tables and cached_fingerprints.get(name) == fingerprints.get(name)
+                   for name in table_names):
+                logging.info(f"Loaded metadata for {len(table_names)} tables from {cache_path}")
+                return cached['metadata']
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable metadata cache {cache_path}: {e}")
+
+    metadata = db.MetaData()
+    if table_names:
+        metadata.reflect(bind=engine, only=list(table_names))
+    logging.info(f"Reflected {len(metadata.tables)} tables into metadata")
+    if cache_path and fingerprints:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        with open(cache_path, 'wb') as file:
+            pickle.dump({'fingerprints': fingerprints, 'metadata': metadata}, file)
+    return metadata
+
+def load_schema(engine, table_names, plan_cache_path=None):
+    """
+    채울 테이블들의 MetaData와 컬럼 플랜을 가져옵니다.
+    캐시가 있고 스키마 지문이 그대로면 지문 쿼리 한 번만 하고 리플렉션은 건너뜁니다.
+    """
+    with timed('reflection'):
+        fingerprints = get_schema_fingerprints(engine, table_names)
+        column_plans = load_or_build_column_plans(engine, table_names, plan_cache_path, fingerprints)
+        metadata_cache_path = get_metadata_cache_path(plan_cache_path) if plan_cache_path else None
+        metadata = load_metadata(engine, table_names, metadata_cache_path, fingerprints)
+    return metadata, column_plans
+
+def load_offline_column_plans(table_names, plan_cache_path=None, schema_file=None):
+    """
+    DB에 연결하지 않고 컬럼 플랜을 가져옵니다. schema_file(CREATE TABLE 문)이 있으면 그 정의를 먼저 쓰고,
+    나머지 테이블은 컬럼 플랜 캐시에서 불러옵니다. 스키마 지문으로 검증할 수 없으므로 캐시는 그대로 믿습니다.
+    """
+    column_plans = {}
+    with timed('reflection'):
+        if schema_file:
+            with open(schema_file, 'r', encoding='utf-8') as file:
+                column_plans.update(build_column_plans(parse_create_tables(file.read(), table_names)))
+        missing_tables = [table_name for table_name in table_names if table_name not in column_plans]
+        if missing_tables and plan_cache_path and os.path.exists(plan_cache_path):
+            cached_plans = load_column_plans(plan_cache_path)
+            column_plans.update({table_name: cached_plans[table_name]
+                                 for table_name in missing_tables if table_name in cached_plans})
+    missing_tables = [table_name for table_name in table_names if table_name not in column_plans]
+    if missing_tables:
+        raise ValueError(f"No schema for tables {missing_tables}; add their CREATE TABLE statements to the schema file "
+                         f"or run once against the database to fill the column plan cache.")
+    return {table_name: column_plans[table_name] for table_name in table_names}
@@ -0,0 +1,120 @@
+# snapshot.py
+import hashlib
+import json
+import logging
+import os
+import pickle
+
+# 스냅샷 파일 형식 버전. 버전이 바뀌면 키가 달라져서 예전 스냅샷은 쓰지 않음
+SNAPSHOT_VERSION = 1
+# Arrow IPC 파일 압축 방식 (lz4 또는 zstd, None이면 압축 안 함)
+SNAPSHOT_COMPRESSION = 'zstd'
+
+
+def import_pyarrow():
+    """
+    스냅샷은 선택 기능이라 pyarrow가 설치되어 있어야 합니다.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+    except ImportError as e:
+        raise RuntimeError("Snapshots require the optional dependency pyarrow: pip install pyarrow") from e
+    return pa
+
+def get_plan_hash(plan):
+    """
+    컬럼 플랜(스키마와 분포 프로필)의 해시. 생성 함수에 바인딩된 파라미터까지 포함하므로 분포 설정이 바뀌어도 달라집니다.
+    """
+    digest = hashlib.sha256()
+    for column in plan:
+        digest.update(json.dumps([column.name, column.data_type, column.params, column.unique,
+                                  list(column.foreign_key) if column.foreign_key else None],
+                                 sort_keys=True, default=str).encode())
+        digest.update(column.generator.func.__name__.encode())
+        # 값 풀처럼 실행마다 이름이 달라지는 공유 메모리를 가리키는 파라미터는 내용을 정하는 content_key로 해시
+        keywords = {name: getattr(value, 'content_key', value) for name, value in column.generator.keywords.items()}
+        digest.update(pickle.dumps(keywords, protocol=4))
+    return digest.hexdigest()
+
+def get_key_pool_hash(plan, key_pools):
+    """
+    FK 컬럼이 뽑는 부모 키 목록의 해시. 부모 테이블 데이터가 다르면 같은 시드라도 다른 FK 값이 나오므로 키에 포함합니다.
+    """
+    digest = hashlib.sha256()
+    for column in plan:
+        if column.foreign_key:
+            keys = (key_pools or {}).get(column.foreign_key)
+            digest.update(repr(column.foreign_key).encode())
+            digest.update(str(len(keys) if keys is not None else -1).encode())
+            for key in (keys if keys is not None else ()):
+                digest.update(str(key).encode())
+                digest.update(b'\x1f')
+    return digest.hexdigest()
+
+def get_snapshot_path(snapshot_dir, table_name, plan, seed, dummy_num, chunk_size, workers, key_pools=None):
+    """
+    스냅샷 파일 경로. 스키마 해시, 시드, 행 수, 청크 크기, 워커 수, 부모 키가 모두 같을 때만 같은 경로가 나옵니다.
+    (청크 크기와 워커 수가 다르면 같은 시드로도 다른 데이터가 생성됨)
+    """
+    digest = hashlib.sha256(json.dumps(
+        [SNAPSHOT_VERSION, get_plan_hash(plan), int(dummy_num), int(chunk_size), max(int(workers or 1), 1),
+         get_key_pool_hash(plan, key_pools)]).encode()).hexdigest()[:16]
+    return os.path.join(snapshot_dir, f"{table_name}_{seed}_{digest}.arrow")
+
+def get_arrow_schema(pa, plan, rows):
+    """
+    첫 청크에서 컬럼 타입을 추론하되, DECIMAL은 뒤 청크의 값도 들어가도록 컬럼 정의의 자릿수를 씁니다.
+    """
+    schema = pa.RecordBatch.from_pylist(rows).schema
+    for column in plan:
+        index = schema.get_field_index(column.name)
+        if index >= 0 and column.data_type == 'DECIMAL' and pa.types.is_decimal(schema.field(index).type):
+            left, right = column.params['data_left_digits'], column.params['data_right_digits']
+            schema = schema.set(index, pa.field(column.name, pa.decimal128(left + right, right)))
+    return schema
+
+def record_snapshot(chunks, path, plan):
+    """
+    청크를 그대로 yield 하면서 Arrow IPC 파일에 청크 하나를 레코드 배치 하나로 씁니다.
+    끝까지 다 쓴 경우에만 파일 이름을 바꿔서, 중간에 멈춘 생성으로 불완전한 스냅샷이 남지 않게 합니다.
+    """
+    pa = import_pyarrow()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f"{path}.tmp"
+    writer, schema, rows_written = None, None, 0
+    completed = False
+    try:
+        with pa.OSFile(temp_path, 'wb') as sink:
+            for rows in chunks:
+                if rows:
+                    if writer is None:
+                        schema = get_arrow_schema(pa, plan, rows)
+                        options = pa.ipc.IpcWriteOptions(compression=SNAPSHOT_COMPRESSION)
+                        writer = pa.ipc.new_file(sink, schema, options=options)
+                    writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+                    rows_written += len(rows)
+                yield rows
+            if writer is not None:
+                writer.close()
+        completed = writer is not None
+    finally:
+        if completed:
+            os.replace(temp_path, path)
+            logging.info(f"Wrote snapshot of {rows_written} rows to {path}")
+        elif os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def iter_snapshot_chunks(path):
+    """
+    스냅샷 파일을 메모리 맵으로 열어 레코드 배치(청크)마다 행 dict 리스트를 yield 합니다.
+    """
+    pa = import_pyarrow()
+    with pa.memory_map(path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            yield reader.get_batch(index).to_pylist()
+
+def iter_snapshot_rows(path):
+    for rows in iter_snapshot_chunks(path):
+        yield from rows
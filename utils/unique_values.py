@@ -0,0 +1,271 @@
+# unique_values.py
+import logging
+import math
+import string
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+import numpy as np
+
+# 문자열 unique 값에 사용하는 문자 집합. MySQL 기본 collation은 대소문자를 구분하지 않아서
+# 'aBcD'와 'ABCD'가 같은 키로 충돌하므로 소문자와 숫자만 씀
+UNIQUE_CHARS = string.ascii_lowercase + string.digits
+UNIQUE_ALPHABET = np.frombuffer(UNIQUE_CHARS.encode(), dtype=np.uint8)
+# 문자열 앞부분 몇 글자로 unique 값을 인코딩할지. 36^12는 int64 범위 안에 들어감
+MAX_ENCODED_CHARS = 12
+# 정수 타입별 값 공간 (0 이상의 값만 사용)
+INTEGER_SPACES = {
+    'SMALLINT': 2 ** 15,
+    'MEDIUMINT': 2 ** 23,
+    'INTEGER': 2 ** 31,
+}
+# FLOAT/DOUBLE unique 값은 0.01 ~ 99999.99
+FLOAT_SPACE = 10 ** 7 - 1
+# BLOB/BINARY unique 값의 바이트 수 (기존 Faker binary(length=10)과 동일)
+BINARY_LENGTH = 10
+
+
+def get_value_space(data_type, params):
+    """
+    컬럼 타입이 만들 수 있는 서로 다른 값의 개수를 반환합니다. 지원하지 않는 타입이면 None을 반환합니다.
+    """
+    if data_type in ['CHAR', 'VARCHAR']:
+        return len(UNIQUE_ALPHABET) ** min(params.get('data_length') or 20, MAX_ENCODED_CHARS)
+    elif data_type == 'TEXT':
+        return len(UNIQUE_ALPHABET) ** MAX_ENCODED_CHARS
+    elif data_type in INTEGER_SPACES:
+        return INTEGER_SPACES[data_type]
+    elif data_type in ['FLOAT', 'DOUBLE']:
+        return FLOAT_SPACE
+    elif data_type == 'DECIMAL':
+        return 10 ** (params['data_left_digits'] + params['data_right_digits']) - 1
+    elif data_type == 'DATE':
+        return (date.today() - date(1970, 1, 1)).days
+    elif data_type in ['DATETIME', 'TIMESTAMP']:
+        return (date.today() - date(1970, 1, 1)).days * 24 * 60 * 60
+    elif data_type == 'TIME':
+        return 24 * 60 * 60
+    elif data_type == 'YEAR':
+        return date.today().year - 1970 + 1
+    elif data_type == 'BOOLEAN':
+        return 2
+    elif data_type == 'ENUM':
+        return len(params['data_options'])
+    elif data_type in ['BLOB', 'BINARY']:
+        return 256 ** BINARY_LENGTH
+    return None
+
+def describe_column_type(data_type, params):
+    if data_type in ['CHAR', 'VARCHAR']:
+        return f"{data_type}({params.get('data_length')})"
+    elif data_type == 'DECIMAL':
+        return f"DECIMAL({params['data_left_digits'] + params['data_right_digits']},{params['data_right_digits']})"
+    return data_type
+
+def encode_strings(values, length, rng):
+    """
+    [0, 36^k) 범위의 정수를 길이 k의 소문자/숫자 문자열로 1:1 인코딩합니다. length가 k보다 길면 뒤는 랜덤 문자로 채웁니다.
+    """
+    length = length or 20
+    encoded_chars = min(length, MAX_ENCODED_CHARS)
+    remaining = np.array(values, dtype=np.int64)
+    digits = np.empty((len(values), length), dtype=np.int64)
+    for position in range(encoded_chars - 1, -1, -1):
+        remaining, digits[:, position] = np.divmod(remaining, len(UNIQUE_ALPHABET))
+    if length > encoded_chars:
+        digits[:, encoded_chars:] = rng.integers(0, len(UNIQUE_ALPHABET), size=(len(values), length - encoded_chars))
+    codes = UNIQUE_ALPHABET[digits]
+    return codes.view(f'S{length}').ravel().astype(f'U{length}').tolist()
+
+def encode_values(data_type, params, values, rng):
+    """
+    [0, value_space) 범위의 서로 다른 정수들을 컬럼 타입의 서로 다른 값으로 변환합니다.
+    """
+    if data_type in ['CHAR', 'VARCHAR']:
+        return encode_strings(values, params.get('data_length'), rng)
+    elif data_type == 'TEXT':
+        return encode_strings(values, get_encoded_length(data_type, params), rng)
+    elif data_type in INTEGER_SPACES:
+        return list(values)
+    elif data_type in ['FLOAT', 'DOUBLE']:
+        return [(value + 1) / 100 for value in values]
+    elif data_type == 'DECIMAL':
+        return [Decimal(value + 1).scaleb(-params['data_right_digits']) for value in values]
+    elif data_type == 'DATE':
+        return np.array(values, dtype='datetime64[D]').astype(str).tolist()
+    elif data_type in ['DATETIME', 'TIMESTAMP']:
+        return np.array(values, dtype='datetime64[s]').astype(object).tolist()
+    elif data_type == 'TIME':
+        return [f"{value // 3600:02d}:{value // 60 % 60:02d}:{value % 60:02d}" for value in values]
+    elif data_type == 'YEAR':
+        # MySQL 드라이버는 YEAR를 정수로 돌려주므로 기존 값과 비교할 수 있게 정수로 만듦
+        return [1970 + value for value in values]
+    elif data_type == 'BOOLEAN':
+        return [bool(value) for value in values]
+    elif data_type == 'ENUM':
+        return [params['data_options'][value] for value in values]
+    elif data_type in ['BLOB', 'BINARY']:
+        return [value.to_bytes(BINARY_LENGTH, 'big') for value in values]
+    return [None] * len(values)
+
+def get_encoded_length(data_type, params):
+    # encode_strings가 만드는 문자열 길이
+    if data_type == 'TEXT':
+        return MAX_ENCODED_CHARS
+    return params.get('data_length') or 20
+
+def parse_datetime(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return value.replace(tzinfo=None)
+
+def decode_value(data_type, params, value):
+    """
+    DB에서 읽은 기존 값을 encode_values가 그 값을 만들 때 쓰는 [0, value_space)의 정수로 되돌립니다.
+    드라이버마다 값의 형태가 달라서(SQLite는 DATETIME을 '...000000' 문자열, DECIMAL을 float로 돌려주는 등)
+    값끼리 비교하면 놓치는 충돌이 있으므로 기존 값은 이 정수로 비교합니다.
+    이 타입의 encode_values가 만들 수 없는 값이면(다른 길이의 문자열, 소수점 아래 초가 있는 시각 등) None을 반환합니다.
+    """
+    try:
+        if data_type in ['CHAR', 'VARCHAR', 'TEXT']:
+            # 대소문자를 구분하지 않는 collation에서는 'ABC'와 'abc'가 같은 값이므로 casefold 해서 비교
+            value = str(value).casefold()
+            if len(value) != get_encoded_length(data_type, params):
+                return None
+            index = 0
+            for char in value[:MAX_ENCODED_CHARS]:
+                position = UNIQUE_CHARS.find(char)
+                if position < 0:
+                    return None
+                index = index * len(UNIQUE_CHARS) + position
+        elif data_type in INTEGER_SPACES or data_type in ['YEAR', 'BOOLEAN']:
+            number = Decimal(int(value)) if isinstance(value, bool) else Decimal(str(value))
+            if number != number.to_integral_value():
+                return None
+            index = int(number) - (1970 if data_type == 'YEAR' else 0)
+        elif data_type in ['FLOAT', 'DOUBLE']:
+            # FLOAT는 저장할 때 반올림되므로 가장 가까운 0.01 단위 값과 겹친다고 봄
+            index = round(float(value) * 100) - 1
+        elif data_type == 'DECIMAL':
+            # float로 읽힌 값도 있으므로 str을 거쳐서 Decimal로 바꿈 (Decimal(0.1)은 0.1000000000000000055...)
+            scaled = Decimal(str(value)).scaleb(params['data_right_digits'])
+            if scaled != scaled.to_integral_value():
+                return None
+            index = int(scaled) - 1
+        elif data_type == 'DATE':
+            value = date.fromisoformat(value) if isinstance(value, str) else value
+            index = (date(value.year, value.month, value.day) - date(1970, 1, 1)).days
+        elif data_type in ['DATETIME', 'TIMESTAMP']:
+            seconds = (parse_datetime(value) - datetime(1970, 1, 1)).total_seconds()
+            if seconds != int(seconds):
+                return None
+            index = int(seconds)
+        elif data_type == 'TIME':
+            # MySQL 드라이버는 TIME을 timedelta로, 다른 드라이버는 time이나 문자열로 돌려줌
+            if isinstance(value, timedelta):
+                seconds = value.total_seconds()
+            else:
+                value = time.fromisoformat(value) if isinstance(value, str) else value
+                seconds = value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 10 ** 6
+            if seconds != int(seconds):
+                return None
+            index = int(seconds)
+        elif data_type == 'ENUM':
+            options = [option.casefold() for option in params['data_options']]
+            value = str(value).casefold()
+            index = options.index(value) if value in options else None
+        elif data_type in ['BLOB', 'BINARY']:
+            value = bytes(value)
+            if len(value) != BINARY_LENGTH:
+                return None
+            index = int.from_bytes(value, 'big')
+        else:
+            return None
+    except (TypeError, ValueError, ArithmeticError, AttributeError):
+        return None
+    return index
+
+def decode_existing_values(data_type, params, values):
+    """
+    기존 값들을 decode_value로 되돌려서, 새 unique 값이 피해야 할 [0, value_space) 범위의 정수 집합을 만듭니다.
+    """
+    value_space = get_value_space(data_type, params)
+    if value_space is None:
+        return set()
+    indices = (decode_value(data_type, params, value) for value in values)
+    return {index for index in indices if index is not None and 0 <= index < value_space}
+
+def create_permutation(value_space, rng):
+    """
+    [0, value_space)의 순열 k -> (a * k + b) mod value_space를 만듭니다. a가 value_space와 서로소라서 충돌이 없습니다.
+    """
+    if value_space <= 1:
+        return 1, 0
+    while True:
+        a = int(rng.integers(1, min(value_space, 2 ** 62)))
+        if math.gcd(a, value_space) == 1:
+            break
+    b = int(rng.integers(0, min(value_space, 2 ** 62)))
+    return a, b
+
+def create_unique_filler(table_name, plan, dummy_num, rng, existing_values=None):
+    """
+    unique/primary key 컬럼을 카운터 기반 순열로 채우는 함수를 만듭니다.
+    카운터를 순열로 섞은 뒤 타입에 맞게 인코딩하므로 값 하나당 O(1)이고 재시도 없이 중복이 생기지 않습니다.
+    existing_values({컬럼 이름: decode_value로 되돌린 기존 값의 정수 집합})에 있는 정수는 인코딩하기 전에 건너뜁니다.
+    요청한 개수가 타입의 값 공간보다 크면 바로 ValueError를 냅니다.
+    """
+    existing_values = existing_values or {}
+    unique_columns = []
+    for column in plan:
+        if not column.unique or column.foreign_key:
+            continue
+        value_space = get_value_space(column.data_type, column.params)
+        if value_space is None:
+            logging.warning(f"Unique values are not supported for {table_name}.{column.name} ({column.data_type}); filling with None")
+            unique_columns.append([column, None, None, 0, set()])
+            continue
+        existing = existing_values.get(column.name) or set()
+        if dummy_num + len(existing) > value_space:
+            raise ValueError(
+                f"{table_name}.{column.name} is {describe_column_type(column.data_type, column.params)}, which has only "
+                f"{value_space} distinct values, but {dummy_num} new unique values were requested"
+                f"{f' on top of {len(existing)} existing ones' if existing else ''}.")
+        # [컬럼, 값 공간, 순열 (a, b), 다음 카운터, 기존 값]
+        unique_columns.append([column, value_space, create_permutation(value_space, rng), 0, existing])
+
+    def fill(rows):
+        for entry in unique_columns:
+            column, value_space, permutation, counter, existing = entry
+            if value_space is None:
+                for row in rows:
+                    row[column.name] = None
+                continue
+            a, b = permutation
+            values = []
+            while len(values) < len(rows):
+                if counter >= value_space:
+                    raise ValueError(f"Ran out of unique values for {table_name}.{column.name}.")
+                needed = min(len(rows) - len(values), value_space - counter)
+                indices = [(a * k + b) % value_space for k in range(counter, counter + needed)]
+                counter += needed
+                if existing:
+                    indices = [index for index in indices if index not in existing]
+                values.extend(encode_values(column.data_type, column.params, indices, rng))
+            entry[3] = counter
+            for row, value in zip(rows, values):
+                row[column.name] = value
+        return rows
+
+    # 체크포인트용: 컬럼별 다음 카운터를 저장하고 복원함 (순열 자체는 같은 시드로 다시 만들면 같음)
+    def get_state():
+        return [entry[3] for entry in unique_columns]
+
+    def set_state(counters):
+        for entry, counter in zip(unique_columns, counters):
+            entry[3] = counter
+
+    fill.get_state = get_state
+    fill.set_state = set_state
+    return fill
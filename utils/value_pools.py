@@ -0,0 +1,148 @@
+# value_pools.py
+import atexit
+import logging
+import threading
+from collections import namedtuple
+from functools import partial
+from multiprocessing import shared_memory
+import numpy as np
+from faker import Faker
+
+# 값 풀 기본 크기. 컬럼 값은 이 개수의 미리 만든 값 중에서 뽑음
+DEFAULT_POOL_SIZE = 10000
+# 오프셋 배열 타입 (값 i는 데이터 영역의 offsets[i]:offsets[i + 1] 바이트)
+OFFSET_DTYPE = np.int64
+
+
+def generate_paragraphs(fake, size, **params):
+    return [fake.paragraph() for _ in range(size)]
+
+# 값 하나를 만들 때마다 Faker를 호출해야 해서 느린 타입과 풀을 채우는 함수. COLUMN_GENERATORS에서 Faker를 쓰는 타입은 TEXT뿐임
+# (VARCHAR/CHAR, DECIMAL, DATETIME 등은 numpy로 한 번에 만들어서 풀로 바꿔도 빨라지지 않음)
+POOL_PROVIDERS = {
+    'TEXT': generate_paragraphs,
+}
+
+
+class ValuePool(namedtuple('ValuePool', ['data_type', 'params', 'size', 'seed', 'shm_name'])):
+    """
+    공유 메모리에 올린 값 풀의 위치. 워커 프로세스로는 이 작은 튜플만 넘어가고 값은 공유 메모리에서 읽습니다.
+    """
+    __slots__ = ()
+
+    @property
+    def content_key(self):
+        # 풀의 내용을 정하는 필드. 공유 메모리 이름은 실행마다 달라지므로 스냅샷 키 등에서는 이 값을 씀
+        return self.data_type, sorted(self.params.items()), self.size, self.seed
+
+# 이 프로세스가 만든 풀 {(타입, 파라미터): ValuePool}과 공유 메모리 {이름: SharedMemory}
+_pools = {}
+_shared_memory = {}
+# 이 프로세스에서 연 풀의 (오프셋 배열, 데이터 영역) {공유 메모리 이름: (offsets, data)}. 둘 다 공유 메모리를 복사하지 않고 가리킴
+_pool_views = {}
+# 워커 프로세스에서 연 (다른 프로세스가 만든) 공유 메모리 {이름: SharedMemory}
+_attached_memory = {}
+_pools_lock = threading.Lock()
+
+
+def write_shared_pool(values):
+    """
+    문자열 값들을 [오프셋 배열][UTF-8 데이터] 형태로 공유 메모리 하나에 씁니다.
+    """
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=OFFSET_DTYPE)
+    offsets[1:] = np.cumsum([len(value) for value in encoded])
+    data = b''.join(encoded)
+    shm = shared_memory.SharedMemory(create=True, size=max(offsets.nbytes + len(data), 1))
+    shm.buf[:offsets.nbytes] = offsets.tobytes()
+    shm.buf[offsets.nbytes:offsets.nbytes + len(data)] = data
+    return shm
+
+def get_pool_view(pool):
+    """
+    풀의 오프셋 배열과 데이터 영역을 공유 메모리 위에 바로 만든 뷰로 반환합니다. 값 전체를 복사하지 않고,
+    워커 프로세스에서는 처음 쓸 때 공유 메모리를 한 번 열어서 이후 청크들도 같은 뷰를 씁니다.
+    """
+    view = _pool_views.get(pool.shm_name)
+    if view is None:
+        shm = _shared_memory.get(pool.shm_name)
+        if shm is None:
+            # 워커 프로세스: 프로세스가 끝날 때까지 열어두고, 끝날 때 뷰를 먼저 놓은 뒤 닫음
+            if not _attached_memory:
+                atexit.register(detach_value_pools)
+            shm = _attached_memory[pool.shm_name] = shared_memory.SharedMemory(name=pool.shm_name)
+        header = (pool.size + 1) * np.dtype(OFFSET_DTYPE).itemsize
+        offsets = np.ndarray(pool.size + 1, dtype=OFFSET_DTYPE, buffer=shm.buf)
+        view = _pool_views[pool.shm_name] = (offsets, shm.buf[header:])
+    return view
+
+def release_pool_views():
+    # 공유 메모리를 가리키는 뷰가 남아 있으면 닫을 수 없으므로 먼저 놓음
+    for _, data in _pool_views.values():
+        data.release()
+    _pool_views.clear()
+
+def detach_value_pools():
+    """
+    워커 프로세스가 연 공유 메모리를 닫습니다. 지우는 것은 풀을 만든 프로세스의 release_value_pools가 합니다.
+    """
+    with _pools_lock:
+        release_pool_views()
+        for shm in _attached_memory.values():
+            shm.close()
+        _attached_memory.clear()
+
+def generate_pooled_column(dummy_num, fake, rng, pool, **params):
+    offsets, data = get_pool_view(pool)
+    indexes = rng.integers(0, pool.size, size=dummy_num)
+    # 뽑힌 값만 공유 메모리에서 잘라 디코딩함
+    return [str(data[start:end], 'utf-8') for start, end in zip(offsets[indexes].tolist(), offsets[indexes + 1].tolist())]
+
+def get_value_pool(data_type, params, size, seed=None):
+    """
+    (타입, 파라미터)별 풀을 한 번만 만들고 테이블들이 같이 씁니다. 같은 시드면 항상 같은 풀이 만들어집니다.
+    """
+    key = (data_type, tuple(sorted(params.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            fake = Faker()
+            if seed is not None:
+                fake.seed_instance(seed)
+            values = POOL_PROVIDERS[data_type](fake, size, **params)
+            shm = write_shared_pool(values)
+            pool = _pools[key] = ValuePool(data_type, dict(params), size, seed, shm.name)
+            _shared_memory[shm.name] = shm
+            logging.info(f"Built a pool of {size} {data_type} values in shared memory {shm.name} ({shm.size} bytes)")
+    return pool
+
+def apply_value_pools(column_plans, pool_config, seed=None):
+    """
+    settings.yaml의 value_pools가 켜져 있으면 POOL_PROVIDERS 타입의 컬럼이 값마다 Faker를 부르지 않고 풀에서 뽑도록 바꿉니다.
+    unique/PK/FK 컬럼은 중복 없이 채워야 하므로 바꾸지 않습니다. distributions보다 먼저 적용해야 분포 설정이 우선합니다.
+    """
+    if not pool_config or not pool_config.get('enabled'):
+        return column_plans
+    size = max(int(pool_config.get('size') or DEFAULT_POOL_SIZE), 1)
+    pooled_plans = {}
+    for table_name, plan in column_plans.items():
+        pooled_plan = []
+        for column in plan:
+            if column.data_type in POOL_PROVIDERS and not column.unique and not column.foreign_key:
+                pool = get_value_pool(column.data_type, column.params, size, seed)
+                column = column._replace(generator=partial(generate_pooled_column, pool=pool, **column.params))
+            pooled_plan.append(column)
+        pooled_plans[table_name] = tuple(pooled_plan)
+    return pooled_plans
+
+def release_value_pools():
+    """
+    이 프로세스가 만든 공유 메모리를 닫고 지웁니다. 실행이 끝날 때(실패해도) 호출합니다.
+    """
+    with _pools_lock:
+        release_pool_views()
+        for shm in _shared_memory.values():
+            shm.close()
+            shm.unlink()
+        _shared_memory.clear()
+        _pools.clear()